@@ -49,3 +49,25 @@ class HandlerException(APIException):
     default_detail = "base handler exception"
     default_code = "handler_exception"
     category = "handler"
+
+
+class ResumableUploadException(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "Invalid request for the resumable upload"
+    default_code = "resumable_upload_exception"
+    category = "importer"
+
+
+class UploadOffsetException(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The offset does not match the bytes already received"
+    default_code = "resumable_upload_exception"
+    category = "importer"
+
+
+class ChecksumMismatchException(APIException):
+    # status code defined by the checksum extension of the tus protocol
+    status_code = 460
+    default_detail = "The checksum of the chunk does not match the received data"
+    default_code = "resumable_upload_exception"
+    category = "importer"
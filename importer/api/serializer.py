@@ -1,7 +1,24 @@
+import pyproj
 from rest_framework import serializers
 from dynamic_rest.serializers import DynamicModelSerializer
 from geonode.upload.models import Upload
 
+from importer.fetch import FETCH_MODES, parse_checksum, validate_url
+
+
+def validate_crs(value):
+    try:
+        pyproj.CRS.from_user_input(value)
+    except pyproj.exceptions.CRSError:
+        raise serializers.ValidationError(f"The CRS {value} is not valid")
+
+
+def validate_file_url(value):
+    try:
+        validate_url(value)
+    except Exception as e:
+        raise serializers.ValidationError(getattr(e, "detail", str(e)))
+
 
 class ImporterSerializer(DynamicModelSerializer):
     class Meta:
@@ -17,9 +34,13 @@ class ImporterSerializer(DynamicModelSerializer):
             "skip_existing_layers",
             "source",
             "custom",
+            "target_crs",
+            "file_url",
+            "file_checksum",
+            "file_url_mode",
         )
 
-    base_file = serializers.FileField()
+    base_file = serializers.FileField(required=False)
     xml_file = serializers.FileField(required=False)
     sld_file = serializers.FileField(required=False)
     store_spatial_files = serializers.BooleanField(required=False, default=True)
@@ -27,3 +48,69 @@ class ImporterSerializer(DynamicModelSerializer):
     skip_existing_layers = serializers.BooleanField(required=False, default=False)
     source = serializers.CharField(required=False, default="upload")
     custom = serializers.JSONField(required=False, default={})
+    target_crs = serializers.CharField(required=False, validators=[validate_crs])
+    file_url = serializers.URLField(required=False, validators=[validate_file_url])
+    file_checksum = serializers.CharField(required=False)
+    file_url_mode = serializers.ChoiceField(choices=FETCH_MODES, required=False)
+
+    def validate(self, data):
+        if not data.get("base_file") and not data.get("file_url"):
+            raise serializers.ValidationError("The base_file or the file_url is required")
+        if data.get("file_checksum"):
+            try:
+                parse_checksum(data["file_checksum"])
+            except Exception as e:
+                raise serializers.ValidationError(getattr(e, "detail", str(e)))
+        return data
+
+
+class ResumableUploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    store_spatial_files = serializers.BooleanField(required=False, default=True)
+    overwrite_existing_layer = serializers.BooleanField(required=False, default=False)
+    skip_existing_layers = serializers.BooleanField(required=False, default=False)
+    source = serializers.CharField(required=False, default="upload")
+    custom = serializers.JSONField(required=False, default={})
+    target_crs = serializers.CharField(required=False, validators=[validate_crs])
+
+
+class BatchUploadSerializer(serializers.Serializer):
+    base_file = serializers.FileField(required=False)
+    upload_id = serializers.UUIDField(required=False)
+    manifest = serializers.JSONField(required=False)
+    store_spatial_files = serializers.BooleanField(required=False, default=True)
+    overwrite_existing_layer = serializers.BooleanField(required=False, default=False)
+    skip_existing_layers = serializers.BooleanField(required=False, default=False)
+    source = serializers.CharField(required=False, default="upload")
+    custom = serializers.JSONField(required=False, default={})
+    target_crs = serializers.CharField(required=False, validators=[validate_crs])
+
+    def validate_manifest(self, value):
+        if not isinstance(value, list) or not all(
+            isinstance(x, dict) and x.get("base_file") for x in value
+        ):
+            raise serializers.ValidationError(
+                "The manifest must be a list of objects with the base_file of each dataset"
+            )
+        return value
+
+    def validate(self, data):
+        if bool(data.get("base_file")) == bool(data.get("upload_id")):
+            raise serializers.ValidationError(
+                "Either the base_file or the upload_id of a resumable upload is required"
+            )
+        return data
+
+
+class ImportPlanSerializer(serializers.Serializer):
+    base_file = serializers.FileField(required=False)
+    upload_id = serializers.UUIDField(required=False)
+    file_url = serializers.URLField(required=False, validators=[validate_file_url])
+
+    def validate(self, data):
+        if len([x for x in ("base_file", "upload_id", "file_url") if data.get(x)]) != 1:
+            raise serializers.ValidationError(
+                "One of base_file, upload_id or file_url is required"
+            )
+        return data
@@ -1,3 +1,7 @@
+import base64
+import hashlib
+import os
+
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from geonode.layers.models import Dataset
@@ -7,13 +11,16 @@ from unittest.mock import MagicMock, patch
 # Create your tests here.
 from importer import project_dir
 from geonode.base.populate_test_data import create_single_dataset
-from django.http import HttpResponse, QueryDict
+from django.http import HttpResponse, QueryDict, UnreadablePostError
 
-from importer.models import ResourceHandlerInfo
+from importer.api.views import write_chunk
+from importer.celery_tasks import cleanup_resumable_uploads
+from importer.models import ResourceHandlerInfo, ResumableUpload
 from importer.tests.utils import ImporterBaseTestSupport
 from importer.orchestrator import orchestrator
 from django.utils.module_loading import import_string
 from geonode.assets.models import LocalAsset
+from geonode.resource.models import ExecutionRequest
 
 
 class TestImporterViewSet(ImporterBaseTestSupport):
@@ -213,3 +220,282 @@ class TestImporterViewSet(ImporterBaseTestSupport):
 
         self.assertEqual(500, response.status_code)
         self.assertFalse(LocalAsset.objects.exists())
+
+    @patch("importer.api.serializer.validate_url")
+    @patch("importer.api.views.fetch_remote_file")
+    def test_file_url_should_be_fetched_by_the_worker(self, fetch_remote_file, _):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        payload = {"file_url": "http://example.com/data/valid.gpkg"}
+
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(201, response.status_code)
+        fetch_remote_file.apply_async.assert_called_once()
+        _exec = orchestrator.get_execution_object(response.json()["execution_id"])
+        self.assertEqual(payload["file_url"], _exec.input_params["file_url"])
+        self.assertEqual("download", _exec.input_params["file_url_mode"])
+
+    @patch("importer.api.serializer.validate_url")
+    @patch("importer.api.views.fetch_remote_file")
+    def test_file_url_vsicurl_mode_is_refused_for_not_supported_files(
+        self, fetch_remote_file, _
+    ):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        payload = {
+            "file_url": "http://example.com/data/valid.gpkg",
+            "file_url_mode": "vsicurl",
+        }
+
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(400, response.status_code)
+        fetch_remote_file.apply_async.assert_not_called()
+
+    @patch("importer.api.serializer.validate_url")
+    @patch("importer.api.views.fetch_remote_file")
+    def test_file_url_handler_is_found_by_the_extension(self, fetch_remote_file, _):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+
+        # the file is not downloaded yet, the content is not read by the handler
+        response = self.client.post(
+            self.url, data={"file_url": "http://example.com/data/valid.geojson"}
+        )
+        self.assertEqual(201, response.status_code)
+        _exec = orchestrator.get_execution_object(response.json()["execution_id"])
+        self.assertEqual(
+            "importer.handlers.geojson.handler.GeoJsonFileHandler",
+            _exec.input_params["handler_module_path"],
+        )
+
+        # the content of a tar archive cannot be known from the URL
+        response = self.client.post(
+            self.url, data={"file_url": "http://example.com/data/valid.tar.gz"}
+        )
+        self.assertEqual(400, response.status_code)
+        fetch_remote_file.apply_async.assert_called_once()
+
+    @patch("importer.api.serializer.validate_url")
+    @patch("importer.api.views.fetch_remote_file")
+    def test_file_url_vsicurl_mode_requires_the_allowed_hosts(
+        self, fetch_remote_file, _
+    ):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        payload = {
+            "file_url": "http://example.com/data/valid.csv",
+            "file_url_mode": "vsicurl",
+        }
+
+        # GDAL follows the redirects of a remote read without checking them,
+        # the allowed hosts are not set by default
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(400, response.status_code)
+        fetch_remote_file.apply_async.assert_not_called()
+
+    @patch("importer.api.views.fetch_remote_file")
+    def test_file_url_of_a_private_address_is_refused(self, fetch_remote_file):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        payload = {"file_url": "http://169.254.169.254/latest/meta-data/data.csv"}
+
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(400, response.status_code)
+        fetch_remote_file.apply_async.assert_not_called()
+
+
+class TestResumableUploadViewSet(ImporterBaseTestSupport):
+    content = b'{"type": "FeatureCollection", "content": "some-content"}'
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        response = self.client.post(
+            reverse("importer_resumable_upload_create"),
+            data={"filename": "test.geojson", "size": len(self.content)},
+            content_type="application/json",
+        )
+        self.assertEqual(201, response.status_code)
+        self.upload_url = response.json()["upload_url"]
+        self.upload = ResumableUpload.objects.get(pk=response.json()["upload_id"])
+
+    def _send_chunk(self, chunk, offset, **headers):
+        return self.client.patch(
+            self.upload_url,
+            data=chunk,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+            **headers,
+        )
+
+    def test_chunks_are_written_at_their_offset(self):
+        response = self._send_chunk(self.content[:10], 0)
+        self.assertEqual(204, response.status_code)
+        self.assertEqual("10", response["Upload-Offset"])
+
+        # a chunk sent with an offset already received is rejected
+        response = self._send_chunk(self.content[10:], 0)
+        self.assertEqual(409, response.status_code)
+
+        response = self.client.head(self.upload_url)
+        self.assertEqual("10", response["Upload-Offset"])
+
+        response = self._send_chunk(self.content[10:], 10)
+        self.assertEqual(204, response.status_code)
+        with open(self.upload.file_path, "rb") as _file:
+            self.assertEqual(self.content, _file.read())
+
+    def test_chunk_interrupted_by_the_client_keeps_the_received_data(self):
+        class InterruptedStream:
+            def __init__(self, data):
+                self.data = data
+
+            def read(self, size):
+                if not self.data:
+                    raise UnreadablePostError("connection reset")
+                data, self.data = self.data, b""
+                return data
+
+        received = write_chunk(
+            self.upload.file_path, 0, InterruptedStream(self.content[:10]), 100
+        )
+        self.assertEqual(10, received)
+        with open(self.upload.file_path, "rb") as _file:
+            self.assertEqual(self.content[:10], _file.read())
+
+        # the data of a chunk with a checksum cannot be verified
+        checksum = ("sha256", hashlib.sha256(self.content).digest())
+        received = write_chunk(
+            self.upload.file_path, 10, InterruptedStream(self.content[10:]), 100, checksum
+        )
+        self.assertEqual(0, received)
+        self.assertEqual(10, os.path.getsize(self.upload.file_path))
+
+    def test_chunk_with_invalid_checksum_is_discarded(self):
+        checksum = base64.b64encode(hashlib.sha256(b"other").digest()).decode()
+        response = self._send_chunk(
+            self.content, 0, HTTP_UPLOAD_CHECKSUM=f"sha256 {checksum}"
+        )
+        self.assertEqual(460, response.status_code)
+        self.upload.refresh_from_db()
+        self.assertEqual(0, self.upload.offset)
+
+        checksum = base64.b64encode(hashlib.sha256(self.content).digest()).decode()
+        response = self._send_chunk(
+            self.content, 0, HTTP_UPLOAD_CHECKSUM=f"sha256 {checksum}"
+        )
+        self.assertEqual(204, response.status_code)
+
+    @patch("importer.api.views.import_orchestrator")
+    def test_finalize_should_start_the_import_of_the_complete_file(self, patch_upload):
+        finalize_url = reverse(
+            "importer_resumable_upload_finalize", kwargs={"pk": str(self.upload.pk)}
+        )
+        response = self.client.post(finalize_url)
+        self.assertEqual(400, response.status_code)
+        patch_upload.s.assert_not_called()
+
+        self._send_chunk(self.content, 0)
+        response = self.client.post(finalize_url)
+
+        self.assertEqual(201, response.status_code)
+        patch_upload.s.assert_called_once()
+        _exec = orchestrator.get_execution_object(response.json()["execution_id"])
+        self.assertEqual(
+            self.upload.file_path, _exec.input_params["files"]["base_file"]
+        )
+        asset_handler = import_string(_exec.input_params["asset_module_path"])
+        asset_handler.objects.filter(id=_exec.input_params["asset_id"]).delete()
+
+    @patch("importer.utils.get_upload_max_size", return_value=10)
+    @patch("importer.api.views.import_orchestrator")
+    def test_finalize_should_apply_the_upload_size_limit(self, patch_upload, _):
+        self._send_chunk(self.content, 0)
+        response = self.client.post(
+            reverse(
+                "importer_resumable_upload_finalize", kwargs={"pk": str(self.upload.pk)}
+            )
+        )
+
+        self.assertEqual(400, response.status_code)
+        patch_upload.s.assert_not_called()
+        self.assertTrue(os.path.exists(self.upload.file_path))
+
+    @patch("importer.api.views.create_import_execution", side_effect=Exception("error"))
+    @patch("importer.api.views.import_orchestrator")
+    def test_failed_finalize_should_keep_the_uploaded_file(self, patch_upload, _):
+        self._send_chunk(self.content, 0)
+        response = self.client.post(
+            reverse(
+                "importer_resumable_upload_finalize", kwargs={"pk": str(self.upload.pk)}
+            )
+        )
+
+        self.assertEqual(500, response.status_code)
+        self.assertFalse(LocalAsset.objects.exists())
+        # the finalization can be retried
+        self.assertTrue(os.path.exists(self.upload.file_path))
+        self.upload.refresh_from_db()
+        self.assertIsNone(self.upload.execution_id)
+
+    def test_cleanup_should_remove_the_expired_uploads(self):
+        cleanup_resumable_uploads(expiration=1)
+        self.assertTrue(ResumableUpload.objects.filter(pk=self.upload.pk).exists())
+
+        cleanup_resumable_uploads(expiration=0)
+        self.assertFalse(ResumableUpload.objects.filter(pk=self.upload.pk).exists())
+        self.assertFalse(os.path.exists(self.upload.upload_dir))
+
+
+class TestImportPlanViewSet(ImporterBaseTestSupport):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.url = reverse("importer_upload_plan")
+
+    def test_plan_should_describe_the_layers_without_importing(self):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        executions = ExecutionRequest.objects.count()
+        payload = {
+            "base_file": open(f"{project_dir}/tests/fixture/valid.gpkg", "rb"),
+        }
+
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(200, response.status_code)
+        (plan,) = response.json()["datasets"]
+        self.assertIsNone(plan["error"])
+        self.assertTrue(plan["layers"])
+        self.assertTrue(all("feature_count" in x for x in plan["layers"]))
+        self.assertEqual(1, response.json()["total"]["datasets"])
+        self.assertEqual(executions, ExecutionRequest.objects.count())
+        self.assertFalse(LocalAsset.objects.exists())
+
+    def test_plan_should_report_the_not_handled_files(self):
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+        payload = {
+            "base_file": SimpleUploadedFile(name="file.invalid", content=b"abc"),
+        }
+
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(200, response.status_code)
+        (plan,) = response.json()["datasets"]
+        self.assertEqual("No handlers found for this dataset type", plan["error"])
+
+    @patch("importer.api.serializer.validate_url")
+    @patch("importer.api.views.get_vsicurl_path", side_effect=lambda x: f"/vsicurl/{x}")
+    @patch("importer.api.views.plan_dataset")
+    def test_plan_of_a_file_url_finds_the_handler_by_the_extension(
+        self, plan_dataset, *_
+    ):
+        plan_dataset.return_value = {"layers": [], "size": 0}
+        self.client.force_login(get_user_model().objects.get(username="admin"))
+
+        for name, handler in (
+            ("valid.geojson", "importer.handlers.geojson.handler.GeoJsonFileHandler"),
+            ("valid.tar.gz", "None"),
+        ):
+            response = self.client.post(
+                self.url, data={"file_url": f"http://example.com/data/{name}"}
+            )
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(handler, str(plan_dataset.call_args.args[1]))
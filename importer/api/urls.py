@@ -1,5 +1,11 @@
 from geonode.upload.api.urls import urlpatterns
-from importer.api.views import ResourceImporter, ImporterViewSet
+from importer.api.views import (
+    BatchUploadViewSet,
+    ImporterViewSet,
+    ImportPlanViewSet,
+    ResourceImporter,
+    ResumableUploadViewSet,
+)
 from django.urls import re_path
 
 urlpatterns.insert(
@@ -19,3 +25,64 @@ urlpatterns.insert(
         name="importer_resource_copy",
     ),
 )
+
+urlpatterns.insert(
+    2,
+    re_path(
+        r"uploads/resumable/(?P<pk>[0-9a-f-]{36})/finalize$",
+        ResumableUploadViewSet.as_view({"post": "finalize"}),
+        name="importer_resumable_upload_finalize",
+    ),
+)
+
+urlpatterns.insert(
+    3,
+    re_path(
+        r"uploads/resumable/(?P<pk>[0-9a-f-]{36})$",
+        ResumableUploadViewSet.as_view(
+            {
+                "get": "retrieve",
+                "head": "retrieve",
+                "patch": "partial_update",
+                "delete": "destroy",
+            }
+        ),
+        name="importer_resumable_upload",
+    ),
+)
+
+urlpatterns.insert(
+    4,
+    re_path(
+        r"uploads/resumable$",
+        ResumableUploadViewSet.as_view({"post": "create"}),
+        name="importer_resumable_upload_create",
+    ),
+)
+
+urlpatterns.insert(
+    5,
+    re_path(
+        r"uploads/batch/(?P<pk>[0-9a-f-]{36})$",
+        BatchUploadViewSet.as_view({"get": "retrieve"}),
+        name="importer_batch_upload",
+    ),
+)
+
+urlpatterns.insert(
+    6,
+    re_path(
+        r"uploads/batch$",
+        BatchUploadViewSet.as_view({"post": "create"}),
+        name="importer_batch_upload_create",
+    ),
+)
+
+urlpatterns.insert(
+    7,
+    re_path(
+        r"uploads/plan$",
+        ImportPlanViewSet.as_view({"post": "create"}),
+        name="importer_upload_plan",
+    ),
+)
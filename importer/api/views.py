@@ -16,9 +16,19 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 #########################################################################
+import base64
+import binascii
+import hashlib
 import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
 from urllib.parse import urljoin, urlsplit
 from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
 from django.urls import reverse
 from pathlib import Path
 from geonode.resource.enumerator import ExecutionRequestAction
@@ -34,24 +44,113 @@ from geonode.base.api.permissions import (
 from geonode.base.api.serializers import ResourceBaseSerializer
 from geonode.base.api.views import ResourceBaseViewSet
 from geonode.base.models import ResourceBase
+from geonode.resource.models import ExecutionRequest
 from geonode.storage.manager import StorageManager
 from geonode.upload.api.permissions import UploadPermissionsFilter
 from geonode.upload.utils import UploadLimitValidator
-from importer.api.exception import HandlerException, ImportException
-from importer.api.serializer import ImporterSerializer
-from importer.celery_tasks import import_orchestrator
+from importer.api.exception import (
+    ChecksumMismatchException,
+    HandlerException,
+    ImportException,
+    InvalidInputFileException,
+    ResumableUploadException,
+    UploadOffsetException,
+)
+from importer.api.serializer import (
+    BatchUploadSerializer,
+    ImportPlanSerializer,
+    ImporterSerializer,
+    ResumableUploadSerializer,
+)
+from importer.batch import (
+    BATCH_SOURCE,
+    extract_archive,
+    find_batch_datasets,
+    get_batch_progress,
+    move_dataset_files,
+)
+from importer.celery_tasks import (
+    dispatch_batch_upload,
+    fetch_remote_file,
+    import_orchestrator,
+)
+from importer.fetch import get_url_filename, get_vsicurl_path, validate_remote_read
+from importer.planning import plan_dataset
+from importer.models import ResumableUpload
 from importer.orchestrator import orchestrator
+from importer.settings import IMPORTER_UPLOAD_BUFFER_SIZE
+from importer.utils import get_upload_max_size, validate_files_size
 from oauth2_provider.contrib.rest_framework import OAuth2Authentication
 from rest_framework.authentication import BasicAuthentication, SessionAuthentication
-from rest_framework.parsers import FileUploadParser, MultiPartParser, JSONParser
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.exceptions import NotFound, PermissionDenied, UnsupportedMediaType
+from rest_framework.parsers import (
+    FileUploadParser,
+    FormParser,
+    MultiPartParser,
+    JSONParser,
+)
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
 from geonode.assets.handlers import asset_handler_registry
 from geonode.assets.local import LocalAssetHandler
 from geonode.proxy.utils import proxy_urls_registry
 
 logger = logging.getLogger(__name__)
 
+# media type of the chunks, as defined by the tus protocol
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+ARCHIVE_EXTENSIONS = (".zip", ".kmz")
+
+
+def create_import_execution(
+    request, handler, files, extracted_params, asset=None, name=None
+):
+    """
+    Create the ExecutionRequest of the import flow for the files
+    already available in the asset directory
+    """
+    action = ExecutionRequestAction.IMPORT.value
+
+    if "url" in extracted_params:
+        # we should register the hosts for the proxy
+        proxy_urls_registry.register_host(urlsplit(extracted_params["url"]).hostname)
+
+    input_params = {
+        **{"files": files, "handler_module_path": str(handler)},
+        **extracted_params,
+    }
+
+    if asset:
+        input_params.update(
+            {
+                "asset_id": asset.id,
+                "asset_module_path": f"{asset.__module__}.{asset.__class__.__name__}",
+            }
+        )
+
+    return orchestrator.create_execution_request(
+        user=request.user,
+        func_name=next(iter(handler.get_task_list(action=action))),
+        step=_(next(iter(handler.get_task_list(action=action)))),
+        input_params=input_params,
+        action=action,
+        name=name,
+        source=extracted_params.get("source"),
+    )
+
+
+def create_original_asset(request, handler, files):
+    asset_handler = asset_handler_registry.get_default_handler()
+    return asset_handler.create(
+        title="Original",
+        owner=request.user,
+        description=None,
+        type=handler.id,
+        files=list(set(files.values())),
+        clone_files=False,
+    )
+
 
 class ImporterViewSet(DynamicModelViewSet):
     """
@@ -110,6 +209,9 @@ class ImporterViewSet(DynamicModelViewSet):
             },
         }
 
+        if _data.get("file_url") and not _file:
+            return self._import_from_url(request, _data)
+
         if "zip_file" in _data or "kmz_file" in _data:
             # if a zipfile is provided, we need to unzip it before searching for an handler
             zipname = Path(_data["base_file"].name).stem
@@ -147,31 +249,13 @@ class ImporterViewSet(DynamicModelViewSet):
 
                 action = ExecutionRequestAction.IMPORT.value
 
-                if "url" in extracted_params:
-                    # we should register the hosts for the proxy
-                    proxy_urls_registry.register_host(urlsplit(extracted_params["url"]).hostname)
-
-                input_params = {
-                    **{"files": files, "handler_module_path": str(handler)},
-                    **extracted_params,
-                }
-
-                if asset:
-                    input_params.update(
-                        {
-                            "asset_id": asset.id,
-                            "asset_module_path": f"{asset.__module__}.{asset.__class__.__name__}",
-                        }
-                    )
-
-                execution_id = orchestrator.create_execution_request(
-                    user=request.user,
-                    func_name=next(iter(handler.get_task_list(action=action))),
-                    step=_(next(iter(handler.get_task_list(action=action)))),
-                    input_params=input_params,
-                    action=action,
+                execution_id = create_import_execution(
+                    request,
+                    handler,
+                    files,
+                    extracted_params,
+                    asset=asset,
                     name=_file.name if _file else extracted_params.get("title", None),
-                    source=extracted_params.get("source"),
                 )
 
                 sig = import_orchestrator.s(
@@ -192,10 +276,54 @@ class ImporterViewSet(DynamicModelViewSet):
                 if execution_id:
                     orchestrator.set_as_failed(execution_id=str(execution_id), reason=e)
                 logger.exception(e)
+                if isinstance(e, InvalidInputFileException):
+                    raise
                 raise ImportException(detail=e.args[0] if len(e.args) > 0 else e)
 
         raise ImportException(detail="No handlers found for this dataset type")
 
+    def _import_from_url(self, request, _data):
+        """
+        The file is not sent with the request, the importer.fetch_remote_file task
+        downloads it (or opens it via /vsicurl/) before starting the import
+        """
+        url = _data.pop("file_url")
+        mode = _data.pop("file_url_mode", None) or "download"
+        checksum = _data.pop("file_checksum", None)
+        filename = get_url_filename(url)
+
+        # the file is not downloaded yet, the handler is found by its extension
+        handler = orchestrator.get_handler_by_extension(filename)
+        if not handler:
+            raise InvalidInputFileException(
+                detail=f"The format of {filename} cannot be detected from the URL, please upload the file"
+            )
+        if mode == "vsicurl":
+            if not handler.REMOTE_READ_SUPPORTED:
+                raise InvalidInputFileException(
+                    detail=f"The file {filename} cannot be read remotely, please use the download mode"
+                )
+            validate_remote_read(url)
+
+        extracted_params, _data = handler.extract_params_from_data(
+            {**_data, "base_file": filename}
+        )
+        extracted_params.update(
+            {
+                "custom": _data.pop("custom", {}),
+                "file_url": url,
+                "file_url_mode": mode,
+                "file_checksum": checksum,
+            }
+        )
+        UploadLimitValidator(request.user).validate_parallelism_limit_per_user()
+
+        execution_id = create_import_execution(
+            request, handler, {}, extracted_params, name=filename
+        )
+        fetch_remote_file.apply_async((str(execution_id), str(handler)))
+        return Response(data={"execution_id": execution_id}, status=201)
+
     def _handle_asset(self, request, asset_dir, storage_manager, _data, handler):
         if storage_manager is None:
             # means that the storage manager is not initialized yet, so
@@ -216,18 +344,596 @@ class ImporterViewSet(DynamicModelViewSet):
         upload_validator.validate_files_sum_of_sizes(storage_manager.data_retriever)
 
     def generate_asset_and_retrieve_paths(self, request, storage_manager, handler):
-        asset_handler = asset_handler_registry.get_default_handler()
         _files = storage_manager.get_retrieved_paths()
-        asset = asset_handler.create(
-            title="Original",
-            owner=request.user,
-            description=None,
-            type=handler.id,
-            files=list(set(_files.values())),
-            clone_files=False,
+        return create_original_asset(request, handler, _files), _files
+
+
+def parse_upload_checksum(header):
+    """
+    Parse the Upload-Checksum header of the tus checksum extension: "<algorithm> <base64 digest>"
+    """
+    if not header:
+        return None
+    try:
+        algorithm, value = header.strip().split(" ", 1)
+        digest = base64.b64decode(value.strip(), validate=True)
+    except (ValueError, binascii.Error):
+        raise ResumableUploadException(detail="Invalid Upload-Checksum header")
+    algorithm = algorithm.lower()
+    if algorithm not in hashlib.algorithms_guaranteed:
+        raise ResumableUploadException(
+            detail=f"The checksum algorithm {algorithm} is not supported"
         )
+    return algorithm, digest
+
+
+def write_chunk(path, offset, stream, max_length, checksum=None) -> int:
+    """
+    Write the data of the stream in the file starting from the offset,
+    the data is hashed while it is written.
+    If the chunk is too long or the checksum does not match, the file is truncated back to the offset.
+    If the client disconnects, the data already received is kept (unless a checksum is
+    expected, since it cannot be verified) so the upload is resumed from there.
+    Return the number of bytes written
+    """
+    hasher = hashlib.new(checksum[0]) if checksum else None
+    received = 0
+    with open(path, "r+b") as _file:
+        _file.seek(offset)
+        while stream is not None:
+            try:
+                data = stream.read(IMPORTER_UPLOAD_BUFFER_SIZE)
+            except OSError as e:
+                # UnreadablePostError is raised when the client disconnects
+                logger.warning(f"The chunk of {path} is interrupted: {e}")
+                if hasher:
+                    _file.truncate(offset)
+                    return 0
+                break
+            if not data:
+                break
+            received += len(data)
+            if received > max_length:
+                _file.truncate(offset)
+                raise ResumableUploadException(
+                    detail="The chunk exceeds the size declared for the upload"
+                )
+            if hasher:
+                hasher.update(data)
+            _file.write(data)
+        if hasher and hasher.digest() != checksum[1]:
+            _file.truncate(offset)
+            raise ChecksumMismatchException()
+        # removes the data left by a previous chunk not committed
+        _file.truncate(offset + received)
+    return received
+
+
+@contextmanager
+def lock_upload(upload):
+    """
+    Hold a PostgreSQL advisory lock of the upload, so the requests writing its chunks
+    are serialized without keeping a transaction open while the data is received.
+    Raise UploadOffsetException if the lock is held by another request
+    """
+    # the advisory lock keys are bigint, the first 63 bits of the UUID are used
+    key = upload.pk.int >> 65
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+        if not cursor.fetchone()[0]:
+            raise UploadOffsetException(
+                detail="The upload is already receiving data from another request"
+            )
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+
+
+class ResumableUploadViewSet(ViewSet):
+    """
+    Upload of large files in chunks, following the tus protocol.
+    - POST creates the upload with the filename, the size and the import params
+    - PATCH writes a chunk at the Upload-Offset, optionally verified with the Upload-Checksum
+    - HEAD/GET return the bytes already received, so the upload can be resumed
+    - POST on finalize starts the import of the assembled file
+    - DELETE removes an upload not finalized
+    """
+
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+    authentication_classes = [
+        BasicAuthentication,
+        SessionAuthentication,
+        OAuth2Authentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def _get_upload_headers(upload):
+        return {
+            "Upload-Offset": str(upload.offset),
+            "Upload-Length": str(upload.size),
+            "Tus-Resumable": "1.0.0",
+            "Cache-Control": "no-store",
+        }
+
+    @staticmethod
+    def _get_upload(request, pk):
+        upload = ResumableUpload.objects.filter(pk=pk, user=request.user).first()
+        if upload is None:
+            raise NotFound(detail=f"Upload {pk} not found")
+        return upload
+
+    def create(self, request, *args, **kwargs):
+        if not request.user.has_perm("base.add_resourcebase"):
+            raise PermissionDenied()
+        serializer = ResumableUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        filename = get_valid_filename(os.path.basename(params.pop("filename")))
+        size = params.pop("size")
+        max_size = get_upload_max_size()
+        if max_size and size > max_size:
+            raise ResumableUploadException(
+                detail=f"The file exceeds the maximum size of {max_size} bytes"
+            )
+
+        upload_dir = LocalAssetHandler()._create_asset_dir()
+        open(os.path.join(upload_dir, filename), "wb").close()
+        upload = ResumableUpload.objects.create(
+            user=request.user,
+            filename=filename,
+            size=size,
+            upload_dir=upload_dir,
+            params=params,
+        )
+        upload_url = reverse("importer_resumable_upload", kwargs={"pk": str(upload.pk)})
+        return Response(
+            data={"upload_id": upload.pk, "upload_url": upload_url, "offset": 0},
+            status=201,
+            headers={"Location": upload_url, **self._get_upload_headers(upload)},
+        )
+
+    def retrieve(self, request, pk=None):
+        upload = self._get_upload(request, pk)
+        return Response(
+            data={
+                "upload_id": upload.pk,
+                "filename": upload.filename,
+                "size": upload.size,
+                "offset": upload.offset,
+                "execution_id": upload.execution_id,
+            },
+            status=200,
+            headers=self._get_upload_headers(upload),
+        )
+
+    def partial_update(self, request, pk=None):
+        if request.content_type.split(";")[0].strip() != CHUNK_CONTENT_TYPE:
+            raise UnsupportedMediaType(request.content_type)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+        except (KeyError, ValueError):
+            raise ResumableUploadException(detail="The Upload-Offset header is required")
+        checksum = parse_upload_checksum(request.headers.get("Upload-Checksum"))
+
+        upload = self._get_upload(request, pk)
+        # the chunks of an upload are serialized, the offset is committed
+        # once the chunk is written (also if the client disconnects)
+        with lock_upload(upload):
+            upload.refresh_from_db()
+            if upload.execution_id:
+                raise ResumableUploadException(detail="The upload is already finalized")
+            if offset != upload.offset:
+                raise UploadOffsetException(
+                    detail=f"The upload offset is {upload.offset}, received {offset}"
+                )
+            upload.offset += write_chunk(
+                upload.file_path,
+                offset,
+                request.stream,
+                upload.size - upload.offset,
+                checksum,
+            )
+            upload.save(update_fields=["offset", "last_updated"])
+
+        return Response(status=204, headers=self._get_upload_headers(upload))
+
+    def destroy(self, request, pk=None):
+        upload = self._get_upload(request, pk)
+        if not upload.execution_id:
+            # after the finalization the files belong to the asset
+            shutil.rmtree(upload.upload_dir, ignore_errors=True)
+        upload.delete()
+        return Response(status=204)
+
+    def finalize(self, request, pk=None):
+        upload = self._get_upload(request, pk)
+        with lock_upload(upload), transaction.atomic():
+            upload.refresh_from_db()
+            if upload.execution_id:
+                raise ResumableUploadException(detail="The upload is already finalized")
+            if not upload.is_complete:
+                raise ResumableUploadException(
+                    detail=f"The upload is incomplete, {upload.offset} of {upload.size} bytes received"
+                )
+            execution_id, handler, files = self._create_execution(request, upload)
+            upload.execution_id = execution_id
+            upload.save(update_fields=["execution_id", "last_updated"])
+
+        # the import starts once the execution is committed
+        import_orchestrator.s(
+            files,
+            str(execution_id),
+            handler=str(handler),
+            action=ExecutionRequestAction.IMPORT.value,
+        ).apply_async()
+        return Response(data={"execution_id": execution_id}, status=201)
 
-        return asset, _files
+    def _create_execution(self, request, upload):
+        """
+        Create the asset and the ExecutionRequest for the assembled file.
+        The file is already in the asset directory, so it is not cloned again.
+        The archives are extracted in a new asset directory as the single request upload does
+        """
+        _data = {**upload.params, "base_file": upload.file_path}
+        storage_manager = None
+        asset = None
+        execution_id = None
+        try:
+            if upload.filename.lower().endswith(ARCHIVE_EXTENSIONS):
+                storage_manager = StorageManager(
+                    remote_files={"base_file": upload.file_path}
+                )
+                storage_manager.clone_remote_files(
+                    cloning_directory=LocalAssetHandler()._create_asset_dir(),
+                    create_tempdir=False,
+                )
+                _data.update(
+                    {
+                        **{"original_zip_name": Path(upload.filename).stem},
+                        **storage_manager.get_retrieved_paths(),
+                    }
+                )
+
+            handler = orchestrator.get_handler(_data)
+            if not handler:
+                raise ImportException(detail="No handlers found for this dataset type")
+
+            extracted_params, _data = handler.extract_params_from_data(_data)
+            extracted_params.update({"custom": _data.pop("custom", {})})
+            UploadLimitValidator(request.user).validate_parallelism_limit_per_user()
+
+            files = (
+                storage_manager.get_retrieved_paths()
+                if storage_manager
+                else {"base_file": upload.file_path}
+            )
+            # the extracted files of an archive are checked, as the single request upload does
+            validate_files_size(files)
+            asset = create_original_asset(request, handler, files)
+            execution_id = create_import_execution(
+                request,
+                handler,
+                files,
+                extracted_params,
+                asset=asset,
+                name=upload.filename,
+            )
+        except Exception as e:
+            # the uploaded file is kept, so the finalization can be retried
+            if asset:
+                try:
+                    if storage_manager is None:
+                        # the asset owns the uploaded file, it is detached
+                        # otherwise the deletion of the asset removes it
+                        asset.location = []
+                        asset.save()
+                    asset.delete()
+                except Exception as _exc:
+                    logger.warning(_exc)
+            elif storage_manager is not None:
+                storage_manager.delete_retrieved_paths(force=True)
+            if execution_id:
+                orchestrator.set_as_failed(execution_id=str(execution_id), reason=e)
+            logger.exception(e)
+            if isinstance(e, InvalidInputFileException):
+                raise
+            raise ImportException(detail=e.args[0] if len(e.args) > 0 else e)
+
+        if storage_manager is not None:
+            # the archive is not needed anymore after the extraction
+            shutil.rmtree(upload.upload_dir, ignore_errors=True)
+        return execution_id, handler, files
+
+
+class BatchUploadViewSet(ViewSet):
+    """
+    Import with a single request all the datasets of a zip archive,
+    uploaded as base_file or with a resumable upload (upload_id).
+    A batch execution is created with a child execution for each dataset,
+    the children are started by the importer.dispatch_batch_upload task
+    within the concurrency budget of the batch.
+    The optional manifest selects the datasets of the archive and their own params
+    """
+
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+    authentication_classes = [
+        BasicAuthentication,
+        SessionAuthentication,
+        OAuth2Authentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        if not request.user.has_perm("base.add_resourcebase"):
+            raise PermissionDenied()
+        serializer = BatchUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        _file = params.pop("base_file", None)
+        upload_id = params.pop("upload_id", None)
+        manifest = params.pop("manifest", None)
+
+        upload = None
+        if upload_id:
+            upload = ResumableUpload.objects.filter(
+                pk=upload_id, user=request.user, execution_id__isnull=True
+            ).first()
+            if not upload or not upload.is_complete:
+                raise ResumableUploadException(
+                    detail=f"The upload {upload_id} is not available or not complete"
+                )
+
+        # the parallelism limit of the user is evaluated once for the whole batch,
+        # the children are validated without it
+        UploadLimitValidator(request.user).validate_parallelism_limit_per_user()
+
+        staging_dir = LocalAssetHandler()._create_asset_dir()
+        batch_execution_id = None
+        children = []
+        assets = []
+        try:
+            # the uncompressed size is checked, as the single request upload does
+            extract_archive(
+                upload.file_path if upload else _file,
+                staging_dir,
+                max_size=get_upload_max_size(),
+            )
+            datasets = find_batch_datasets(
+                staging_dir, orchestrator.get_handler, manifest=manifest
+            )
+            if not datasets:
+                raise ImportException(
+                    detail="No dataset with an available handler found in the archive"
+                )
+
+            batch_execution_id = orchestrator.create_execution_request(
+                user=request.user,
+                func_name="importer.dispatch_batch_upload",
+                step=_("importer.dispatch_batch_upload"),
+                input_params={"children": []},
+                action=ExecutionRequestAction.IMPORT.value,
+                name=upload.filename if upload else _file.name,
+                source=BATCH_SOURCE,
+            )
+
+            for dataset in datasets:
+                files = move_dataset_files(
+                    dataset, LocalAssetHandler()._create_asset_dir()
+                )
+                _data = {
+                    **params,
+                    **{k: v for k, v in dataset.items() if k not in files},
+                    **files,
+                }
+                handler = orchestrator.get_handler(_data)
+                extracted_params, _data = handler.extract_params_from_data(_data)
+                extracted_params.update(
+                    {
+                        "custom": _data.pop("custom", {}),
+                        "batch_execution_id": str(batch_execution_id),
+                    }
+                )
+                asset = create_original_asset(request, handler, files)
+                assets.append(asset)
+                children.append(
+                    str(
+                        create_import_execution(
+                            request,
+                            handler,
+                            files,
+                            extracted_params,
+                            asset=asset,
+                            name=os.path.basename(files["base_file"]),
+                        )
+                    )
+                )
+
+            orchestrator.update_execution_request_status(
+                execution_id=str(batch_execution_id),
+                input_params={"children": children},
+            )
+        except Exception as e:
+            for asset in assets:
+                try:
+                    asset.delete()
+                except Exception as _exc:
+                    logger.warning(_exc)
+            # the children are not started yet, so the batch is not notified
+            ExecutionRequest.objects.filter(exec_id__in=children).update(
+                status=ExecutionRequest.STATUS_FAILED,
+                finished=timezone.now(),
+                log=str(e),
+            )
+            if batch_execution_id:
+                orchestrator.set_as_failed(str(batch_execution_id), reason=str(e))
+            logger.exception(e)
+            if isinstance(e, InvalidInputFileException):
+                raise
+            raise ImportException(detail=e.args[0] if len(e.args) > 0 else e)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        if upload:
+            shutil.rmtree(upload.upload_dir, ignore_errors=True)
+            upload.execution_id = batch_execution_id
+            upload.save(update_fields=["execution_id", "last_updated"])
+
+        dispatch_batch_upload.apply_async((str(batch_execution_id),))
+        return Response(
+            data={
+                "execution_id": batch_execution_id,
+                "datasets": len(children),
+                "status_url": reverse(
+                    "importer_batch_upload", kwargs={"pk": str(batch_execution_id)}
+                ),
+            },
+            status=201,
+        )
+
+    def retrieve(self, request, pk=None):
+        """
+        Return the aggregated progress of the batch and the status of each dataset
+        """
+        batch = ExecutionRequest.objects.filter(exec_id=pk, source=BATCH_SOURCE)
+        if not request.user.is_superuser:
+            batch = batch.filter(user=request.user)
+        _exec = batch.first()
+        if _exec is None:
+            raise NotFound(detail=f"Batch {pk} not found")
+
+        children = ExecutionRequest.objects.filter(
+            exec_id__in=_exec.input_params.get("children", [])
+        ).order_by("created")
+        return Response(
+            data={
+                "execution_id": _exec.exec_id,
+                "name": _exec.name,
+                "status": _exec.status,
+                "created": _exec.created,
+                "finished": _exec.finished,
+                "log": _exec.log,
+                **get_batch_progress(_exec),
+                "datasets": [
+                    {
+                        "execution_id": x.exec_id,
+                        "name": x.name,
+                        "status": x.status,
+                        "log": x.log,
+                    }
+                    for x in children
+                ],
+            },
+            status=200,
+        )
+
+
+class ImportPlanViewSet(ViewSet):
+    """
+    Dry run of the import: the handler of each dataset is detected and only the metadata
+    of its layers is read (name, CRS, geometry type, features and fields), with the
+    ingestion time and the disk footprint estimated from the completed imports.
+    No table, asset or resource is created and the uploaded files are removed.
+    The file can be uploaded (base_file, a zip archive is planned as a batch upload),
+    provided by a completed resumable upload (upload_id) or read remotely (file_url)
+    """
+
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+    authentication_classes = [
+        BasicAuthentication,
+        SessionAuthentication,
+        OAuth2Authentication,
+    ]
+    permission_classes = [
+        IsAuthenticated,
+        UserHasPerms(perms_dict={"default": {"POST": ["base.add_resourcebase"]}}),
+    ]
+
+    def create(self, request, *args, **kwargs):
+        serializer = ImportPlanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload_id = serializer.validated_data.get("upload_id")
+        file_url = serializer.validated_data.get("file_url")
+
+        workdir = tempfile.mkdtemp()
+        try:
+            if upload_id:
+                upload = ResumableUpload.objects.filter(
+                    pk=upload_id, user=request.user
+                ).first()
+                if not upload or not upload.is_complete:
+                    raise ResumableUploadException(
+                        detail=f"The upload {upload_id} is not available or not complete"
+                    )
+                _data = {"base_file": upload.file_path}
+            elif file_url:
+                # GDAL reads only the metadata of the remote file with range requests
+                _data = {"base_file": get_vsicurl_path(file_url)}
+            else:
+                _data = {}
+                for key, value in request.FILES.items():
+                    path = os.path.join(
+                        workdir, get_valid_filename(os.path.basename(value.name))
+                    )
+                    with open(path, "wb") as _file:
+                        for chunk in value.chunks():
+                            _file.write(chunk)
+                    _data[key] = path
+
+            if file_url:
+                name = get_url_filename(file_url)
+                # the remote file is not available to the handlers, only its name
+                plans = [
+                    plan_dataset(
+                        _data, orchestrator.get_handler_by_extension(name), name=name
+                    )
+                ]
+            elif _data["base_file"].lower().endswith(".zip"):
+                extracted = os.path.join(workdir, "extracted")
+                extract_archive(
+                    _data["base_file"], extracted, max_size=get_upload_max_size()
+                )
+                plans = [
+                    plan_dataset(
+                        dataset,
+                        orchestrator.get_handler(dataset),
+                        name=os.path.relpath(dataset["base_file"], extracted),
+                    )
+                    for dataset in find_batch_datasets(
+                        extracted, orchestrator.get_handler
+                    )
+                ]
+            else:
+                plans = [plan_dataset(_data, orchestrator.get_handler(_data))]
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        layers = [x for plan in plans for x in plan["layers"]]
+        return Response(
+            data={
+                "datasets": plans,
+                "total": {
+                    "datasets": len(plans),
+                    "layers": len([x for x in layers if x["will_be_imported"]]),
+                    "skipped_layers": len(
+                        [x for x in layers if not x["will_be_imported"]]
+                    ),
+                    "size": sum(x["size"] for x in plans),
+                    # not estimated if the history of any handler is not available
+                    **{
+                        key: (
+                            sum(x.get(key) for x in plans)
+                            if all(x.get(key) is not None for x in plans)
+                            else None
+                        )
+                        for key in ("estimated_seconds", "estimated_disk_bytes")
+                    },
+                },
+            },
+            status=200,
+        )
 
 
 class ResourceImporter(DynamicModelViewSet):
@@ -8,6 +8,7 @@ class ImporterConfig(AppConfig):
     def ready(self):
         """Finalize setup"""
         run_setup_hooks()
+        validate_settings()
         super(ImporterConfig, self).ready()
 
 
@@ -32,3 +33,21 @@ def run_setup_hooks(*args, **kwargs):
             0,
             re_path(r"^api/v2/", include("importer.api.urls")),
         )
+
+
+def validate_settings(*args, **kwargs):
+    """
+    Validate the importer settings at the startup,
+    so a wrong configuration does not fail every upload
+    """
+    from django.core.exceptions import ImproperlyConfigured
+    from importer.api.exception import InvalidInputFileException
+    from importer.settings import IMPORTER_TARGET_CRS
+
+    if IMPORTER_TARGET_CRS:
+        from importer.handlers.utils import normalize_crs
+
+        try:
+            normalize_crs(IMPORTER_TARGET_CRS)
+        except InvalidInputFileException as e:
+            raise ImproperlyConfigured(f"Invalid IMPORTER_TARGET_CRS: {e.detail}")
@@ -0,0 +1,142 @@
+import logging
+import os
+import shutil
+import zipfile
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from geonode.resource.models import ExecutionRequest
+
+from importer.api.exception import InvalidInputFileException
+
+logger = logging.getLogger(__name__)
+
+BATCH_SOURCE = "upload_batch"
+# files attached to the datasets, not imported as datasets on their own
+SIDECAR_EXTENSIONS = ("xml", "sld")
+TERMINAL_STATUSES = (ExecutionRequest.STATUS_FINISHED, ExecutionRequest.STATUS_FAILED)
+
+
+def extract_archive(archive_path, directory, max_size=0):
+    """
+    Extract the zip archive in the directory, the members
+    pointing outside of the directory are rejected.
+    If max_size is provided, the archive is rejected before the extraction when
+    the uncompressed size of its members is greater, zipfile never writes more
+    than the size declared for a member
+    """
+    root = os.path.realpath(directory)
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            members = archive.infolist()
+            for member in members:
+                target = os.path.realpath(os.path.join(root, member.filename))
+                if os.path.commonpath([root, target]) != root:
+                    raise InvalidInputFileException(
+                        detail=f"Invalid path in the archive: {member.filename}"
+                    )
+            if max_size and sum(x.file_size for x in members) > max_size:
+                raise InvalidInputFileException(
+                    detail=f"The uncompressed archive exceeds the maximum size of {max_size} bytes"
+                )
+            archive.extractall(root)
+    except zipfile.BadZipFile:
+        raise InvalidInputFileException(detail="The batch must be a zip archive")
+
+
+def find_batch_datasets(directory, get_handler, manifest=None) -> list:
+    """
+    Group the files of the directory by name and return the payload of each dataset,
+    the base_file is a file with an available handler and the other files with the
+    same name are added as <ext>_file (eg: the dbf_file of a shapefile).
+    If the manifest is provided, only the datasets listed are returned,
+    each one with its own params
+    """
+    groups = defaultdict(list)
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in sorted(filenames):
+            if filename.startswith(".") or "__MACOSX" in dirpath:
+                continue
+            path = os.path.join(dirpath, filename)
+            groups[(dirpath, Path(filename).stem.lower())].append(path)
+
+    datasets = []
+    for files in groups.values():
+        extensions = {x: x.split(".")[-1].lower() for x in files}
+        sidecars = [x for x in files if extensions[x] in SIDECAR_EXTENSIONS]
+        shapefiles = [x for x in files if extensions[x] == "shp"]
+        if shapefiles:
+            # all the files with the same name are part of the shapefile
+            candidates = [(shapefiles[0], [x for x in files if x != shapefiles[0]])]
+        else:
+            candidates = [(x, sidecars) for x in files if x not in sidecars]
+
+        # each file is moved with a single dataset, so the sidecars
+        # are given only to the first dataset with the same name
+        assigned = set()
+        for base, related in candidates:
+            _data = {
+                "base_file": base,
+                **{f"{extensions[x]}_file": x for x in related if x not in assigned},
+            }
+            if get_handler(_data):
+                datasets.append(_data)
+                assigned.update(related)
+
+    if manifest is None:
+        return datasets
+
+    by_name = {
+        os.path.relpath(x["base_file"], directory).replace(os.sep, "/"): x
+        for x in datasets
+    }
+    selected = []
+    for item in manifest:
+        name = str(item.get("base_file", "")).strip("/")
+        if name not in by_name:
+            raise InvalidInputFileException(
+                detail=f"The dataset {name} of the manifest is not available in the archive"
+            )
+        selected.append(
+            {**by_name[name], **{k: v for k, v in item.items() if k != "base_file"}}
+        )
+    return selected
+
+
+def move_dataset_files(_data, directory) -> dict:
+    """
+    Move the files of the dataset in its own directory,
+    since the asset of each dataset is removed with its directory
+    """
+    files = {}
+    for key, path in _data.items():
+        if key.endswith("_file"):
+            target = os.path.join(directory, os.path.basename(path))
+            shutil.move(path, target)
+            files[key] = target
+    return files
+
+
+def get_batch_progress(_exec) -> dict:
+    """
+    Aggregate the status of the child executions of a batch
+    """
+    children = _exec.input_params.get("children", [])
+    dispatched = len((_exec.output_params or {}).get("dispatched", []))
+    statuses = Counter(
+        ExecutionRequest.objects.filter(exec_id__in=children).values_list(
+            "status", flat=True
+        )
+    )
+    finished = statuses[ExecutionRequest.STATUS_FINISHED]
+    failed = statuses[ExecutionRequest.STATUS_FAILED]
+    return {
+        "total": len(children),
+        "finished": finished,
+        "failed": failed,
+        "running": max(0, dispatched - finished - failed),
+        "pending": len(children) - dispatched,
+        "progress": round((finished + failed) * 100 / len(children), 1)
+        if children
+        else 100,
+    }
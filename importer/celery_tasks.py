@@ -1,16 +1,22 @@
 import logging
 import os
+import shutil
+from datetime import timedelta
 from typing import Optional
 
 from celery import Task
-from django.db import connections, transaction
+from django.db import connections, router, transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy
 from dynamic_models.exceptions import DynamicModelError, InvalidFieldNameError
 from dynamic_models.models import FieldSchema, ModelSchema
+from geonode.assets.handlers import asset_handler_registry
+from geonode.assets.local import LocalAssetHandler
 from geonode.base.models import ResourceBase
 from geonode.resource.enumerator import ExecutionRequestAction as exa
+from geonode.resource.models import ExecutionRequest
 from importer.api.exception import (
     CopyResourceException,
     InvalidInputFileException,
@@ -18,22 +24,55 @@ from importer.api.exception import (
     ResourceCreationException,
     StartImportException,
 )
+from importer.batch import TERMINAL_STATUSES, get_batch_progress
 from importer.celery_app import importer_app
 from importer.datastore import DataStoreManager
 from importer.handlers.gpkg.tasks import SingleMessageErrorHandler
 from importer.handlers.utils import (
+    copy_table,
     create_alternate,
     drop_dynamic_model_schema,
     evaluate_error,
     get_uuid,
+    register_layer_to_publish,
 )
+from importer.fetch import (
+    download_file,
+    get_url_filename,
+    get_vsicurl_path,
+)
+from importer.gwc import (
+    MAX_SEEDING_POLLS,
+    get_dataset_extent,
+    get_seeding_tasks,
+    seed_tiles,
+    seed_tiles_if_available,
+    update_seeding_status,
+)
+from importer.models import ResourceHandlerInfo, ResumableUpload
 from importer.orchestrator import orchestrator
-from importer.publisher import DataPublisher
+from importer.planning import update_tables_stats
+from importer.publisher import DataPublisher, get_catalog
+from importer.rest import is_transient_error
 from importer.settings import (
+    IMPORTER_BATCH_PUBLISHING,
+    IMPORTER_BATCH_UPLOAD_CONCURRENCY,
+    IMPORTER_COPY_WORKERS,
+    IMPORTER_GEOSERVER_BACKOFF,
+    IMPORTER_GEOSERVER_RETRIES,
     IMPORTER_GLOBAL_RATE_LIMIT,
+    IMPORTER_GWC_RESEED_RATE_LIMIT,
+    IMPORTER_GWC_SEED_MAX_TASKS,
+    IMPORTER_GWC_SEED_POLL_INTERVAL,
+    IMPORTER_GWC_SEED_WAIT_RETRIES,
+    IMPORTER_GWC_SEED_ZOOM_STOP,
+    IMPORTER_LAZY_COPY,
     IMPORTER_PUBLISHING_RATE_LIMIT,
     IMPORTER_RESOURCE_CREATION_RATE_LIMIT,
+    IMPORTER_THUMBNAILS_RATE_LIMIT,
+    IMPORTER_UPLOAD_EXPIRATION,
 )
+from importer.thumbnails import set_thumbnails
 from importer.utils import call_rollback_function, error_handler, find_key_recursively
 
 logger = logging.getLogger(__name__)
@@ -105,6 +144,75 @@ def import_orchestrator(
         raise StartImportException(detail=error_handler(e, execution_id))
 
 
+@importer_app.task(
+    bind=True,
+    base=ErrorBaseTaskClass,
+    name="importer.fetch_remote_file",
+    queue="importer.fetch_remote_file",
+    max_retries=1,
+    rate_limit=IMPORTER_GLOBAL_RATE_LIMIT,
+    ignore_result=False,
+    task_track_started=True,
+)
+def fetch_remote_file(self, execution_id: str, handler_module_path: str):
+    """
+    Retrieve the file of an import requested with a file_url, then start the import.
+    With the download mode the file is streamed in a new asset, with the vsicurl
+    mode GDAL reads it remotely and no asset is created
+    """
+    _exec = orchestrator.get_execution_object(execution_id)
+    input_params = _exec.input_params
+    url = input_params.get("file_url")
+    asset_dir = None
+    try:
+        orchestrator.update_execution_request_status(
+            execution_id=execution_id,
+            status=ExecutionRequest.STATUS_RUNNING,
+            last_updated=timezone.now(),
+            func_name="fetch_remote_file",
+            step=gettext_lazy("importer.fetch_remote_file"),
+            celery_task_request=self.request,
+        )
+        if input_params.get("file_url_mode") == "vsicurl":
+            # the host is validated again, its address could be changed after the request
+            files = {"base_file": get_vsicurl_path(url)}
+        else:
+            asset_dir = LocalAssetHandler()._create_asset_dir()
+            path = download_file(
+                url,
+                os.path.join(asset_dir, get_url_filename(url)),
+                checksum=input_params.get("file_checksum"),
+            )
+            files = {"base_file": path}
+            asset = asset_handler_registry.get_default_handler().create(
+                title="Original",
+                owner=_exec.user,
+                description=None,
+                type=import_string(handler_module_path)().id,
+                files=[path],
+                clone_files=False,
+            )
+            input_params.update(
+                {
+                    "asset_id": asset.id,
+                    "asset_module_path": f"{asset.__module__}.{asset.__class__.__name__}",
+                }
+            )
+        orchestrator.update_execution_request_status(
+            execution_id=execution_id, input_params={**input_params, "files": files}
+        )
+    except Exception as e:
+        if asset_dir:
+            shutil.rmtree(asset_dir, ignore_errors=True)
+        raise InvalidInputFileException(detail=error_handler(e, execution_id))
+
+    import_orchestrator.apply_async(
+        (files, execution_id),
+        {"handler": handler_module_path, "action": exa.IMPORT.value},
+    )
+    return "fetch_remote_file", execution_id
+
+
 @importer_app.task(
     bind=True,
     # base=ErrorBaseTaskClass,
@@ -218,14 +326,13 @@ def publish_resource(
             celery_task_request=self.request,
         )
         _exec = orchestrator.get_execution_object(execution_id)
-        _files = _exec.input_params.get("files")
         _overwrite = _exec.input_params.get("overwrite_existing_layer")
 
         _publisher = DataPublisher(handler_module_path)
 
         # extracting the crs and the resource name, are needed for publish the resource
-        data = _publisher.extract_resource_to_publish(
-            _files, action, layer_name, alternate, **kwargs
+        data, kwargs = get_resources_to_publish(
+            _publisher, _exec, action, layer_name, alternate, kwargs
         )
         if data:
             # we should not publish resource without a crs
@@ -269,6 +376,7 @@ def publish_resource(
         return self.name, execution_id
 
     except Exception as e:
+        retry_on_transient_error(self, e)
         call_rollback_function(
             execution_id,
             handlers_module_path=handler_module_path,
@@ -281,6 +389,184 @@ def publish_resource(
         raise PublishResourceException(detail=error_handler(e, execution_id))
 
 
+def retry_on_transient_error(task, error):
+    """
+    If GeoServer is temporarily unavailable the task is scheduled again,
+    continuing the backoff of the calls, instead of rolling back the execution.
+    The task publishes the resources again, so only the errors of requests
+    not processed by GeoServer are retried
+    """
+    if (
+        is_transient_error(error, idempotent=False)
+        and task.request.retries < task.max_retries
+    ):
+        raise task.retry(
+            exc=error,
+            countdown=IMPORTER_GEOSERVER_BACKOFF
+            * 2 ** (IMPORTER_GEOSERVER_RETRIES + task.request.retries),
+        )
+
+
+def get_resources_to_publish(_publisher, _exec, action, layer_name, alternate, kwargs):
+    """
+    Extract the resources of the layer to be published.
+    If the data is reprojected during the import, the resources are published
+    with the target CRS and the native CRS is kept in the kwargs
+    for the ResourceHandlerInfo
+    """
+    data = _publisher.extract_resource_to_publish(
+        _exec.input_params.get("files"), action, layer_name, alternate, **(kwargs or {})
+    )
+    target_crs = _exec.input_params.get("target_crs")
+    if data and target_crs and action == exa.IMPORT.value:
+        kwargs = {
+            **(kwargs or {}),
+            "native_crs": _exec.input_params.get("native_crs") or data[0].get("crs"),
+        }
+        data = [{**_resource, "crs": target_crs} for _resource in data]
+    return data, kwargs
+
+
+def register_layer_failure(execution_id, layer_name=None, alternate=None, expected=None):
+    """
+    Register in the barrier of the batch publishing a layer failed before the publishing,
+    or update the layers expected if the import stops before dispatching all of them.
+    If the other layers were waiting only for this one, their publishing is started
+    """
+    if not IMPORTER_BATCH_PUBLISHING:
+        return
+    layers = register_layer_to_publish(
+        execution_id, layer_name, alternate, failed=True, expected=expected
+    )
+    if layers:
+        _exec = ExecutionRequest.objects.filter(exec_id=execution_id).first()
+        publish_resources_batch.apply_async(
+            (execution_id, _exec.input_params.get("handler_module_path"), exa.IMPORT.value),
+            {"layers": layers},
+        )
+
+
+@importer_app.task(
+    bind=True,
+    base=ErrorBaseTaskClass,
+    name="importer.publish_resources_batch",
+    queue="importer.publish_resource",
+    max_retries=3,
+    rate_limit=IMPORTER_PUBLISHING_RATE_LIMIT,
+    ignore_result=False,
+    task_track_started=True,
+)
+def publish_resources_batch(
+    self,
+    execution_id: str,
+    /,
+    handler_module_path: str,
+    action: str,
+    layers: list = None,
+    **kwargs,
+):
+    """
+    Task to publish in geoserver all the layers imported by an execution.
+    Is used instead of publish_resource when IMPORTER_BATCH_PUBLISHING is enabled,
+    then each layer continues with the step after the publishing
+
+            Parameters:
+                    execution_id (UUID): unique ID used to keep track of the execution request
+                    handler_module_path (str): module path of the handler of the execution
+                    action (str): action of the execution example: import
+                    layers (list): list of dict with layer_name, alternate and kwargs of each layer
+            Returns:
+                    None
+    """
+    layers = layers or []
+    try:
+        orchestrator.update_execution_request_status(
+            execution_id=execution_id,
+            last_updated=timezone.now(),
+            func_name="publish_resources_batch",
+            step=gettext_lazy("importer.publish_resource"),
+            celery_task_request=self.request,
+        )
+        _exec = orchestrator.get_execution_object(execution_id)
+        _publisher = DataPublisher(handler_module_path)
+
+        resources = []
+        for layer in layers:
+            data, layer["kwargs"] = get_resources_to_publish(
+                _publisher,
+                _exec,
+                action,
+                layer["layer_name"],
+                layer["alternate"],
+                layer.get("kwargs"),
+            )
+            if not data:
+                raise PublishResourceException(
+                    f"Only resources with a CRS provided can be published, layer: {layer['alternate']}"
+                )
+            resources.extend(data)
+
+        if resources:
+            _publisher.publish_resources_batch(
+                resources,
+                overwrite=_exec.input_params.get("overwrite_existing_layer"),
+            )
+        orchestrator.update_execution_request_status(
+            execution_id=execution_id,
+            last_updated=timezone.now(),
+            celery_task_request=self.request,
+        )
+
+        for layer in layers:
+            import_orchestrator.apply_async(
+                (
+                    {},
+                    execution_id,
+                    handler_module_path,
+                    "importer.publish_resource",
+                    layer["layer_name"],
+                    layer["alternate"],
+                    action,
+                ),
+                layer.get("kwargs") or {},
+            )
+
+        return self.name, execution_id
+
+    except Exception as e:
+        retry_on_transient_error(self, e)
+        if layers:
+            # a single rollback task removes all the layers of the batch
+            call_rollback_function(
+                execution_id,
+                handlers_module_path=handler_module_path,
+                prev_action=action,
+                layer=layers[0]["layer_name"],
+                alternate=layers[0]["alternate"],
+                error=e,
+                rollback_alternates=[x["alternate"] for x in layers],
+            )
+        raise PublishResourceException(detail=error_handler(e, execution_id))
+
+
+@importer_app.task(
+    name="importer.reseed_gwc_tiles",
+    queue="importer.reseed_gwc_tiles",
+    max_retries=3,
+    rate_limit=IMPORTER_GWC_RESEED_RATE_LIMIT,
+    ignore_result=False,
+)
+def reseed_gwc_tiles(layer: str, extent: list):
+    """
+    Render again in GeoWebCache the tiles of the layer inside the extent
+    truncated after an overwrite.
+    The rate limit of the task and the seeding threads of GeoWebCache
+    keep the load of GeoServer bounded
+    """
+    seed_tiles(get_catalog(), layer, extent, seed_type="reseed")
+    return "reseed_gwc_tiles", layer
+
+
 @importer_app.task(
     bind=True,
     base=ErrorBaseTaskClass,
@@ -329,7 +615,8 @@ def create_geonode_resource(
 
         _files = _exec.input_params.get("files")
 
-        if not _files:
+        if not _files or not _exec.input_params.get("asset_module_path"):
+            # remote resources and files read via /vsicurl/ have no asset
             _asset = None
         else:
             _asset = (
@@ -400,6 +687,315 @@ def create_geonode_resource(
         raise ResourceCreationException(detail=error_handler(e))
 
 
+@importer_app.task(
+    bind=True,
+    base=ErrorBaseTaskClass,
+    name="importer.seed_resource",
+    queue="importer.seed_resource",
+    max_retries=1,
+    ignore_result=False,
+    task_track_started=True,
+)
+def seed_resource(
+    self,
+    execution_id: str,
+    /,
+    step_name: str,
+    layer_name: Optional[str] = None,
+    alternate: Optional[str] = None,
+    handler_module_path: str = None,
+    action: str = exa.IMPORT.value,
+    **kwargs,
+):
+    """
+    Request to GeoWebCache the seeding of the tiles of the published resource,
+    up to IMPORTER_GWC_SEED_ZOOM_STOP, so the first requests find a warm cache.
+    The seeding is submitted by the importer.submit_resource_seeding task, which waits
+    for a free slot if GeoWebCache is already running IMPORTER_GWC_SEED_MAX_TASKS tasks.
+    Only the layers published by the local vector and raster handlers are seeded.
+    The seeding is not needed by the import: errors are saved in the execution output
+    and the workflow always continues without waiting for it
+
+            Parameters:
+                    execution_id (UUID): unique ID used to keep track of the execution request
+                    step_name (str): step name example: importer.seed_resource
+                    layer_name (UUID): name of the resource example: layer
+                    alternate (UUID): alternate of the resource example: layer_alternate
+            Returns:
+                    None
+    """
+    orchestrator.update_execution_request_status(
+        execution_id=execution_id,
+        last_updated=timezone.now(),
+        func_name="seed_resource",
+        step=gettext_lazy("importer.seed_resource"),
+        celery_task_request=self.request,
+    )
+    try:
+        handler_info = (
+            ResourceHandlerInfo.objects.filter(
+                Q(resource__alternate=alternate)
+                | Q(resource__alternate__endswith=f":{alternate}"),
+                execution_request__exec_id=execution_id,
+            )
+            .select_related("resource")
+            .first()
+        )
+        resource = handler_info.resource if handler_info else None
+        extent = get_dataset_extent(resource) if resource else None
+        if not extent:
+            update_seeding_status(
+                execution_id,
+                alternate,
+                status="skipped",
+                reason="The extent is not available",
+            )
+        else:
+            update_seeding_status(execution_id, alternate, status="waiting")
+            submit_resource_seeding.apply_async(
+                (execution_id, alternate, resource.alternate, list(extent))
+            )
+    except Exception as e:
+        logger.error(f"Seeding of {alternate} failed with: {e}")
+        update_seeding_status(execution_id, alternate, status="failed", reason=str(e))
+
+    import_orchestrator.apply_async(
+        (
+            {},
+            execution_id,
+            handler_module_path,
+            step_name,
+            layer_name,
+            alternate,
+            action,
+        ),
+        kwargs,
+    )
+    return self.name, execution_id
+
+
+@importer_app.task(
+    name="importer.submit_resource_seeding",
+    queue="importer.seed_resource",
+    ignore_result=True,
+)
+def submit_resource_seeding(
+    execution_id: str, alternate: str, layer: str, extent: list, attempts=0
+):
+    """
+    Submit the seeding of the layer once GeoWebCache has a free slot,
+    checking every IMPORTER_GWC_SEED_POLL_INTERVAL seconds for
+    IMPORTER_GWC_SEED_WAIT_RETRIES times, then the seeding is skipped.
+    The execution is not kept open meanwhile
+    """
+    try:
+        submitted = seed_tiles_if_available(
+            get_catalog(),
+            layer,
+            tuple(extent),
+            IMPORTER_GWC_SEED_MAX_TASKS,
+            zoom_start=0,
+            zoom_stop=IMPORTER_GWC_SEED_ZOOM_STOP,
+        )
+    except Exception as e:
+        logger.error(f"Seeding of {alternate} failed with: {e}")
+        update_seeding_status(execution_id, alternate, status="failed", reason=str(e))
+        return
+    if submitted:
+        update_seeding_status(
+            execution_id,
+            alternate,
+            status="submitted",
+            layer=layer,
+            zoom_stop=IMPORTER_GWC_SEED_ZOOM_STOP,
+        )
+        track_resource_seeding.apply_async(
+            (execution_id, alternate, layer),
+            countdown=IMPORTER_GWC_SEED_POLL_INTERVAL,
+        )
+    elif attempts < IMPORTER_GWC_SEED_WAIT_RETRIES:
+        submit_resource_seeding.apply_async(
+            (execution_id, alternate, layer, extent, attempts + 1),
+            countdown=IMPORTER_GWC_SEED_POLL_INTERVAL,
+        )
+    else:
+        update_seeding_status(
+            execution_id,
+            alternate,
+            status="skipped",
+            reason="Too many seeding tasks are running in GeoWebCache",
+        )
+
+
+@importer_app.task(
+    name="importer.track_resource_seeding",
+    queue="importer.seed_resource",
+    ignore_result=True,
+)
+def track_resource_seeding(execution_id: str, alternate: str, layer: str, polls=0):
+    """
+    Save in the execution output the progress of the seeding of the layer,
+    the task is scheduled again until GeoWebCache completes the seeding
+    """
+    try:
+        tasks = get_seeding_tasks(get_catalog(), layer)
+    except Exception as e:
+        update_seeding_status(execution_id, alternate, status="unknown", reason=str(e))
+        return
+    if not tasks:
+        update_seeding_status(execution_id, alternate, status="completed", layer=layer)
+        return
+    update_seeding_status(
+        execution_id,
+        alternate,
+        status="running",
+        layer=layer,
+        tiles_done=sum(x[0] for x in tasks),
+        tiles_total=sum(x[1] for x in tasks),
+        seconds_remaining=max(x[2] for x in tasks),
+    )
+    if polls < MAX_SEEDING_POLLS:
+        track_resource_seeding.apply_async(
+            (execution_id, alternate, layer, polls + 1),
+            countdown=IMPORTER_GWC_SEED_POLL_INTERVAL,
+        )
+
+
+@importer_app.task(
+    name="importer.generate_thumbnails",
+    queue="importer.generate_thumbnails",
+    max_retries=1,
+    rate_limit=IMPORTER_THUMBNAILS_RATE_LIMIT,
+    ignore_result=True,
+)
+def generate_thumbnails(resource_ids: list):
+    """
+    Generate the thumbnails of the resources created or overwritten by an execution.
+    Is called once the execution is completed, with all its resources,
+    so the rendering does not slow down the import and the bulk imports
+    send a single task to the low priority queue
+    """
+    set_thumbnails(
+        [
+            resource.get_real_instance()
+            for resource in ResourceBase.objects.filter(pk__in=set(resource_ids))
+        ]
+    )
+    return "generate_thumbnails", len(resource_ids)
+
+
+@importer_app.task(
+    name="importer.collect_tables_stats",
+    queue="importer.collect_tables_stats",
+    max_retries=1,
+    ignore_result=True,
+)
+def collect_tables_stats(execution_id: str):
+    """
+    Add the rows and the disk size of the imported tables to the stats of a
+    completed execution, used to estimate the cost of the next imports.
+    The tables are analyzed, so the execution is not kept open meanwhile
+    """
+    update_tables_stats(execution_id)
+    return "collect_tables_stats", execution_id
+
+
+@importer_app.task(
+    name="importer.dispatch_batch_upload",
+    queue="importer.dispatch_batch_upload",
+    max_retries=1,
+    ignore_result=True,
+)
+def dispatch_batch_upload(batch_execution_id: str):
+    """
+    Start the child executions of a batch upload within the concurrency budget.
+    Is called when the batch is created and each time a child execution is completed,
+    so a new child is started as soon as a slot is free.
+    Once all the children are completed, the batch execution is completed
+    """
+    with transaction.atomic():
+        _exec = (
+            ExecutionRequest.objects.select_for_update()
+            .filter(exec_id=batch_execution_id)
+            .first()
+        )
+        if not _exec or _exec.status in TERMINAL_STATUSES:
+            return
+        children = _exec.input_params.get("children", [])
+        output_params = _exec.output_params or {}
+        dispatched = output_params.get("dispatched", [])
+        completed = [
+            str(x)
+            for x in ExecutionRequest.objects.filter(
+                exec_id__in=dispatched, status__in=TERMINAL_STATUSES
+            ).values_list("exec_id", flat=True)
+        ]
+        slots = IMPORTER_BATCH_UPLOAD_CONCURRENCY - (len(dispatched) - len(completed))
+        to_dispatch = [x for x in children if x not in dispatched][: max(0, slots)]
+        output_params["dispatched"] = dispatched + to_dispatch
+        _exec.output_params = output_params
+        output_params["progress"] = get_batch_progress(_exec)
+        orchestrator.update_execution_request_status(
+            execution_id=batch_execution_id,
+            status=ExecutionRequest.STATUS_RUNNING,
+            output_params=output_params,
+            last_updated=timezone.now(),
+        )
+
+    # the children are started once the batch is updated
+    for child in ExecutionRequest.objects.filter(exec_id__in=to_dispatch):
+        import_orchestrator.apply_async(
+            (child.input_params.get("files", {}), str(child.exec_id)),
+            {
+                "handler": child.input_params.get("handler_module_path"),
+                "action": exa.IMPORT.value,
+            },
+        )
+
+    if len(completed) < len(children):
+        return
+    failed = list(
+        ExecutionRequest.objects.filter(
+            exec_id__in=children, status=ExecutionRequest.STATUS_FAILED
+        ).values_list("name", flat=True)
+    )
+    if not failed:
+        orchestrator.set_as_completed(batch_execution_id)
+    elif len(failed) < len(children):
+        orchestrator.set_as_partially_failed(
+            batch_execution_id, reason=[str(x) for x in failed]
+        )
+    else:
+        orchestrator.set_as_failed(
+            batch_execution_id, reason="None of the datasets of the batch is imported"
+        )
+
+
+@importer_app.task(
+    name="importer.cleanup_resumable_uploads",
+    queue="importer.cleanup_resumable_uploads",
+    max_retries=1,
+    ignore_result=True,
+)
+def cleanup_resumable_uploads(expiration: int = IMPORTER_UPLOAD_EXPIRATION):
+    """
+    Remove the resumable uploads not updated in the last "expiration" hours.
+    The files of the uploads not finalized are removed too, after the
+    finalization they belong to the asset of the execution.
+    Should be scheduled periodically with celery beat
+    """
+    removed = 0
+    expired = ResumableUpload.objects.filter(
+        last_updated__lt=timezone.now() - timedelta(hours=expiration)
+    )
+    for upload in expired.iterator():
+        if not upload.execution_id:
+            shutil.rmtree(upload.upload_dir, ignore_errors=True)
+        upload.delete()
+        removed += 1
+    return "cleanup_resumable_uploads", removed
+
+
 @importer_app.task(
     base=ErrorBaseTaskClass,
     name="importer.copy_geonode_resource",
@@ -466,7 +1062,10 @@ def copy_geonode_resource(
         orchestrator.update_execution_request_status(
             execution_id=str(_exec.exec_id),
             input_params={**_exec.input_params, **{"instance": resource.pk}},
-            output_params={"output": {"uuid": str(new_resource.uuid)}},
+            output_params={
+                **(_exec.output_params or {}),
+                "output": {"uuid": str(new_resource.uuid)},
+            },
         )
 
         task_params = (
@@ -524,17 +1123,31 @@ def create_dynamic_structure(
         )
 
     """
-    Create the single dynamic model field for each layer. Is made by a batch of 30 field
+    Create the dynamic model fields of a layer.
+    In overwrite mode the existing fields are loaded with a single query
+    and then updated/created in bulk inside the same transaction
     """
-    dynamic_model_schema = ModelSchema.objects.filter(id=dynamic_model_schema_id)
-    if not dynamic_model_schema.exists():
+    dynamic_model_schema = ModelSchema.objects.filter(
+        id=dynamic_model_schema_id
+    ).first()
+    if dynamic_model_schema is None:
         raise DynamicModelError(
             f"The model with id {dynamic_model_schema_id} does not exists."
         )
 
-    dynamic_model_schema = dynamic_model_schema.first()
+    existing_fields = {}
+    if overwrite:
+        # otherwise if is an overwrite, we update the existing one and create the one that does not exists
+        existing_fields = {
+            _field.name: _field
+            for _field in FieldSchema.objects.filter(
+                model_schema=dynamic_model_schema,
+                name__in=[field["name"] for field in fields],
+            )
+        }
 
     row_to_insert = []
+    row_to_update = []
     for field in fields:
         # setup kwargs for the class provided
         if field["class_name"] is None or field["name"] is None:
@@ -553,28 +1166,21 @@ def create_dynamic_structure(
             # setting the dimension for the gemetry. So that we can handle also 3d geometries
             _kwargs = {**_kwargs, **{"dim": field.get("dim")}}
 
-        # if is a new creation we generate the field model from scratch
-        if not overwrite:
-            row_to_insert.append(_create_field(dynamic_model_schema, field, _kwargs))
+        _field = existing_fields.get(field["name"])
+        if _field is not None:
+            _field.class_name = field["class_name"]
+            _field.kwargs = _kwargs
+            row_to_update.append(_field)
         else:
-            # otherwise if is an overwrite, we update the existing one and create the one that does not exists
-            _field_exists = FieldSchema.objects.filter(
-                name=field["name"], model_schema=dynamic_model_schema
-            )
-            if _field_exists.exists():
-                _field_exists.update(
-                    class_name=field["class_name"],
-                    model_schema=dynamic_model_schema,
-                    kwargs=_kwargs,
-                )
-            else:
-                row_to_insert.append(
-                    _create_field(dynamic_model_schema, field, _kwargs)
-                )
+            # if is a new creation we generate the field model from scratch
+            row_to_insert.append(_create_field(dynamic_model_schema, field, _kwargs))
 
-    if row_to_insert:
-        # the build creation improves the overall permformance with the DB
-        FieldSchema.objects.bulk_create(row_to_insert, 30)
+    with transaction.atomic(using=router.db_for_write(FieldSchema)):
+        if row_to_update:
+            FieldSchema.objects.bulk_update(row_to_update, ["class_name", "kwargs"])
+        if row_to_insert:
+            # the build creation improves the overall permformance with the DB
+            FieldSchema.objects.bulk_create(row_to_insert)
 
     del row_to_insert
     return "dynamic_model", layer_name, execution_id
@@ -703,11 +1309,26 @@ def copy_geonode_data_table(
             if schema_exists:
                 db_name = schema_exists.db_name
 
-        with transaction.atomic():
-            with connections[db_name].cursor() as cursor:
-                cursor.execute(
-                    f'CREATE TABLE {new_dataset_alternate} AS TABLE "{original_dataset_alternate}";'
-                )
+        if IMPORTER_LAZY_COPY:
+            with transaction.atomic():
+                with connections[db_name].cursor() as cursor:
+                    # the copy is a view until the first modification, see materialize_lazy_copies
+                    cursor.execute(
+                        f'CREATE VIEW {new_dataset_alternate} AS SELECT * FROM "{original_dataset_alternate}";'
+                    )
+        else:
+            # the copy keeps indexes and constraints, so it performs like the original
+            timings = copy_table(
+                original_dataset_alternate,
+                new_dataset_alternate,
+                db_name,
+                workers=IMPORTER_COPY_WORKERS,
+            )
+            _exec = orchestrator.get_execution_object(exec_id)
+            orchestrator.update_execution_request_status(
+                execution_id=exec_id,
+                output_params={**(_exec.output_params or {}), "copy_timings": timings},
+            )
 
         task_params = (
             {},
@@ -785,5 +1406,7 @@ def dynamic_model_error_callback(*args, **kwargs):
     schema_model = ModelSchema.objects.filter(name=alternate).first()
     if schema_model:
         drop_dynamic_model_schema(schema_model)
+    # the layer will not reach the publishing, the other layers must not wait for it
+    register_layer_failure(args[0].args[0], alternate, alternate)
 
     return "error"
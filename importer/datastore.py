@@ -26,9 +26,15 @@ class DataStoreManager:
         """
         Perform basic validation steps
         """
+        input_params = orchestrator.get_execution_object(
+            exec_id=self.execution_id
+        ).input_params
+        if self.files and input_params.get("batch_execution_id"):
+            # the children of a batch upload are limited by the concurrency of the batch
+            return self.handler.is_valid(self.files, self.user, check_parallelism=False)
         if self.files:
             return self.handler.is_valid(self.files, self.user)
-        url = orchestrator.get_execution_object(exec_id=self.execution_id).input_params.get("url")
+        url = input_params.get("url")
         if url:
             return self.handler.is_valid_url(url)
         return False
@@ -0,0 +1,220 @@
+import hashlib
+import ipaddress
+import logging
+import os
+import socket
+import time
+from fnmatch import fnmatch
+from urllib.parse import unquote, urljoin, urlsplit
+
+import requests
+from django.utils.text import get_valid_filename
+
+from importer.api.exception import InvalidInputFileException
+from importer.settings import (
+    IMPORTER_FETCH_ALLOWED_HOSTS,
+    IMPORTER_FETCH_CHUNK_SIZE,
+    IMPORTER_FETCH_RETRIES,
+    IMPORTER_FETCH_TIMEOUT,
+)
+from importer.utils import get_upload_max_size
+
+logger = logging.getLogger(__name__)
+
+FETCH_MODES = ("download", "vsicurl")
+FETCH_SCHEMES = ("http", "https")
+MAX_REDIRECTS = 5
+
+
+def get_url_filename(url) -> str:
+    """
+    Return the name of the file pointed by the URL, used to find the handler
+    """
+    name = os.path.basename(unquote(urlsplit(url).path))
+    return get_valid_filename(name) if name else "download"
+
+
+def validate_url(url, allowed_hosts=IMPORTER_FETCH_ALLOWED_HOSTS):
+    """
+    Raise InvalidInputFileException if the URL cannot be fetched by the importer.
+    Only the http(s) URLs of the allowed hosts resolved to public addresses are
+    accepted, so the internal services (eg: the cloud metadata endpoint) cannot be reached
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme.lower() not in FETCH_SCHEMES or not host:
+        raise InvalidInputFileException(
+            detail=f"Invalid URL {url}, only the http and https URLs are supported"
+        )
+    if allowed_hosts and not any(fnmatch(host, x.lower()) for x in allowed_hosts):
+        raise InvalidInputFileException(detail=f"The host {host} is not allowed")
+    try:
+        addresses = {x[4][0] for x in socket.getaddrinfo(host, parts.port)}
+    except (socket.gaierror, ValueError):
+        raise InvalidInputFileException(detail=f"The host {host} cannot be resolved")
+    if not addresses or any(
+        not ipaddress.ip_address(x.split("%")[0]).is_global for x in addresses
+    ):
+        raise InvalidInputFileException(
+            detail=f"The host {host} is resolved to a private address"
+        )
+
+
+def validate_remote_read(url, allowed_hosts=IMPORTER_FETCH_ALLOWED_HOSTS):
+    """
+    Raise InvalidInputFileException if the URL cannot be read remotely by GDAL.
+    /vsicurl/ follows the redirects without any check, so only the hosts
+    explicitly allowed in IMPORTER_FETCH_ALLOWED_HOSTS can be read remotely
+    """
+    if not allowed_hosts:
+        raise InvalidInputFileException(
+            detail="The remote read of the files is available only for the hosts in IMPORTER_FETCH_ALLOWED_HOSTS"
+        )
+    validate_url(url, allowed_hosts=allowed_hosts)
+
+
+def get_vsicurl_path(url, allowed_hosts=IMPORTER_FETCH_ALLOWED_HOSTS) -> str:
+    """
+    GDAL reads the remote file lazily with range requests, without downloading it.
+    The URL is validated before each read, its address could be changed
+    """
+    validate_remote_read(url, allowed_hosts=allowed_hosts)
+    return f"/vsicurl/{url}"
+
+
+def parse_checksum(value):
+    """
+    Parse a checksum in the form <algorithm>:<hex digest> (eg: sha256:9f86d0...)
+    """
+    if not value:
+        return None
+    algorithm, _, digest = value.partition(":")
+    algorithm = algorithm.strip().lower()
+    if algorithm not in hashlib.algorithms_guaranteed or not digest:
+        raise InvalidInputFileException(
+            detail=f"Invalid checksum {value}, the format is <algorithm>:<hex digest>"
+        )
+    return algorithm, digest.strip().lower()
+
+
+def _get_validator(response):
+    """
+    Return the value sent in If-Range to resume the download, the weak ETags cannot be used
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _open_url(session, url, headers, timeout):
+    """
+    GET the URL following its redirects, each location is validated
+    since it can point to an address not allowed
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        response = session.get(
+            url, headers=headers, stream=True, timeout=timeout, allow_redirects=False
+        )
+        if not response.is_redirect:
+            return response
+        response.close()
+        url = urljoin(url, response.headers["Location"])
+        validate_url(url)
+    raise InvalidInputFileException(detail=f"Too many redirects for {url}")
+
+
+def download_file(
+    url,
+    path,
+    checksum=None,
+    retries=IMPORTER_FETCH_RETRIES,
+    timeout=IMPORTER_FETCH_TIMEOUT,
+    max_size=None,
+):
+    """
+    Stream the URL into the path, the data is hashed while it is written.
+    After an error the download is resumed from the bytes already written with
+    a range request. The range is sent with If-Range, so the download is restarted
+    if the file is changed on the server. Without an ETag or a Last-Modified
+    the change cannot be detected, so the download is resumed only if the checksum
+    is provided, otherwise it is restarted.
+    By default max_size is the GeoNode upload size limit
+    """
+    validate_url(url)
+    max_size = get_upload_max_size() if max_size is None else max_size
+    checksum = parse_checksum(checksum)
+    hasher = hashlib.new(checksum[0] if checksum else "sha256")
+    offset = 0
+    validator = None
+
+    attempt = 0
+    with requests.Session() as session:
+        while True:
+            try:
+                if offset and not validator and not checksum:
+                    logger.info(f"{url} cannot be validated, restarting")
+                    offset = 0
+                    hasher = hashlib.new(hasher.name)
+                headers = {}
+                if offset:
+                    headers["Range"] = f"bytes={offset}-"
+                    if validator:
+                        headers["If-Range"] = validator
+                with _open_url(session, url, headers, timeout) as response:
+                    if response.status_code == 416 and offset:
+                        # the file is already complete
+                        break
+                    response.raise_for_status()
+                    if offset and response.status_code != 206:
+                        logger.info(
+                            f"{url} is changed or does not support range requests, restarting"
+                        )
+                        offset = 0
+                        hasher = hashlib.new(hasher.name)
+                    if not offset:
+                        validator = _get_validator(response)
+
+                    start = offset
+                    length = int(response.headers.get("Content-Length") or 0)
+                    if max_size and start + length > max_size:
+                        raise InvalidInputFileException(
+                            detail=f"The file exceeds the maximum size of {max_size} bytes"
+                        )
+
+                    with open(path, "r+b" if start else "wb") as _file:
+                        _file.seek(start)
+                        _file.truncate()
+                        for data in response.iter_content(IMPORTER_FETCH_CHUNK_SIZE):
+                            _file.write(data)
+                            hasher.update(data)
+                            offset += len(data)
+                            if max_size and offset > max_size:
+                                raise InvalidInputFileException(
+                                    detail=f"The file exceeds the maximum size of {max_size} bytes"
+                                )
+                    if length and offset - start < length:
+                        raise requests.exceptions.ChunkedEncodingError(
+                            f"Connection closed after {offset - start} of {length} bytes"
+                        )
+                break
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.HTTPError,
+            ) as e:
+                status_code = getattr(getattr(e, "response", None), "status_code", None)
+                attempt += 1
+                if attempt > retries or (status_code and status_code < 500):
+                    raise
+                logger.warning(
+                    f"Download of {url} interrupted at {offset} bytes: {e}, resuming"
+                )
+                time.sleep(min(2**attempt, 30))
+
+    if checksum and hasher.hexdigest() != checksum[1]:
+        raise InvalidInputFileException(
+            detail=f"The {checksum[0]} checksum of the downloaded file does not match"
+        )
+    return path
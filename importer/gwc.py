@@ -0,0 +1,286 @@
+import json
+import logging
+import re
+
+from django.db import connection, transaction
+from django.utils import timezone
+from geonode.geoserver.security import (
+    delete_dataset_cache,
+    set_geowebcache_invalidate_cache,
+)
+from geonode.resource.models import ExecutionRequest
+from osgeo import osr
+
+from importer.rest import AsyncGeoServerClient
+from importer.settings import (
+    IMPORTER_GWC_FORMATS,
+    IMPORTER_GWC_GRIDSETS,
+    IMPORTER_GWC_RESEED,
+    IMPORTER_GWC_RESEED_THREADS,
+    IMPORTER_GWC_RESEED_ZOOM_START,
+    IMPORTER_GWC_RESEED_ZOOM_STOP,
+    IMPORTER_GWC_TARGETED_TRUNCATE,
+)
+
+logger = logging.getLogger(__name__)
+
+# the GWC gridsets whose SRS is not a valid EPSG code for GDAL
+GRIDSET_SRS = {"EPSG:900913": "EPSG:3857"}
+# the mercator gridsets are not defined beyond these latitudes
+MERCATOR_MAX_LATITUDE = 85.0511287798
+# zoom levels truncated, the truncation of the levels not cached is free
+TRUNCATE_ZOOM_STOP = 30
+# status of the GeoWebCache tasks still in progress: pending and running
+GWC_TASK_IN_PROGRESS = (0, 1)
+# the progress of a seeding is not tracked anymore after these polls
+MAX_SEEDING_POLLS = 1000
+# key of the PostgreSQL advisory lock held while a worker submits a seeding
+GWC_SEED_LOCK_ID = 7493102
+
+
+def get_dataset_extent(dataset):
+    """
+    Return the extent of the dataset in EPSG:4326 as (minx, miny, maxx, maxy)
+    """
+    polygon = getattr(dataset, "ll_bbox_polygon", None)
+    if not polygon or polygon.empty:
+        return None
+    return tuple(polygon.extent)
+
+
+def union_extent(*extents):
+    """
+    Return the extent covering all the provided ones, None if no extent is available
+    """
+    extents = [x for x in extents if x]
+    if not extents:
+        return None
+    return (
+        min(x[0] for x in extents),
+        min(x[1] for x in extents),
+        max(x[2] for x in extents),
+        max(x[3] for x in extents),
+    )
+
+
+def transform_extent(extent, gridset):
+    """
+    Transform an extent in EPSG:4326 to the SRS of the gridset
+    """
+    target_srs = GRIDSET_SRS.get(gridset, gridset)
+    minx, miny, maxx, maxy = extent
+    if target_srs == "EPSG:4326":
+        return extent
+    if target_srs == "EPSG:3857":
+        miny = max(miny, -MERCATOR_MAX_LATITUDE)
+        maxy = min(maxy, MERCATOR_MAX_LATITUDE)
+
+    source = osr.SpatialReference()
+    source.SetFromUserInput("EPSG:4326")
+    source.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    target = osr.SpatialReference()
+    target.SetFromUserInput(target_srs)
+    target.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    transformation = osr.CoordinateTransformation(source, target)
+    return tuple(transformation.TransformBounds(minx, miny, maxx, maxy, 21))
+
+
+def build_seed_request(
+    layer, gridset, extent, seed_type, zoom_start, zoom_stop, tile_format, threads=1
+) -> dict:
+    return {
+        "seedRequest": {
+            "name": layer,
+            "bounds": {"coords": {"double": list(transform_extent(extent, gridset))}},
+            "gridSetId": gridset,
+            "zoomStart": zoom_start,
+            "zoomStop": zoom_stop,
+            "format": tile_format,
+            "type": seed_type,
+            "threadCount": threads,
+        }
+    }
+
+
+def send_seed_requests(catalog, layer, requests) -> list:
+    """
+    Send the seed requests to GeoWebCache, the calls are retried on 5xx answers.
+    A 4xx answer means that the gridset or the format is not cached
+    for the layer, so there is nothing to do
+    """
+    gwc_url = re.sub(r"/rest$", "/gwc/rest", catalog.service_url.rstrip("/"))
+    client = AsyncGeoServerClient(catalog)
+    responses = client.run(
+        *[
+            client.request(
+                "post",
+                f"{gwc_url}/seed/{layer}.json",
+                data=json.dumps(_request),
+                headers={"Content-Type": "application/json"},
+            )
+            for _request in requests
+        ]
+    )
+    for _request, response in zip(requests, responses):
+        if response.status_code >= 400:
+            seed = _request["seedRequest"]
+            logger.info(
+                f"GWC {seed['type']} skipped for {layer} {seed['gridSetId']} {seed['format']}: {response.status_code}"
+            )
+    return responses
+
+
+def truncate_tiles(
+    catalog, layer, extent, gridsets=IMPORTER_GWC_GRIDSETS, formats=IMPORTER_GWC_FORMATS
+):
+    """
+    Remove from GeoWebCache only the tiles of the layer inside the extent
+    """
+    return send_seed_requests(
+        catalog,
+        layer,
+        [
+            build_seed_request(
+                layer, gridset, extent, "truncate", 0, TRUNCATE_ZOOM_STOP, tile_format
+            )
+            for gridset in gridsets
+            for tile_format in formats
+        ],
+    )
+
+
+def seed_tiles(
+    catalog,
+    layer,
+    extent,
+    seed_type="seed",
+    gridsets=IMPORTER_GWC_GRIDSETS,
+    formats=IMPORTER_GWC_FORMATS,
+    zoom_start=IMPORTER_GWC_RESEED_ZOOM_START,
+    zoom_stop=IMPORTER_GWC_RESEED_ZOOM_STOP,
+    threads=IMPORTER_GWC_RESEED_THREADS,
+):
+    """
+    Ask GeoWebCache to render the tiles of the layer inside the extent.
+    With seed_type "seed" only the missing tiles are rendered, with "reseed" all of them
+    """
+    return send_seed_requests(
+        catalog,
+        layer,
+        [
+            build_seed_request(
+                layer,
+                gridset,
+                extent,
+                seed_type,
+                zoom_start,
+                zoom_stop,
+                tile_format,
+                threads,
+            )
+            for gridset in gridsets
+            for tile_format in formats
+        ],
+    )
+
+
+def get_seeding_tasks(catalog, layer=None) -> list:
+    """
+    Return the GeoWebCache tasks in progress, of the layer or of all the layers,
+    as lists of [tiles done, tiles total, seconds remaining, task id, status]
+    """
+    gwc_url = re.sub(r"/rest$", "/gwc/rest", catalog.service_url.rstrip("/"))
+    url = f"{gwc_url}/seed/{layer}.json" if layer else f"{gwc_url}/seed.json"
+    client = AsyncGeoServerClient(catalog)
+    (response,) = client.run(client.request("get", url))
+    if response.status_code >= 400:
+        return []
+    return [
+        x for x in response.json().get("long-array-array", []) if x[4] in GWC_TASK_IN_PROGRESS
+    ]
+
+
+def seed_tiles_if_available(catalog, layer, extent, max_tasks, **kwargs) -> bool:
+    """
+    Submit the seeding only if GeoWebCache is running less than max_tasks tasks.
+    The check and the submission are serialized between the workers with an
+    advisory lock, otherwise concurrent imports could exceed the limit.
+    Return False if there is no free slot
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [GWC_SEED_LOCK_ID])
+        if len(get_seeding_tasks(catalog)) >= max_tasks:
+            return False
+        seed_tiles(catalog, layer, extent, **kwargs)
+        return True
+
+
+def update_seeding_status(execution_id, layer, **status):
+    """
+    Save the seeding status of the layer in the output of the execution,
+    the row is locked since the layers of an execution are seeded in parallel
+    """
+    with transaction.atomic():
+        _exec = (
+            ExecutionRequest.objects.select_for_update()
+            .filter(exec_id=execution_id)
+            .first()
+        )
+        if not _exec:
+            return
+        output_params = _exec.output_params or {}
+        output_params["seeding"] = {
+            **output_params.get("seeding", {}),
+            layer: {**status, "updated": timezone.now().isoformat()},
+        }
+        ExecutionRequest.objects.filter(pk=_exec.pk).update(output_params=output_params)
+
+
+def has_parameter_filters(catalog, layer) -> bool:
+    """
+    True if the GeoWebCache layer caches the tiles by parameters (styles, CQL, time...)
+    or if its configuration is not available
+    """
+    gwc_url = re.sub(r"/rest$", "/gwc/rest", catalog.service_url.rstrip("/"))
+    client = AsyncGeoServerClient(catalog)
+    (response,) = client.run(client.request("get", f"{gwc_url}/layers/{layer}.json"))
+    if response.status_code >= 400:
+        return True
+    return bool(response.json().get("GeoServerLayer", {}).get("parameterFilters"))
+
+
+def invalidate_dataset_tiles(catalog, dataset, previous_extent=None):
+    """
+    Invalidate the cached tiles of an overwritten dataset.
+    Only the tiles inside the union of the previous and the new extent are truncated.
+    The truncation covers only the configured gridsets and formats with the default
+    parameters, so the whole cache of the layer is removed if the layer has parameter
+    filters, if the extent is not available or if any truncation fails.
+    A 4xx answer means that the gridset or the format is not cached, so is skipped
+    """
+    extent = union_extent(previous_extent, get_dataset_extent(dataset))
+    if IMPORTER_GWC_TARGETED_TRUNCATE and extent:
+        try:
+            if has_parameter_filters(catalog, dataset.alternate):
+                raise Exception("the layer has parameter filters")
+            responses = truncate_tiles(catalog, dataset.alternate, extent)
+            if any(x.status_code >= 500 for x in responses):
+                raise Exception("GeoWebCache failed a truncate request")
+        except Exception as e:
+            logger.warning(
+                f"Targeted truncation of {dataset.alternate} not possible: {e}, the whole cache is removed"
+            )
+            extent = None
+    else:
+        extent = None
+
+    if not extent:
+        delete_dataset_cache(dataset.alternate)
+        set_geowebcache_invalidate_cache(dataset.typename)
+        return
+
+    if IMPORTER_GWC_RESEED:
+        from importer.celery_tasks import reseed_gwc_tiles
+
+        reseed_gwc_tiles.apply_async((dataset.alternate, list(extent)))
@@ -5,6 +5,7 @@ from typing import List
 from geonode.resource.enumerator import ExecutionRequestAction as exa
 from geonode.layers.models import Dataset
 from importer.api.exception import ImportException
+from importer.settings import IMPORTER_ASYNC_THUMBNAILS, IMPORTER_GWC_SEED
 from importer.utils import ImporterRequestAction as ira, find_key_recursively
 from django_celery_results.models import TaskResult
 from django.db.models import Q
@@ -36,6 +37,14 @@ class BaseHandler(ABC):
         ira.ROLLBACK.value: (),
     }
 
+    # True if the file can be read remotely via /vsicurl/ (file_url_mode=vsicurl)
+    # since the validation and the import read it only with GDAL/OGR
+    REMOTE_READ_SUPPORTED = False
+
+    # True if the resource is published as a local GeoServer layer,
+    # so its tiles can be seeded in GeoWebCache at the end of the import
+    SEED_SUPPORTED = False
+
     def __str__(self):
         return f"{self.__module__}.{self.__class__.__name__}"
 
@@ -52,9 +61,21 @@ class BaseHandler(ABC):
 
     @classmethod
     def get_task_list(cls, action) -> tuple:
+        """
+        If enabled, the seeding of the tiles is added as last step of the import
+        of the resources published as a local GeoServer layer
+        """
         if action not in cls.ACTIONS:
             raise Exception("The requested action is not implemented yet")
-        return cls.ACTIONS.get(action)
+        tasks = cls.ACTIONS.get(action)
+        if (
+            IMPORTER_GWC_SEED
+            and cls.SEED_SUPPORTED
+            and action == exa.IMPORT.value
+            and tasks[-1] == "importer.create_geonode_resource"
+        ):
+            tasks = tasks + ("importer.seed_resource",)
+        return tasks
 
     @property
     def default_geometry_column_name(self):
@@ -92,9 +113,11 @@ class BaseHandler(ABC):
         return True
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
-        Define basic validation steps
+        Define basic validation steps.
+        With check_parallelism False the parallel uploads limit of the user is not
+        evaluated, used by the children of a batch upload
         """
         return NotImplementedError
 
@@ -132,6 +155,33 @@ class BaseHandler(ABC):
         """
         return []
 
+    @staticmethod
+    def has_uploaded_file(_exec, key) -> bool:
+        """
+        True if the optional file (eg: xml_file, sld_file) is available for the execution
+        """
+        return bool((_exec.input_params.get("files") or {}).get(key))
+
+    @staticmethod
+    def set_thumbnail(resource):
+        """
+        The thumbnails are generated in background once the execution is completed.
+        If IMPORTER_ASYNC_THUMBNAILS is disabled, the thumbnail is generated immediately
+        """
+        if IMPORTER_ASYNC_THUMBNAILS:
+            return
+        from importer.thumbnails import set_thumbnails
+
+        set_thumbnails([resource])
+
+    def needs_thumbnail(self, resource, _exec) -> bool:
+        """
+        True if the thumbnail of the resource must be generated in background once
+        the execution is completed. To be overridden by the handlers which
+        generate the thumbnail only in some cases
+        """
+        return True
+
     @staticmethod
     def perform_last_step(execution_id):
         """
@@ -156,12 +206,46 @@ class BaseHandler(ABC):
 
         _exec = orchestrator.get_execution_object(execution_id)
 
+        handlers_info = list(
+            ResourceHandlerInfo.objects.filter(execution_request=_exec).select_related(
+                "resource"
+            )
+        )
         resource_output_params = [
             {"detail_url": x.resource.detail_url, "id": x.resource.pk}
-            for x in ResourceHandlerInfo.objects.filter(execution_request=_exec)
+            for x in handlers_info
         ]
         _exec.output_params.update({"resources": resource_output_params})
+        stats = None
+        try:
+            # the throughput of the completed imports is used to estimate the next ones
+            from importer.planning import get_execution_stats
+
+            stats = get_execution_stats(_exec)
+            if stats:
+                _exec.output_params.update({"stats": stats})
+        except Exception as e:
+            logger.warning(f"Error collecting the stats of the execution {execution_id}: {e}")
         _exec.save()
+        if stats:
+            from importer.celery_tasks import collect_tables_stats
+
+            # the tables are analyzed in background, the execution is already completed
+            collect_tables_stats.apply_async((execution_id,))
+        # each handler decides if the thumbnail of its resource is needed
+        thumbnails = [
+            x.resource.pk
+            for x in handlers_info
+            if IMPORTER_ASYNC_THUMBNAILS
+            and orchestrator.load_handler(x.handler_module_path)().needs_thumbnail(
+                x.resource, _exec
+            )
+        ]
+        if thumbnails:
+            from importer.celery_tasks import generate_thumbnails
+
+            # a single task for all the resources of the execution, which is already completed
+            generate_thumbnails.apply_async((thumbnails,))
 
         return _exec
 
@@ -227,6 +311,13 @@ class BaseHandler(ABC):
         """
         return NotImplementedError
 
+    def describe_layers(self, files: dict) -> list:
+        """
+        Read only the metadata of the layers that the import would create,
+        used to plan the import without creating anything
+        """
+        return []
+
     @staticmethod
     def publish_resources(resources: List[str], catalog, store, workspace):
         """
@@ -290,7 +381,7 @@ class BaseHandler(ABC):
     def rollback(
         self, exec_id, rollback_from_step, action_to_rollback, *args, **kwargs
     ):
-        steps = self.ACTIONS.get(action_to_rollback)
+        steps = self.get_task_list(action=action_to_rollback)
         if rollback_from_step not in steps:
             logger.info(f"Step not found {rollback_from_step}, skipping")
             return
@@ -314,11 +405,16 @@ class BaseHandler(ABC):
             f"Starting rollback for execid: {exec_id} resource published was: {instance_name}"
         )
 
-        for step in reversed_steps:
-            normalized_step_name = step.split(".")[-1]
-            if getattr(self, f"_{normalized_step_name}_rollback", None):
-                function = getattr(self, f"_{normalized_step_name}_rollback")
-                function(exec_id, instance_name, *args, **kwargs)
+        # the layers published together are rolled back by a single task
+        instance_names = find_key_recursively(kwargs, "rollback_alternates") or [
+            instance_name
+        ]
+        for instance_name in instance_names:
+            for step in reversed_steps:
+                normalized_step_name = step.split(".")[-1]
+                if getattr(self, f"_{normalized_step_name}_rollback", None):
+                    function = getattr(self, f"_{normalized_step_name}_rollback")
+                    function(exec_id, instance_name, *args, **kwargs)
 
         logger.warning(
             f"Rollback for execid: {exec_id} resource published was: {instance_name} completed"
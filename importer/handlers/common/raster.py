@@ -1,13 +1,23 @@
-import pyproj
 from importer.publisher import DataPublisher
+from importer.rest import AsyncGeoServerClient
 import json
 import logging
+import os
+import shutil
+import time
 from pathlib import Path
 from subprocess import PIPE, Popen
 from typing import List
+from uuid import uuid1
 
 from django.conf import settings
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy
+from geonode.assets.handlers import asset_handler_registry
+from geonode.assets.local import LocalAssetHandler
+from geonode.assets.utils import get_default_asset
 from geonode.base.models import ResourceBase
 from geonode.layers.models import Dataset
 from geonode.resource.enumerator import ExecutionRequestAction as exa
@@ -17,10 +27,32 @@ from importer.api.exception import ImportException
 from importer.celery_tasks import ErrorBaseTaskClass, import_orchestrator
 from importer.handlers.base import BaseHandler
 from importer.handlers.geotiff.exceptions import InvalidGeoTiffException
-from importer.handlers.utils import create_alternate, should_be_imported
+from importer.handlers.utils import (
+    create_alternate,
+    get_compressed_member,
+    get_target_crs,
+    get_vsi_path,
+    identify_crs_authority,
+    is_compressed_file,
+    link_or_copy_file,
+    open_uncompressed,
+    should_be_imported,
+)
 from importer.models import ResourceHandlerInfo
+from importer.handlers.common.statistics import (
+    generate_stretched_sld,
+    get_raster_statistics,
+    write_statistics_sidecar,
+)
+from importer.settings import (
+    IMPORTER_RASTER_COG,
+    IMPORTER_RASTER_COG_COMPRESSION,
+    IMPORTER_RASTER_COPY_LINKS,
+    IMPORTER_RASTER_STATISTICS,
+)
+from importer.utils import call_rollback_function, error_handler
 from importer.orchestrator import orchestrator
-from osgeo import gdal
+from osgeo import gdal, osr
 from importer.celery_app import importer_app
 from geonode.storage.manager import storage_manager
 
@@ -35,6 +67,26 @@ class BaseRasterFileHandler(BaseHandler):
     It must provide the task_lists required to comple the upload
     """
 
+    SEED_SUPPORTED = True
+
+    @classmethod
+    def get_task_list(cls, action) -> tuple:
+        """
+        If enabled, the raster is converted to COG and its statistics
+        are precomputed before being published
+        """
+        tasks = super().get_task_list(action)
+        if action != exa.IMPORT.value or "importer.publish_resource" not in tasks:
+            return tasks
+        for enabled, step in (
+            (IMPORTER_RASTER_COG, "importer.convert_to_cog"),
+            (IMPORTER_RASTER_STATISTICS, "importer.compute_raster_statistics"),
+        ):
+            if enabled and step not in tasks:
+                index = tasks.index("importer.publish_resource")
+                tasks = tasks[:index] + (step,) + tasks[index:]
+        return tasks
+
     @property
     def default_geometry_column_name(self):
         return "geometry"
@@ -54,7 +106,7 @@ class BaseRasterFileHandler(BaseHandler):
         return default, False
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps
         """
@@ -111,6 +163,7 @@ class BaseRasterFileHandler(BaseHandler):
             "overwrite_existing_layer": _data.pop("overwrite_existing_layer", "False"),
             "store_spatial_file": _data.pop("store_spatial_files", "True"),
             "source": _data.pop("source", "upload"),
+            "target_crs": get_target_crs(_data),
         }, _data
 
     @staticmethod
@@ -147,33 +200,45 @@ class BaseRasterFileHandler(BaseHandler):
         return self.publish_resources([resource], catalog, store, workspace)
 
     def _delete_store(self, resource, catalog, workspace):
-        store = None
-        possible_layer_name = [
-            resource.get("name"),
-            resource.get("name").split(":")[-1],
-            f"{workspace.name}:{resource.get('name')}",
-        ]
-        for el in possible_layer_name:
-            store = catalog.get_store(el, workspace=workspace)
-            if store:
-                break
-        if store:
-            catalog.delete(store, purge="all", recurse=True)
-        return store
+        return self._delete_geoserver_object(
+            resource, catalog, workspace, catalog.get_store
+        )
 
     def _delete_resource(self, resource, catalog, workspace):
-        res = None
+        self._delete_geoserver_object(
+            resource, catalog, workspace, catalog.get_resource
+        )
+
+    @staticmethod
+    def _delete_geoserver_object(resource, catalog, workspace, lookup):
+        """
+        Look for the object with the possible names of the resource and delete it.
+        The calls go through the AsyncGeoServerClient, so they are retried on transient errors
+        """
+        client = AsyncGeoServerClient(catalog)
         possible_layer_name = [
             resource.get("name"),
             resource.get("name").split(":")[-1],
             f"{workspace.name}:{resource.get('name')}",
         ]
+        _object = None
         for el in possible_layer_name:
-            res = catalog.get_resource(el, workspace=workspace)
-            if res:
+            (_object,) = client.run(
+                client.call(f"get {el}", lookup, el, workspace=workspace)
+            )
+            if _object:
                 break
-        if res:
-            catalog.delete(res, purge="all", recurse=True)
+        if _object:
+            client.run(
+                client.call(
+                    f"delete {_object.name}",
+                    catalog.delete,
+                    _object,
+                    purge="all",
+                    recurse=True,
+                )
+            )
+        return _object
 
     @staticmethod
     def delete_resource(instance):
@@ -219,29 +284,282 @@ class BaseRasterFileHandler(BaseHandler):
         ]
 
     def identify_authority(self, layer):
-        try:
-            layer_wkt = layer.GetSpatialRef().ExportToWkt()
-            _name = "EPSG"
-            _code = pyproj.CRS(layer_wkt).to_epsg(min_confidence=20)
-            if _code is None:
-                layer_proj4 = layer.GetSpatialRef().ExportToProj4()
-                _code = pyproj.CRS(layer_proj4).to_epsg(min_confidence=20)
-                if _code is None:
-                    raise Exception(
-                        "CRS authority code not found, fallback to default behaviour"
-                    )
-        except Exception:
-            spatial_ref = layer.GetSpatialRef()
-            spatial_ref.AutoIdentifyEPSG()
-            _name = spatial_ref.GetAuthorityName(None) or spatial_ref.GetAttrValue(
-                "AUTHORITY", 0
+        # the resolution is cached, the layers of an upload usually share the same CRS
+        return identify_crs_authority(layer.GetSpatialRef())
+
+    def describe_layers(self, files: dict) -> list:
+        """
+        Read the metadata of the raster without importing it,
+        the compressed rasters are read via the GDAL virtual file systems
+        """
+        base_file = files.get("base_file")
+        raster = gdal.Open(
+            get_vsi_path(base_file, extensions=("tif", "tiff", "geotif", "geotiff"))
+        )
+        if not raster:
+            raise InvalidGeoTiffException("The provided raster cannot be opened")
+        crs = self.identify_authority(raster) if raster.GetSpatialRef() else None
+        return [
+            {
+                "name": Path(base_file).stem,
+                "crs": crs,
+                "geometry_type": "Raster",
+                "feature_count": None,
+                "width": raster.RasterXSize,
+                "height": raster.RasterYSize,
+                "fields": [
+                    {
+                        "name": f"band_{i}",
+                        "type": gdal.GetDataTypeName(raster.GetRasterBand(i).DataType),
+                    }
+                    for i in range(1, raster.RasterCount + 1)
+                ],
+                "will_be_imported": True,
+                "reason": None,
+            }
+        ]
+
+    def prepare_import(self, files, execution_id, **kwargs):
+        """
+        Before the import begins the raster is decompressed (if provided as
+        gzip/tar archive) and reprojected to the target CRS (if requested).
+        The files (and the execution input_params) are updated in place
+        so the next steps will use the prepared raster
+        """
+        base_file = files.get("base_file")
+        if not base_file:
+            return
+        if is_compressed_file(base_file):
+            self.decompress_raster(files, execution_id)
+        self.reproject_raster(files, execution_id)
+
+    def decompress_raster(self, files, execution_id):
+        """
+        GeoServer is not able to read a raster through the GDAL virtual
+        file systems, so the GeoTIFF provided as gzip/tar archive
+        is decompressed next to the archive
+        """
+        base_file = files.get("base_file")
+
+        extensions = ("tif", "tiff", "geotif", "geotiff")
+        member = get_compressed_member(base_file, extensions=extensions)
+        if not member:
+            raise InvalidGeoTiffException(
+                "The provided archive does not contain any GeoTIFF"
             )
-            _code = (
-                spatial_ref.GetAuthorityCode("PROJCS")
-                or spatial_ref.GetAuthorityCode("GEOGCS")
-                or spatial_ref.GetAttrValue("AUTHORITY", 1)
+
+        raster_path = os.path.join(
+            os.path.dirname(base_file), os.path.basename(member)
+        )
+        with open_uncompressed(base_file, extensions) as _compressed, open(
+            raster_path, "wb"
+        ) as _raster:
+            shutil.copyfileobj(_compressed, _raster, length=16 * 1024 * 1024)
+
+        files["base_file"] = raster_path
+        _exec = self._get_execution_request_object(execution_id)
+        orchestrator.update_execution_request_status(
+            execution_id=str(execution_id),
+            input_params={
+                **_exec.input_params,
+                "files": {**_exec.input_params.get("files", {}), **files},
+            },
+        )
+
+        # the decompressed raster must be part of the asset, so it is removed with the resource
+        self._add_file_to_asset(_exec, raster_path)
+
+    def reproject_raster(self, files, execution_id):
+        """
+        Warp the raster to the target CRS requested for the upload.
+        The warped raster replace the base_file of the execution, while the
+        native CRS is kept in the input_params so it can be saved with the resource
+        """
+        _exec = self._get_execution_request_object(execution_id)
+        target_crs = _exec.input_params.get("target_crs") if _exec else None
+        raster_path = files.get("base_file")
+        if not target_crs or raster_path == _exec.input_params.get("warped_file"):
+            return
+
+        dataset = gdal.Open(raster_path)
+        spatial_ref = dataset.GetSpatialRef()
+        target_ref = osr.SpatialReference()
+        target_ref.SetFromUserInput(target_crs)
+        if spatial_ref is None or spatial_ref.IsSame(target_ref):
+            # without a CRS the raster cannot be published, the error is raised by the publishing
+            dataset = None
+            return
+        native_crs = self.identify_authority(dataset)
+
+        warped_path = os.path.join(
+            os.path.dirname(raster_path),
+            f"{Path(raster_path).stem}_{target_crs.replace(':', '_').lower()}.tif",
+        )
+        start = time.perf_counter()
+        gdal.Warp(
+            warped_path,
+            dataset,
+            dstSRS=target_crs,
+            # if the COG is enabled, the raster is warped directly to COG so the conversion is skipped
+            format="COG" if IMPORTER_RASTER_COG else "GTiff",
+            multithread=True,
+            warpOptions=["NUM_THREADS=ALL_CPUS"],
+            creationOptions=(
+                [
+                    f"COMPRESS={IMPORTER_RASTER_COG_COMPRESSION}",
+                    "NUM_THREADS=ALL_CPUS",
+                    "OVERVIEWS=AUTO",
+                    "BIGTIFF=IF_SAFER",
+                ]
+                if IMPORTER_RASTER_COG
+                else ["TILED=YES", "BIGTIFF=IF_SAFER"]
+            ),
+        )
+        dataset = None
+        reprojection_stats = {
+            "native_crs": native_crs,
+            "target_crs": target_crs,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"Raster {raster_path} reprojected: {reprojection_stats}")
+
+        files["base_file"] = warped_path
+        orchestrator.update_execution_request_status(
+            execution_id=str(execution_id),
+            input_params={
+                **_exec.input_params,
+                "files": {**_exec.input_params.get("files", {}), **files},
+                "warped_file": warped_path,
+                "native_crs": native_crs,
+            },
+            output_params={
+                **(_exec.output_params or {}),
+                "reprojection": reprojection_stats,
+            },
+        )
+        self._add_file_to_asset(_exec, warped_path)
+
+    def _add_file_to_asset(self, _exec: ExecutionRequest, *paths: str):
+        if not _exec.input_params.get("asset_id"):
+            return
+        asset = (
+            import_string(_exec.input_params.get("asset_module_path"))
+            .objects.filter(id=_exec.input_params.get("asset_id"))
+            .first()
+        )
+        if not asset:
+            return
+        new_paths = [path for path in paths if path not in asset.location]
+        if new_paths:
+            asset.location.extend(new_paths)
+            asset.save()
+
+    @staticmethod
+    def is_cog(raster_path: str) -> bool:
+        info = gdal.Info(raster_path, format="json")
+        return (
+            info.get("metadata", {}).get("IMAGE_STRUCTURE", {}).get("LAYOUT") == "COG"
+        )
+
+    def convert_to_cog(self, execution_id: str) -> dict:
+        """
+        Convert the raster of the execution to a Cloud Optimized GeoTIFF
+        (tiled, compressed and with internal overviews).
+        The COG replace the base_file of the execution, so is the one published.
+        Returns the size and timing of the conversion
+        """
+        _exec = self._get_execution_request_object(execution_id)
+        files = _exec.input_params.get("files", {})
+        raster_path = files.get("base_file")
+        if self.is_cog(raster_path):
+            logger.info(f"The raster {raster_path} is already a COG, skipping")
+            return {}
+
+        cog_path = os.path.join(
+            os.path.dirname(raster_path), f"{Path(raster_path).stem}_cog.tif"
+        )
+        start = time.perf_counter()
+        gdal.Translate(
+            cog_path,
+            raster_path,
+            format="COG",
+            creationOptions=[
+                f"COMPRESS={IMPORTER_RASTER_COG_COMPRESSION}",
+                "NUM_THREADS=ALL_CPUS",
+                "OVERVIEWS=AUTO",
+                "BIGTIFF=IF_SAFER",
+            ],
+        )
+        cog_stats = {
+            "original_size": os.path.getsize(raster_path),
+            "cog_size": os.path.getsize(cog_path),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"Raster {raster_path} converted to COG: {cog_stats}")
+
+        orchestrator.update_execution_request_status(
+            execution_id=str(execution_id),
+            input_params={
+                **_exec.input_params,
+                "files": {**files, "base_file": cog_path},
+                "cog_file": cog_path,
+            },
+            output_params={**(_exec.output_params or {}), "cog": cog_stats},
+        )
+        self._add_file_to_asset(_exec, cog_path)
+        return cog_stats
+
+    def compute_statistics(self, execution_id: str, layer_name: str = None) -> list:
+        """
+        Precompute statistics and histograms of the bands, so GeoServer and GeoNode
+        do not evaluate them lazily on the first style or legend request.
+        Are saved in the .aux.xml sidecar of the raster and, if no SLD
+        is uploaded, are used to generate a stretched default style
+        """
+        _exec = self._get_execution_request_object(execution_id)
+        files = _exec.input_params.get("files", {})
+        raster_path = files.get("base_file")
+
+        start = time.perf_counter()
+        statistics = get_raster_statistics(raster_path)
+        statistics_file = write_statistics_sidecar(raster_path, statistics)
+        self._add_file_to_asset(_exec, statistics_file)
+        logger.info(
+            f"Statistics of {raster_path} computed in {time.perf_counter() - start:.3f} seconds"
+        )
+
+        extra_params = {}
+        sld = None if files.get("sld_file") else generate_stretched_sld(
+            layer_name or Path(raster_path).stem, statistics
+        )
+        if sld:
+            sld_path = os.path.join(
+                os.path.dirname(raster_path), f"{Path(raster_path).stem}_stretched.sld"
             )
-        return f"{_name}:{_code}"
+            with open(sld_path, "w") as _sld:
+                _sld.write(sld)
+            self._add_file_to_asset(_exec, sld_path)
+            # the generated style is handled as an uploaded one
+            files = {**files, "sld_file": sld_path}
+            extra_params["generated_sld"] = sld_path
+
+        orchestrator.update_execution_request_status(
+            execution_id=str(execution_id),
+            input_params={
+                **_exec.input_params,
+                "files": files,
+                "statistics_file": statistics_file,
+                **extra_params,
+            },
+        )
+        return statistics
+
+    def get_raster_layers(self, files: dict, _exec: ExecutionRequest) -> List[str]:
+        """
+        Return the name of the layers to import.
+        By default the raster is imported as a single layer
+        """
+        return [self.fixup_name(Path(files.get("base_file")).stem)]
 
     def import_resource(self, files: dict, execution_id: str, **kwargs) -> str:
         """
@@ -250,27 +568,28 @@ class BaseRasterFileHandler(BaseHandler):
         data inside the geonode_data database
         """
         # for the moment we skip the dyanamic model creation
-        logger.info("Total number of layers available: 1")
         _exec = self._get_execution_request_object(execution_id)
-        _input = {**_exec.input_params, **{"total_layers": 1}}
+        layers = self.get_raster_layers(files, _exec)
+        logger.info(f"Total number of layers available: {len(layers)}")
+        _input = {**_exec.input_params, **{"total_layers": len(layers)}}
         orchestrator.update_execution_request_status(
             execution_id=str(execution_id), input_params=_input
         )
 
         try:
-            filename = Path(files.get("base_file")).stem
-            # start looping on the layers available
-            layer_name = self.fixup_name(filename)
-
+            result = workspace = None
             should_be_overwritten = _exec.input_params.get("overwrite_existing_layer")
-            # should_be_imported check if the user+layername already exists or not
-            if should_be_imported(
-                layer_name,
-                _exec.user,
-                skip_existing_layer=_exec.input_params.get("skip_existing_layer"),
-                overwrite_existing_layer=should_be_overwritten,
-            ):
-                workspace = DataPublisher(None).workspace
+            # start looping on the layers available
+            for layer_name in layers:
+                # should_be_imported check if the user+layername already exists or not
+                if not should_be_imported(
+                    layer_name,
+                    _exec.user,
+                    skip_existing_layer=_exec.input_params.get("skip_existing_layer"),
+                    overwrite_existing_layer=should_be_overwritten,
+                ):
+                    continue
+                workspace = workspace or DataPublisher(None).workspace
                 user_datasets = Dataset.objects.filter(alternate=f"{workspace.name}:{layer_name}")
 
                 dataset_exists = user_datasets.exists()
@@ -296,12 +615,12 @@ class BaseRasterFileHandler(BaseHandler):
                         exa.IMPORT.value,
                     )
                 )
-                return layer_name, alternate, execution_id
+                result = layer_name, alternate, execution_id
+            return result
 
         except Exception as e:
             logger.error(e)
             raise e
-        return
 
     def create_geonode_resource(
         self,
@@ -329,11 +648,13 @@ class BaseRasterFileHandler(BaseHandler):
         _overwrite = _exec.input_params.get("overwrite_existing_layer", False)
         # if the layer exists, we just update the information of the dataset by
         # let it recreate the catalogue
-        if not saved_dataset.exists() and _overwrite:
+        if _overwrite and not saved_dataset.exists():
             logger.warning(
                 f"The dataset required {alternate} does not exists, but an overwrite is required, the resource will be created"
             )
 
+        # the creation synchronizes the dataset with GeoServer and assigns
+        # the default style of the layer, so the returned instance is up to date
         saved_dataset = resource_manager.create(
             None,
             resource_type=resource_type,
@@ -350,16 +671,16 @@ class BaseRasterFileHandler(BaseHandler):
             custom=custom,
         )
 
-        saved_dataset.refresh_from_db()
-
-        self.handle_xml_file(saved_dataset, _exec)
-        self.handle_sld_file(saved_dataset, _exec)
-
-        resource_manager.set_thumbnail(None, instance=saved_dataset)
+        # the hooks are needed only for the uploaded files
+        if self.has_uploaded_file(_exec, "xml_file"):
+            self.handle_xml_file(saved_dataset, _exec)
+        if self.has_uploaded_file(_exec, "sld_file"):
+            self.handle_sld_file(saved_dataset, _exec)
 
-        ResourceBase.objects.filter(alternate=alternate).update(dirty_state=False)
+        self.set_thumbnail(saved_dataset)
 
-        saved_dataset.refresh_from_db()
+        ResourceBase.objects.filter(pk=saved_dataset.pk).update(dirty_state=False)
+        saved_dataset.dirty_state = False
         return saved_dataset
 
     def overwrite_geonode_resource(
@@ -385,13 +706,14 @@ class BaseRasterFileHandler(BaseHandler):
 
             dataset = resource_manager.update(dataset.uuid, instance=dataset)
 
-            self.handle_xml_file(dataset, _exec)
-            self.handle_sld_file(dataset, _exec)
+            # the dataset is already synchronized by the update and keeps its style,
+            # the hooks are needed only for the uploaded files
+            if self.has_uploaded_file(_exec, "xml_file"):
+                self.handle_xml_file(dataset, _exec)
+            if self.has_uploaded_file(_exec, "sld_file"):
+                self.handle_sld_file(dataset, _exec)
 
-            resource_manager.set_thumbnail(
-                dataset.uuid, instance=dataset, overwrite=True
-            )
-            dataset.refresh_from_db()
+            self.set_thumbnail(dataset)
             return dataset
         elif not dataset.exists() and _overwrite:
             logger.warning(
@@ -476,13 +798,19 @@ class BaseRasterFileHandler(BaseHandler):
         new_alternate: str,
         **kwargs,
     ):
+        new_file_location = kwargs.get("kwargs", {}).get("new_file_location", {})
+        asset = new_file_location.get("asset", [])
+        if new_file_location.get("asset_module_path"):
+            asset = (
+                import_string(new_file_location["asset_module_path"])
+                .objects.filter(pk=new_file_location.get("asset_id"))
+                .first()
+            )
         resource = self.create_geonode_resource(
             layer_name=data_to_update.get("title"),
             alternate=new_alternate,
             execution_id=str(_exec.exec_id),
-            asset=kwargs.get("kwargs", {})
-            .get("new_file_location", {})
-            .get("asset", []),
+            asset=asset,
         )
         resource.refresh_from_db()
         return resource
@@ -491,18 +819,86 @@ class BaseRasterFileHandler(BaseHandler):
         return ExecutionRequest.objects.filter(exec_id=execution_id).first()
 
     @staticmethod
-    def copy_original_file(dataset):
+    def copy_original_file(dataset, owner=None):
         """
-        Copy the original file into a new location
+        Copy the original file into a new location.
+        The local files are cloned or hardlinked when possible, so the
+        data of the raster is not rewritten. Remote storages use the storage_manager.
+        The copied files are saved in a new asset, so each dataset removes only its own
+        files (a hardlink keeps the data until the last path is deleted)
         """
-        return storage_manager.copy(dataset)
+        files = dataset.files or []
+        if not files or not all(os.path.isfile(_file) for _file in files):
+            return storage_manager.copy(dataset)
+
+        # the copy is saved with the assets, usually on the same filesystem of the original
+        target_dir = LocalAssetHandler()._create_asset_dir()
+        suffix = uuid1().hex[:8]
+        new_files = []
+        start = time.perf_counter()
+        for _file in files:
+            name, ext = os.path.splitext(os.path.basename(_file))
+            target = os.path.join(target_dir, f"{name}_{suffix}{ext}")
+            method = link_or_copy_file(
+                _file, target, allow_links=IMPORTER_RASTER_COPY_LINKS
+            )
+            logger.info(f"File {_file} copied to {target} with {method}")
+            new_files.append(target)
+        logger.info(
+            f"Files of {dataset.alternate} copied in {time.perf_counter() - start:.3f} seconds"
+        )
+        original_asset = get_default_asset(dataset)
+        try:
+            asset = asset_handler_registry.get_default_handler().create(
+                title="Original",
+                owner=owner or dataset.owner,
+                description=None,
+                type=original_asset.type if original_asset else dataset.subtype,
+                files=new_files,
+                clone_files=False,
+            )
+        except Exception:
+            shutil.rmtree(target_dir, ignore_errors=True)
+            raise
+        # the task kwargs are serialized as json, so the asset is passed by id
+        return {
+            "files": new_files,
+            "asset_id": asset.id,
+            "asset_module_path": f"{asset.__module__}.{asset.__class__.__name__}",
+        }
 
     def _import_resource_rollback(self, exec_id, istance_name=None, *args, **kwargs):
         """
         In the raster, this step just generate the alternate, no real action
-        are done on the database
+        are done on the database. Only the raster warped to the target CRS is removed
         """
-        pass
+        _exec = self._get_execution_request_object(exec_id)
+        warped_path = _exec.input_params.get("warped_file") if _exec else None
+        if warped_path and os.path.exists(warped_path):
+            os.remove(warped_path)
+
+    def _convert_to_cog_rollback(self, exec_id, instance_name=None, *args, **kwargs):
+        """
+        Remove the COG generated from the original raster
+        """
+        _exec = self._get_execution_request_object(exec_id)
+        cog_path = _exec.input_params.get("cog_file") if _exec else None
+        if cog_path and os.path.exists(cog_path):
+            os.remove(cog_path)
+
+    def _compute_raster_statistics_rollback(
+        self, exec_id, instance_name=None, *args, **kwargs
+    ):
+        """
+        Remove the .aux.xml sidecar and the style generated from the statistics
+        """
+        _exec = self._get_execution_request_object(exec_id)
+        if not _exec:
+            return
+        for key in ("statistics_file", "generated_sld"):
+            _path = _exec.input_params.get(key)
+            if _path and os.path.exists(_path):
+                os.remove(_path)
 
     def _publish_resource_rollback(self, exec_id, instance_name=None, *args, **kwargs):
         """
@@ -545,7 +941,10 @@ def copy_raster_file(
 
     new_file_location = orchestrator.load_handler(
         handler_module_path
-    ).copy_original_file(original_dataset)
+    ).copy_original_file(
+        original_dataset,
+        owner=orchestrator.get_execution_object(exec_id).user,
+    )
 
     new_dataset_alternate = create_alternate(original_dataset.title, exec_id)
 
@@ -568,3 +967,110 @@ def copy_raster_file(
     import_orchestrator.apply_async(task_params, additional_kwargs)
 
     return "copy_raster", layer_name, alternate, exec_id
+
+
+@importer_app.task(
+    base=ErrorBaseTaskClass,
+    name="importer.convert_to_cog",
+    queue="importer.convert_to_cog",
+    max_retries=1,
+    acks_late=False,
+    ignore_result=False,
+    task_track_started=True,
+)
+def convert_to_cog(
+    exec_id, actual_step, layer_name, alternate, handler_module_path, action, **kwargs
+):
+    """
+    Convert the imported raster into a Cloud Optimized GeoTIFF before the publishing
+    """
+    try:
+        orchestrator.update_execution_request_status(
+            execution_id=exec_id,
+            last_updated=timezone.now(),
+            func_name="convert_to_cog",
+            step=gettext_lazy("importer.convert_to_cog"),
+        )
+
+        orchestrator.load_handler(handler_module_path)().convert_to_cog(exec_id)
+
+        task_params = (
+            {},
+            exec_id,
+            handler_module_path,
+            actual_step,
+            layer_name,
+            alternate,
+            action,
+        )
+        kwargs = kwargs.get("kwargs") if "kwargs" in kwargs else kwargs
+
+        import_orchestrator.apply_async(task_params, kwargs)
+        return "convert_to_cog", layer_name, alternate, exec_id
+    except Exception as e:
+        call_rollback_function(
+            exec_id,
+            handlers_module_path=handler_module_path,
+            prev_action=action,
+            layer=layer_name,
+            alternate=alternate,
+            error=e,
+            **kwargs,
+        )
+        raise InvalidGeoTiffException(detail=error_handler(e, exec_id))
+
+
+@importer_app.task(
+    base=ErrorBaseTaskClass,
+    name="importer.compute_raster_statistics",
+    queue="importer.compute_raster_statistics",
+    max_retries=1,
+    acks_late=False,
+    ignore_result=False,
+    task_track_started=True,
+)
+def compute_raster_statistics(
+    exec_id, actual_step, layer_name, alternate, handler_module_path, action, **kwargs
+):
+    """
+    Precompute the statistics of the raster before the publishing.
+    The statistics are sent to the next steps, so are saved in the ResourceHandlerInfo
+    """
+    try:
+        orchestrator.update_execution_request_status(
+            execution_id=exec_id,
+            last_updated=timezone.now(),
+            func_name="compute_raster_statistics",
+            step=gettext_lazy("importer.compute_raster_statistics"),
+        )
+
+        statistics = orchestrator.load_handler(handler_module_path)().compute_statistics(
+            exec_id, layer_name=alternate
+        )
+
+        task_params = (
+            {},
+            exec_id,
+            handler_module_path,
+            actual_step,
+            layer_name,
+            alternate,
+            action,
+        )
+        kwargs = kwargs.get("kwargs") if "kwargs" in kwargs else kwargs
+
+        import_orchestrator.apply_async(
+            task_params, {**(kwargs or {}), "statistics": statistics}
+        )
+        return "compute_raster_statistics", layer_name, alternate, exec_id
+    except Exception as e:
+        call_rollback_function(
+            exec_id,
+            handlers_module_path=handler_module_path,
+            prev_action=action,
+            layer=layer_name,
+            alternate=alternate,
+            error=e,
+            **kwargs,
+        )
+        raise InvalidGeoTiffException(detail=error_handler(e, exec_id))
@@ -199,7 +199,7 @@ class BaseRemoteResourceHandler(BaseHandler):
             ),
             custom=custom,
         )
-        resource_manager.set_thumbnail(None, instance=resource)
+        self.set_thumbnail(resource)
 
         resource = self.create_link(resource, params, alternate)
         ResourceBase.objects.filter(alternate=alternate).update(dirty_state=False)
@@ -269,9 +269,7 @@ class BaseRemoteResourceHandler(BaseHandler):
             resource = resource_manager.update(
                 resource.uuid, instance=resource
             )
-            resource_manager.set_thumbnail(
-                resource.uuid, instance=resource, overwrite=True
-            )
+            self.set_thumbnail(resource)
             resource.refresh_from_db()
             return resource
         elif not resource.exists() and _overwrite:
@@ -0,0 +1,307 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
+import numpy as np
+from osgeo import gdal
+
+from importer.settings import (
+    IMPORTER_RASTER_STATISTICS_BINS,
+    IMPORTER_RASTER_STATISTICS_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+# rows processed by each task, rounded to the block height of the raster.
+# Inside a task the raster is read one block at a time
+WINDOW_ROWS = 1024
+# percentiles used to stretch the default style
+STRETCH_PERCENTILES = (2, 98)
+EMPTY_MOMENTS = {"count": 0, "nodata": 0}
+
+SLD_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<StyledLayerDescriptor version="1.0.0"
+    xmlns="http://www.opengis.net/sld"
+    xmlns:ogc="http://www.opengis.net/ogc"
+    xmlns:xlink="http://www.w3.org/1999/xlink"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xsi:schemaLocation="http://www.opengis.net/sld http://schemas.opengis.net/sld/1.0.0/StyledLayerDescriptor.xsd">
+  <NamedLayer>
+    <Name>{name}</Name>
+    <UserStyle>
+      <Title>{name}</Title>
+      <FeatureTypeStyle>
+        <Rule>
+          <RasterSymbolizer>
+            <Opacity>1.0</Opacity>
+            <ChannelSelection>{channels}
+            </ChannelSelection>
+          </RasterSymbolizer>
+        </Rule>
+      </FeatureTypeStyle>
+    </UserStyle>
+  </NamedLayer>
+</StyledLayerDescriptor>
+"""
+
+SLD_CHANNEL_TEMPLATE = """
+              <{channel}>
+                <SourceChannelName>{band}</SourceChannelName>
+                <ContrastEnhancement>
+                  <Normalize>
+                    <VendorOption name="algorithm">StretchToMinimumMaximum</VendorOption>
+                    <VendorOption name="minValue">{min}</VendorOption>
+                    <VendorOption name="maxValue">{max}</VendorOption>
+                  </Normalize>
+                </ContrastEnhancement>
+              </{channel}>"""
+
+
+def _read_valid_values(band, xoff, yoff, xsize, ysize):
+    """
+    Read a block of the band and return the valid values
+    together with the number of nodata pixels
+    """
+    data = band.ReadAsArray(xoff, yoff, xsize, ysize)
+    nodata = band.GetNoDataValue()
+
+    valid = np.ones(data.shape, dtype=bool)
+    if nodata is not None:
+        valid &= data != nodata
+    if np.issubdtype(data.dtype, np.floating):
+        valid &= np.isfinite(data)
+    return data[valid].astype(np.float64), int(data.size - np.count_nonzero(valid))
+
+
+def _iter_blocks(raster_path, band_index, yoff, ysize):
+    """
+    Yield the valid values of the blocks in the rows of the window, one block at a time.
+    Each task opens its own dataset, the GDAL handles are not thread safe
+    """
+    dataset = gdal.Open(raster_path)
+    band = dataset.GetRasterBand(band_index)
+    xblock, yblock = band.GetBlockSize()
+    for block_yoff in range(yoff, yoff + ysize, yblock):
+        block_ysize = min(yblock, yoff + ysize - block_yoff)
+        for xoff in range(0, band.XSize, xblock):
+            yield _read_valid_values(
+                band, xoff, block_yoff, min(xblock, band.XSize - xoff), block_ysize
+            )
+    dataset = None
+
+
+def _values_moments(values, nodata_count) -> dict:
+    if not values.size:
+        return {"count": 0, "nodata": nodata_count}
+    mean = float(values.mean())
+    return {
+        "count": int(values.size),
+        "nodata": nodata_count,
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": mean,
+        # sum of the squared deviations from the mean of the block
+        "m2": float(np.square(values - mean).sum()),
+    }
+
+
+def combine_moments(first, second) -> dict:
+    """
+    Combine the moments of two sets of values with the parallel algorithm of Chan et al.,
+    the variance does not lose precision with large values as the sum of squares does
+    """
+    nodata = first["nodata"] + second["nodata"]
+    if not second["count"]:
+        return {**first, "nodata": nodata}
+    if not first["count"]:
+        return {**second, "nodata": nodata}
+    count = first["count"] + second["count"]
+    delta = second["mean"] - first["mean"]
+    return {
+        "count": count,
+        "nodata": nodata,
+        "min": min(first["min"], second["min"]),
+        "max": max(first["max"], second["max"]),
+        "mean": first["mean"] + delta * second["count"] / count,
+        "m2": first["m2"]
+        + second["m2"]
+        + delta**2 * first["count"] * second["count"] / count,
+    }
+
+
+def _window_moments(raster_path, band_index, yoff, ysize):
+    return reduce(
+        combine_moments,
+        (
+            _values_moments(values, nodata_count)
+            for values, nodata_count in _iter_blocks(
+                raster_path, band_index, yoff, ysize
+            )
+        ),
+        EMPTY_MOMENTS,
+    )
+
+
+def _window_histogram(raster_path, band_index, yoff, ysize, bins, _min, _max):
+    histogram = np.zeros(bins, dtype=np.int64)
+    for values, _ in _iter_blocks(raster_path, band_index, yoff, ysize):
+        histogram += np.histogram(values, bins=bins, range=(_min, _max))[0]
+    return histogram
+
+
+def _merge_moments(band_index, moments):
+    moments = reduce(combine_moments, moments, EMPTY_MOMENTS)
+    count = moments["count"]
+    nodata = moments["nodata"]
+    statistics = {
+        "band": band_index,
+        "valid_count": count,
+        "nodata_count": nodata,
+        "nodata_percent": round(100 * nodata / ((count + nodata) or 1), 3),
+    }
+    if not count:
+        return statistics
+    return {
+        **statistics,
+        "min": moments["min"],
+        "max": moments["max"],
+        "mean": moments["mean"],
+        "stddev": float(np.sqrt(moments["m2"] / count)),
+    }
+
+
+def get_raster_statistics(
+    raster_path,
+    bins=IMPORTER_RASTER_STATISTICS_BINS,
+    workers=IMPORTER_RASTER_STATISTICS_WORKERS,
+):
+    """
+    Compute for each band min, max, mean, stddev, nodata coverage and histogram.
+    The windows of rows are processed by a pool of threads (GDAL and numpy release
+    the GIL), each one reading a block at a time, so the memory used is bounded
+    by the block size and the number of workers.
+    The histogram needs the range of the band, so is computed with a second read
+    """
+    dataset = gdal.Open(raster_path)
+    ysize = dataset.RasterYSize
+    bands = range(1, dataset.RasterCount + 1)
+    block_ysize = dataset.GetRasterBand(1).GetBlockSize()[1]
+    dataset = None
+
+    rows = block_ysize * max(1, WINDOW_ROWS // block_ysize)
+    windows = [(yoff, min(rows, ysize - yoff)) for yoff in range(0, ysize, rows)]
+    workers = max(1, min(workers, len(windows) * len(bands)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        moments = {
+            band: [
+                executor.submit(_window_moments, raster_path, band, yoff, rows_count)
+                for yoff, rows_count in windows
+            ]
+            for band in bands
+        }
+        statistics = [
+            _merge_moments(band, [future.result() for future in futures])
+            for band, futures in moments.items()
+        ]
+
+        histograms = {
+            band_statistics["band"]: [
+                executor.submit(
+                    _window_histogram,
+                    raster_path,
+                    band_statistics["band"],
+                    yoff,
+                    rows_count,
+                    bins,
+                    band_statistics["min"],
+                    band_statistics["max"],
+                )
+                for yoff, rows_count in windows
+            ]
+            for band_statistics in statistics
+            if band_statistics["valid_count"]
+        }
+        for band_statistics in statistics:
+            futures = histograms.get(band_statistics["band"])
+            if not futures:
+                continue
+            band_statistics["histogram"] = {
+                "min": band_statistics["min"],
+                "max": band_statistics["max"],
+                "buckets": np.sum(
+                    [future.result() for future in futures], axis=0
+                ).tolist(),
+            }
+    return statistics
+
+
+def write_statistics_sidecar(raster_path, statistics) -> str:
+    """
+    Store statistics and histograms in the .aux.xml sidecar of the raster,
+    the dataset is opened in read only, so GDAL saves them in the PAM file
+    """
+    dataset = gdal.Open(raster_path)
+    for band_statistics in statistics:
+        if not band_statistics["valid_count"]:
+            continue
+        band = dataset.GetRasterBand(band_statistics["band"])
+        band.SetStatistics(
+            band_statistics["min"],
+            band_statistics["max"],
+            band_statistics["mean"],
+            band_statistics["stddev"],
+        )
+        band.SetMetadataItem(
+            "STATISTICS_VALID_PERCENT",
+            str(round(100 - band_statistics["nodata_percent"], 3)),
+        )
+        histogram = band_statistics["histogram"]
+        band.SetDefaultHistogram(
+            histogram["min"], histogram["max"], histogram["buckets"]
+        )
+    dataset.FlushCache()
+    dataset = None
+    return f"{raster_path}.aux.xml"
+
+
+def get_histogram_percentile(histogram, percentile) -> float:
+    """
+    Approximate the value of the percentile with the edge of the histogram bucket
+    """
+    buckets = np.cumsum(histogram["buckets"])
+    if not buckets[-1]:
+        return histogram["min"]
+    width = (histogram["max"] - histogram["min"]) / len(buckets)
+    index = int(np.searchsorted(buckets, buckets[-1] * percentile / 100))
+    edge = index if percentile < 50 else index + 1
+    return histogram["min"] + width * edge
+
+
+def generate_stretched_sld(name, statistics) -> str:
+    """
+    Generate a default style stretching each band between the 2nd and 98th percentile.
+    With at least three bands, the first three are used as RGB
+    """
+    valid = [x for x in statistics if x.get("histogram")]
+    if not valid:
+        return None
+    if len(valid) >= 3:
+        channels = zip(("RedChannel", "GreenChannel", "BlueChannel"), valid[:3])
+    else:
+        channels = [("GrayChannel", valid[0])]
+
+    _channels = "".join(
+        SLD_CHANNEL_TEMPLATE.format(
+            channel=channel,
+            band=band_statistics["band"],
+            min=get_histogram_percentile(
+                band_statistics["histogram"], STRETCH_PERCENTILES[0]
+            ),
+            max=get_histogram_percentile(
+                band_statistics["histogram"], STRETCH_PERCENTILES[1]
+            ),
+        )
+        for channel, band_statistics in channels
+    )
+    return SLD_TEMPLATE.format(name=name, channels=_channels)
@@ -1,6 +1,15 @@
+import os
+import shutil
+import tempfile
 from django.test import TestCase
-from mock import patch
+from mock import MagicMock, patch
 from importer.handlers.common.raster import BaseRasterFileHandler
+from importer.handlers.common.statistics import (
+    combine_moments,
+    generate_stretched_sld,
+    get_histogram_percentile,
+    get_raster_statistics,
+)
 from django.contrib.auth import get_user_model
 from importer import project_dir
 from importer.orchestrator import orchestrator
@@ -79,3 +88,95 @@ class TestBaseRasterFileHandler(TestCase):
         finally:
             if exec_id:
                 ExecutionRequest.objects.filter(exec_id=exec_id).delete()
+
+    def test_get_raster_statistics_should_merge_the_windows(self):
+        with patch("importer.handlers.common.statistics.WINDOW_ROWS", 1):
+            by_row = get_raster_statistics(self.valid_raster, bins=16, workers=4)
+        statistics = get_raster_statistics(self.valid_raster, bins=16, workers=1)
+
+        self.assertEqual(len(statistics), len(by_row))
+        for expected, actual in zip(statistics, by_row):
+            self.assertEqual(expected["valid_count"], actual["valid_count"])
+            self.assertEqual(expected["min"], actual["min"])
+            self.assertEqual(expected["max"], actual["max"])
+            self.assertAlmostEqual(expected["mean"], actual["mean"])
+            self.assertListEqual(
+                expected["histogram"]["buckets"], actual["histogram"]["buckets"]
+            )
+            self.assertEqual(
+                expected["valid_count"], sum(expected["histogram"]["buckets"])
+            )
+
+    def test_combine_moments_should_keep_the_precision_of_large_values(self):
+        first = {"count": 2, "nodata": 0, "min": 1e9 + 4, "max": 1e9 + 7}
+        second = {"count": 2, "nodata": 1, "min": 1e9 + 13, "max": 1e9 + 16}
+        first.update({"mean": 1e9 + 5.5, "m2": 4.5})
+        second.update({"mean": 1e9 + 14.5, "m2": 4.5})
+
+        moments = combine_moments(first, second)
+
+        self.assertEqual(4, moments["count"])
+        self.assertEqual(1, moments["nodata"])
+        self.assertEqual(1e9 + 10, moments["mean"])
+        # variance of 4, 7, 13, 16
+        self.assertAlmostEqual(22.5, moments["m2"] / moments["count"])
+        self.assertEqual(first, combine_moments(first, {"count": 0, "nodata": 0}))
+
+    def test_get_histogram_percentile(self):
+        histogram = {"min": 0, "max": 10, "buckets": [1] * 10}
+        self.assertEqual(0, get_histogram_percentile(histogram, 2))
+        self.assertEqual(10, get_histogram_percentile(histogram, 98))
+
+    def test_generate_stretched_sld_should_use_the_gray_channel(self):
+        statistics = [
+            {
+                "band": 1,
+                "valid_count": 10,
+                "histogram": {"min": 0, "max": 10, "buckets": [1] * 10},
+            }
+        ]
+        sld = generate_stretched_sld("test_grid", statistics)
+        self.assertIn("<GrayChannel>", sld)
+        self.assertIn('<VendorOption name="maxValue">10.0</VendorOption>', sld)
+        self.assertIsNone(generate_stretched_sld("test_grid", [{"band": 1}]))
+
+    @patch("importer.handlers.common.raster.orchestrator")
+    def test_compute_statistics_should_write_sidecar_and_style(self, _orchestrator):
+        with tempfile.TemporaryDirectory() as _tmp:
+            raster_path = shutil.copy(self.valid_raster, _tmp)
+            _exec = MagicMock(input_params={"files": {"base_file": raster_path}})
+            with patch.object(
+                self.handler, "_get_execution_request_object", return_value=_exec
+            ):
+                statistics = self.handler.compute_statistics("exec_id", "test_grid")
+
+            self.assertTrue(statistics)
+            self.assertTrue(os.path.exists(f"{raster_path}.aux.xml"))
+            _, kwargs = _orchestrator.update_execution_request_status.call_args
+            sld_path = os.path.join(_tmp, "test_grid_stretched.sld")
+            self.assertEqual(sld_path, kwargs["input_params"]["files"]["sld_file"])
+            self.assertTrue(os.path.exists(sld_path))
+
+    @patch("importer.handlers.common.raster.get_default_asset", return_value=None)
+    @patch("importer.handlers.common.raster.asset_handler_registry")
+    @patch("importer.handlers.common.raster.LocalAssetHandler")
+    def test_copy_original_file_should_not_rewrite_the_data(
+        self, asset_handler, asset_handler_registry, _
+    ):
+        with tempfile.TemporaryDirectory() as _tmp:
+            asset_handler.return_value._create_asset_dir.return_value = _tmp
+            dataset = MagicMock(files=[self.valid_raster], alternate="geonode:test_grid")
+            create_asset = asset_handler_registry.get_default_handler.return_value.create
+            create_asset.return_value.id = 10
+
+            new_file_location = self.handler.copy_original_file(dataset, owner=self.user)
+
+            self.assertEqual(1, len(new_file_location["files"]))
+            new_file = new_file_location["files"][0]
+            # the copied files are owned by a new asset
+            self.assertEqual(10, new_file_location["asset_id"])
+            self.assertListEqual([new_file], create_asset.call_args.kwargs["files"])
+            self.assertEqual(self.user, create_asset.call_args.kwargs["owner"])
+            self.assertTrue(new_file.startswith(os.path.join(_tmp, "test_grid_")))
+            with open(self.valid_raster, "rb") as expected, open(new_file, "rb") as actual:
+                self.assertEqual(expected.read(), actual.read())
@@ -113,6 +113,27 @@ class TestBaseVectorFileHandler(TestCase):
         )
         self._assert_test_result(overwrite=False)
 
+    def test_create_dynamic_model_schemas_should_save_each_schema(self):
+        prefetched = {"workspace": "geonode", "datasets": {}, "schemas": {}}
+        with patch.object(
+            ModelSchema, "save", autospec=True, side_effect=ModelSchema.save
+        ) as save:
+            created = self.handler.create_dynamic_model_schemas(
+                ["layer_one", "layer_two"],
+                str(uuid.uuid4()),
+                False,
+                self.user,
+                prefetched,
+            )
+        try:
+            self.assertEqual(2, save.call_count)
+            self.assertListEqual(["layer_one", "layer_two"], list(created))
+            self.assertTrue(all(schema.pk for schema in created.values()))
+            self.assertEqual(created["layer_one"], prefetched["resolved"]["layer_one"][0])
+        finally:
+            for schema in created.values():
+                schema.delete()
+
     def _assert_test_result(self, overwrite=False):
         try:
             # Prepare the test
@@ -250,6 +271,34 @@ class TestBaseVectorFileHandler(TestCase):
             shell=True,  # noqa
         )
 
+    @patch("importer.handlers.common.vector.Popen")
+    def test_import_with_ogr2ogr_should_reproject_to_the_target_crs(self, _open):
+        exec_id = orchestrator.create_execution_request(
+            user=get_user_model().objects.first(),
+            func_name="funct1",
+            step="step",
+            input_params={"files": self.valid_files, "target_crs": "EPSG:3857"},
+        )
+        try:
+            comm = MagicMock()
+            comm.communicate.return_value = b"", b""
+            _open.return_value = comm
+
+            import_with_ogr2ogr(
+                execution_id=str(exec_id),
+                files=self.valid_files,
+                original_name="dataset",
+                handler_module_path=str(self.handler),
+                ovverwrite_layer=False,
+                alternate="alternate",
+            )
+
+            _open.assert_called_once()
+            command = _open.call_args[0][0]
+            self.assertTrue(command.endswith('-nln alternate "dataset" -t_srs EPSG:3857'))
+        finally:
+            ExecutionRequest.objects.filter(exec_id=exec_id).delete()
+
     @patch("importer.handlers.common.vector.Popen")
     def test_import_with_ogr2ogr_with_errors_should_raise_exception(self, _open):
         _uuid = uuid.uuid4()
@@ -328,8 +377,19 @@ class TestBaseVectorFileHandler(TestCase):
         self.assertEqual(1, len(valid_layer))
         self.assertEqual("mattia_test", valid_layer[0].GetName())
 
+    @patch.dict(os.environ, {"IMPORTER_ENABLE_DYN_MODELS": ""})
+    @patch("importer.handlers.common.vector.materialize_lazy_copies")
+    @patch("importer.handlers.common.vector.get_relation_kind", return_value="r")
+    def test_delete_resource_should_keep_the_lazy_copies_if_the_table_is_kept(
+        self, _, materialize_lazy_copies
+    ):
+        # without dynamic models the table is not dropped
+        BaseVectorFileHandler.delete_resource(MagicMock(alternate="geonode:layer"))
+        materialize_lazy_copies.assert_not_called()
+
     @override_settings(MEDIA_ROOT="/tmp")
-    def test_perform_last_step(self):
+    @patch("importer.celery_tasks.generate_thumbnails.apply_async")
+    def test_perform_last_step(self, generate_thumbnails):
         """
         Output params in perform_last_step should return the detail_url and the ID
         of the resource created
@@ -358,3 +418,67 @@ class TestBaseVectorFileHandler(TestCase):
         }
         exec_obj.refresh_from_db()
         self.assertDictEqual(expected_output, exec_obj.output_params)
+        # the thumbnails are generated in background with a single task
+        generate_thumbnails.assert_called_once_with(([resource.pk],))
+
+    @patch("importer.handlers.base.IMPORTER_ASYNC_THUMBNAILS", True)
+    @patch("importer.handlers.common.vector.resource_manager")
+    def test_create_should_skip_the_hooks_without_xml_and_sld(self, resource_manager):
+        """
+        Without uploaded xml and sld files the dataset is written only
+        by resource_manager.create and by the reset of the dirty_state
+        """
+        resource_manager.create.return_value = self.layer
+        handler = GPKGFileHandler()
+        handler.handle_xml_file = MagicMock()
+        handler.handle_sld_file = MagicMock()
+        exec_id = orchestrator.create_execution_request(
+            user=self.owner,
+            func_name="funct1",
+            step="step",
+            input_params={"files": self.valid_files},
+        )
+
+        # the execution, its user and the dirty_state update
+        with self.assertNumQueries(3):
+            dataset = handler.create_geonode_resource(
+                "layer_name", "layer_alternate", str(exec_id)
+            )
+
+        self.assertEqual(self.layer, dataset)
+        self.assertFalse(dataset.dirty_state)
+        resource_manager.create.assert_called_once()
+        handler.handle_xml_file.assert_not_called()
+        handler.handle_sld_file.assert_not_called()
+
+    @patch("importer.handlers.common.vector.invalidate_dataset_tiles")
+    @patch("importer.handlers.common.vector.resource_manager")
+    def test_overwrite_should_skip_the_hooks_without_xml_and_sld(
+        self, resource_manager, invalidate_dataset_tiles
+    ):
+        """
+        Without uploaded xml and sld files the overwrite should not
+        update again the metadata and the style of the dataset
+        """
+        resource_manager.update.return_value = self.layer
+        handler = GPKGFileHandler()
+        handler.handle_xml_file = MagicMock()
+        handler.handle_sld_file = MagicMock()
+        exec_id = orchestrator.create_execution_request(
+            user=self.owner,
+            func_name="funct1",
+            step="step",
+            input_params={"files": self.valid_files, "overwrite_existing_layer": True},
+        )
+
+        dataset = handler.overwrite_geonode_resource(
+            "stazioni_metropolitana",
+            "stazioni_metropolitana",
+            str(exec_id),
+            asset=MagicMock(location=[self.valid_files["base_file"]]),
+        )
+
+        self.assertEqual(self.layer, dataset)
+        resource_manager.update.assert_called_once()
+        handler.handle_xml_file.assert_not_called()
+        handler.handle_sld_file.assert_not_called()
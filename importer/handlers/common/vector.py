@@ -1,6 +1,6 @@
 import ast
 from django.db import connections
-from importer.publisher import DataPublisher
+from importer.publisher import DataPublisher, get_catalog
 from importer.utils import call_rollback_function
 import json
 import logging
@@ -15,27 +15,43 @@ from dynamic_models.schema import ModelSchemaEditor
 from geonode.base.models import ResourceBase
 from geonode.resource.enumerator import ExecutionRequestAction as exa
 from geonode.layers.models import Dataset
-from importer.celery_tasks import ErrorBaseTaskClass, create_dynamic_structure
+from importer.celery_tasks import (
+    ErrorBaseTaskClass,
+    create_dynamic_structure,
+    publish_resources_batch,
+    register_layer_failure,
+)
 from importer.handlers.base import BaseHandler
 from importer.handlers.gpkg.tasks import SingleMessageErrorHandler
 from importer.handlers.utils import (
     GEOM_TYPE_MAPPING,
     STANDARD_TYPE_MAPPING,
     drop_dynamic_model_schema,
+    get_relation_kind,
+    get_target_crs,
+    get_vsi_path,
+    identify_crs_authority,
+    materialize_lazy_copies,
+    register_layer_to_publish,
 )
 from geonode.resource.manager import resource_manager
 from geonode.resource.models import ExecutionRequest
 from osgeo import ogr
-from importer.api.exception import ImportException
+from importer.api.exception import ImportException, InvalidInputFileException
 from importer.celery_app import importer_app
 from geonode.assets.utils import copy_assets_and_links, get_default_asset
 
-from importer.handlers.utils import create_alternate, should_be_imported
+from importer.handlers.utils import (
+    create_alternate,
+    get_prefetched_datasets,
+    prefetch_existing_resources,
+    should_be_imported,
+)
 from importer.models import ResourceHandlerInfo
 from importer.orchestrator import orchestrator
 from django.db.models import Q
-import pyproj
-from geonode.geoserver.security import delete_dataset_cache, set_geowebcache_invalidate_cache
+from importer.gwc import get_dataset_extent, invalidate_dataset_tiles
+from importer.settings import IMPORTER_BATCH_PUBLISHING
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +62,8 @@ class BaseVectorFileHandler(BaseHandler):
     It must provide the task_lists required to comple the upload
     """
 
+    SEED_SUPPORTED = True
+
     @property
     def default_geometry_column_name(self):
         return "geometry"
@@ -64,7 +82,7 @@ class BaseVectorFileHandler(BaseHandler):
         return os.environ.get("GEONODE_GEODATABASE", "geonode_data"), True
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps
         """
@@ -121,6 +139,7 @@ class BaseVectorFileHandler(BaseHandler):
             "overwrite_existing_layer": _data.pop("overwrite_existing_layer", "False"),
             "store_spatial_file": _data.pop("store_spatial_files", "True"),
             "source": _data.pop("source", "upload"),
+            "target_crs": get_target_crs(_data),
         }, _data
 
     @staticmethod
@@ -179,7 +198,8 @@ class BaseVectorFileHandler(BaseHandler):
                     _datastore["PASSWORD"],
                 )
             )
-        options += f'"{files.get("base_file")}"' + " "
+        # compressed files (gzip/tar) are read on the fly via the GDAL virtual file systems
+        options += f'"{get_vsi_path(files.get("base_file"))}"' + " "
 
         options += f'-nln {alternate} "{original_name}"'
 
@@ -193,12 +213,27 @@ class BaseVectorFileHandler(BaseHandler):
         """
         Base function to delete the resource with all the dependencies (dynamic model)
         """
+        try:
+            name = instance.alternate.split(":")[1]
+            db_name = os.getenv("DEFAULT_BACKEND_DATASTORE", "datastore")
+            if get_relation_kind(name, db_name) == "v":
+                # is a lazy copy, the original table is left untouched
+                with connections[db_name].cursor() as cursor:
+                    cursor.execute(f'DROP VIEW "{name}"')
+                ModelSchema.objects.filter(name=name).delete()
+                return
+        except Exception as e:
+            logger.error(f"Error during the deletion of the lazy copy: {e.args[0]}")
+
         try:
             name = instance.alternate.split(":")[1]
             schema = None
             if os.getenv("IMPORTER_ENABLE_DYN_MODELS", False):
                 schema = ModelSchema.objects.filter(name=name).first()
             if schema:
+                # the lazy copies of the dataset must survive to the deletion of the table,
+                # the table is not dropped if they cannot be materialized
+                materialize_lazy_copies(name, schema.db_name)
                 """
                 We use the schema editor directly, because the model itself is not managed
                 on creation, but for the delete since we are going to handle, we can use it
@@ -245,7 +280,9 @@ class BaseVectorFileHandler(BaseHandler):
                 }
             ]
 
-        layers = self.get_ogr2ogr_driver().Open(files.get("base_file"))
+        layers = self.get_ogr2ogr_driver().Open(
+            get_vsi_path(files.get("base_file"))
+        )
         if not layers:
             return []
         return [
@@ -258,29 +295,8 @@ class BaseVectorFileHandler(BaseHandler):
         ]
 
     def identify_authority(self, layer):
-        try:
-            layer_wkt = layer.GetSpatialRef().ExportToWkt()
-            _name = "EPSG"
-            _code = pyproj.CRS(layer_wkt).to_epsg(min_confidence=20)
-            if _code is None:
-                layer_proj4 = layer.GetSpatialRef().ExportToProj4()
-                _code = pyproj.CRS(layer_proj4).to_epsg(min_confidence=20)
-                if _code is None:
-                    raise Exception(
-                        "CRS authority code not found, fallback to default behaviour"
-                    )
-        except Exception:
-            spatial_ref = layer.GetSpatialRef()
-            spatial_ref.AutoIdentifyEPSG()
-            _name = spatial_ref.GetAuthorityName(None) or spatial_ref.GetAttrValue(
-                "AUTHORITY", 0
-            )
-            _code = (
-                spatial_ref.GetAuthorityCode("PROJCS")
-                or spatial_ref.GetAuthorityCode("GEOGCS")
-                or spatial_ref.GetAttrValue("AUTHORITY", 1)
-            )
-        return f"{_name}:{_code}"
+        # the resolution is cached, the layers of an upload usually share the same CRS
+        return identify_crs_authority(layer.GetSpatialRef())
 
     def get_ogr2ogr_driver(self):
         """
@@ -294,7 +310,9 @@ class BaseVectorFileHandler(BaseHandler):
         Internally will call the steps required to import the
         data inside the geonode_data database
         """
-        all_layers = self.get_ogr2ogr_driver().Open(files.get("base_file"))
+        all_layers = self.get_ogr2ogr_driver().Open(
+            get_vsi_path(files.get("base_file"))
+        )
         layers = self._select_valid_layers(all_layers)
         # for the moment we skip the dyanamic model creation
         layer_count = len(layers)
@@ -306,91 +324,164 @@ class BaseVectorFileHandler(BaseHandler):
         )
         dynamic_model = None
         celery_group = None
+        pending_schemas = {}
+        publishing_expected = False
+        dispatched = 0
         try:
             if len(layers) == 0:
                 raise Exception("No valid layers found")
 
-            # start looping on the layers available
+            should_be_overwritten = _exec.input_params.get("overwrite_existing_layer")
+            layer_names = [self.fixup_name(layer.GetName()) for layer in layers]
+            # the datasets and the dynamic models already available are loaded in bulk
+            prefetched = prefetch_existing_resources(layer_names, execution_id)
+
+            # should_be_imported check if the user+layername already exists or not
+            layers_to_import = [
+                (layer, layer_name)
+                for layer, layer_name in zip(layers, layer_names)
+                if should_be_imported(
+                    layer_name,
+                    _exec.user,
+                    prefetched=prefetched,
+                    skip_existing_layer=_exec.input_params.get("skip_existing_layer"),
+                    overwrite_existing_layer=should_be_overwritten,
+                )
+            ]
 
-            for index, layer in enumerate(layers, start=1):
-                layer_name = self.fixup_name(layer.GetName())
+            if IMPORTER_BATCH_PUBLISHING and layers_to_import:
+                # the layers are published together once all of them are imported
+                publishing_expected = True
+                orchestrator.update_execution_request_status(
+                    execution_id=str(execution_id),
+                    input_params={
+                        **_input,
+                        "publishing_expected": len(layers_to_import),
+                    },
+                )
 
-                should_be_overwritten = _exec.input_params.get(
-                    "overwrite_existing_layer"
+            if os.getenv("IMPORTER_ENABLE_DYN_MODELS", False):
+                # the missing dynamic models of all the layers are created before the dispatch
+                pending_schemas = self.create_dynamic_model_schemas(
+                    [layer_name for _, layer_name in layers_to_import],
+                    execution_id,
+                    should_be_overwritten,
+                    _exec.user,
+                    prefetched,
                 )
-                # should_be_imported check if the user+layername already exists or not
-                if (
-                    should_be_imported(
-                        layer_name,
-                        _exec.user,
-                        skip_existing_layer=_exec.input_params.get(
-                            "skip_existing_layer"
-                        ),
-                        overwrite_existing_layer=should_be_overwritten,
-                    )
-                    # and layer.GetGeometryColumn() is not None
-                ):
-                    # update the execution request object
-                    # setup dynamic model and retrieve the group task needed for tun the async workflow
-                    # create the async task for create the resource into geonode_data with ogr2ogr
-                    if os.getenv("IMPORTER_ENABLE_DYN_MODELS", False):
-                        (
-                            dynamic_model,
-                            alternate,
-                            celery_group,
-                        ) = self.setup_dynamic_model(
-                            layer,
-                            execution_id,
-                            should_be_overwritten,
-                            username=_exec.user,
-                        )
-                    else:
-                        alternate = self.find_alternate_by_dataset(
-                            _exec, layer_name, should_be_overwritten
-                        )
 
-                    ogr_res = self.get_ogr2ogr_task_group(
+            # start looping on the layers available
+            for layer, layer_name in layers_to_import:
+                # update the execution request object
+                # setup dynamic model and retrieve the group task needed for tun the async workflow
+                # create the async task for create the resource into geonode_data with ogr2ogr
+                if os.getenv("IMPORTER_ENABLE_DYN_MODELS", False):
+                    (
+                        dynamic_model,
+                        alternate,
+                        celery_group,
+                    ) = self.setup_dynamic_model(
+                        layer,
                         execution_id,
-                        files,
-                        layer.GetName().lower(),
                         should_be_overwritten,
-                        alternate,
+                        username=_exec.user,
+                        prefetched=prefetched,
+                    )
+                else:
+                    alternate = self.find_alternate_by_dataset(
+                        _exec, layer_name, should_be_overwritten, prefetched=prefetched
                     )
 
-                    if os.getenv("IMPORTER_ENABLE_DYN_MODELS", False):
-                        group_to_call = group(
-                            celery_group.set(
-                                link_error=["dynamic_model_error_callback"]
-                            ),
-                            ogr_res.set(link_error=["dynamic_model_error_callback"]),
-                        )
-                    else:
-                        group_to_call = group(
-                            ogr_res.set(link_error=["dynamic_model_error_callback"]),
-                        )
+                ogr_res = self.get_ogr2ogr_task_group(
+                    execution_id,
+                    files,
+                    layer.GetName().lower(),
+                    should_be_overwritten,
+                    alternate,
+                )
 
-                    # prepare the async chord workflow with the on_success and on_fail methods
-                    workflow = chord(group_to_call)(  # noqa
-                        import_next_step.s(
-                            execution_id,
-                            str(self),  # passing the handler module path
-                            "importer.import_resource",
-                            layer_name,
-                            alternate,
-                            **kwargs,
-                        )
+                if os.getenv("IMPORTER_ENABLE_DYN_MODELS", False):
+                    group_to_call = group(
+                        celery_group.set(
+                            link_error=["dynamic_model_error_callback"]
+                        ),
+                        ogr_res.set(link_error=["dynamic_model_error_callback"]),
                     )
+                else:
+                    group_to_call = group(
+                        ogr_res.set(link_error=["dynamic_model_error_callback"]),
+                    )
+
+                # prepare the async chord workflow with the on_success and on_fail methods
+                workflow = chord(group_to_call)(  # noqa
+                    import_next_step.s(
+                        execution_id,
+                        str(self),  # passing the handler module path
+                        "importer.import_resource",
+                        layer_name,
+                        alternate,
+                        **kwargs,
+                    )
+                )
+                pending_schemas.pop(layer_name, None)
+                dispatched += 1
         except Exception as e:
             logger.error(e)
+            if publishing_expected:
+                # only the layers already dispatched will reach the publishing
+                register_layer_failure(execution_id, expected=dispatched)
             if dynamic_model:
                 """
                 In case of fail, we want to delete the dynamic_model schema and his field
                 to keep the DB in a consistent state
                 """
                 drop_dynamic_model_schema(dynamic_model)
+            # the schemas created in bulk for the layers not yet dispatched are removed too
+            for schema in pending_schemas.values():
+                if schema != dynamic_model:
+                    drop_dynamic_model_schema(schema)
             raise e
         return
 
+    def describe_layers(self, files: dict) -> list:
+        """
+        Read the metadata of the layers without importing them,
+        the layers without a CRS are reported as skipped as done by the import.
+        The features are counted only by the drivers with a fast count (eg: GPKG),
+        the others would scan the whole file so the count is None
+        """
+        all_layers = self.get_ogr2ogr_driver().Open(get_vsi_path(files.get("base_file")))
+        if not all_layers:
+            raise InvalidInputFileException(detail="The provided file cannot be opened")
+        layers = []
+        for layer in all_layers:
+            definition = layer.GetLayerDefn()
+            try:
+                crs, reason = self.identify_authority(layer), None
+            except Exception:
+                crs = None
+                reason = "The layer does not have a Coordinate Reference System (CRS) and will be skipped"
+            # -1 if the driver cannot count the features without reading them all
+            count = layer.GetFeatureCount(force=0)
+            layers.append(
+                {
+                    "name": layer.GetName(),
+                    "crs": crs,
+                    "geometry_type": ogr.GeometryTypeToName(layer.GetGeomType()),
+                    "feature_count": count if count >= 0 else None,
+                    "fields": [
+                        {
+                            "name": definition.GetFieldDefn(i).GetName(),
+                            "type": definition.GetFieldDefn(i).GetTypeName(),
+                        }
+                        for i in range(definition.GetFieldCount())
+                    ],
+                    "will_be_imported": crs is not None,
+                    "reason": reason,
+                }
+            )
+        return layers
+
     def _select_valid_layers(self, all_layers):
         layers = []
         for layer in all_layers:
@@ -405,16 +496,17 @@ class BaseVectorFileHandler(BaseHandler):
                 pass
         return layers
 
-    def find_alternate_by_dataset(self, _exec_obj, layer_name, should_be_overwritten):
-        workspace = DataPublisher(None).workspace
-        dataset_available = Dataset.objects.filter(
-            alternate__iexact=f"{workspace.name}:{layer_name}"
-        )
+    def find_alternate_by_dataset(
+        self, _exec_obj, layer_name, should_be_overwritten, prefetched=None
+    ):
+        if prefetched is None:
+            prefetched = prefetch_existing_resources([layer_name])
+        dataset_available = get_prefetched_datasets(prefetched, layer_name)
 
-        dataset_exists = dataset_available.exists()
+        dataset_exists = bool(dataset_available)
 
         if dataset_exists and should_be_overwritten:
-            alternate = dataset_available.first().alternate.split(":")[-1]
+            alternate = dataset_available[0].split(":")[-1]
         elif not dataset_exists:
             alternate = layer_name
         else:
@@ -422,50 +514,39 @@ class BaseVectorFileHandler(BaseHandler):
 
         return alternate
 
-    def setup_dynamic_model(
+    def resolve_dynamic_model_schema(
         self,
-        layer: ogr.Layer,
+        layer_name: str,
         execution_id: str,
         should_be_overwritten: bool,
         username: str,
+        prefetched: dict,
     ):
         """
-        Extract from the geopackage the layers name and their schema
-        after the extraction define the dynamic model instances
+        Evaluate which dynamic model schema must be used for the layer
+        by using the prefetched datasets and schemas.
         Returns:
-            - dynamic_model as model, so the actual dynamic instance
-            - alternate -> the alternate of the resource which contains (if needed) the uuid
-            - celery_group -> the celery group of the field creation
+            - the ModelSchema to use, None if it must be created
+            - layer_name -> the name of the schema (if needed contains the execution hash)
         """
-
-        layer_name = self.fixup_name(layer.GetName())
-        workspace = DataPublisher(None).workspace
-        user_datasets = Dataset.objects.filter(
-            owner=username, alternate__iexact=f"{workspace.name}:{layer_name}"
+        dataset_exists = bool(
+            get_prefetched_datasets(prefetched, layer_name, owner=username)
         )
-        dynamic_schema = ModelSchema.objects.filter(name__iexact=layer_name)
-
-        dynamic_schema_exists = dynamic_schema.exists()
-        dataset_exists = user_datasets.exists()
+        dynamic_schema = prefetched["schemas"].get(layer_name.lower())
+        dynamic_schema_exists = dynamic_schema is not None
 
         if dataset_exists and dynamic_schema_exists and should_be_overwritten:
             """
             If the user have a dataset, the dynamic model has already been created and is in overwrite mode,
             we just take the dynamic_model to overwrite the existing one
             """
-            dynamic_schema = dynamic_schema.get()
+            return dynamic_schema, layer_name
         elif not dataset_exists and not dynamic_schema_exists:
             """
             cames here when is a new brand upload or when (for any reasons) the dataset exists but the
             dynamic model has not been created before
             """
-            #  layer_name = create_alternate(layer_name, execution_id)
-            dynamic_schema = ModelSchema.objects.create(
-                name=layer_name,
-                db_name="datastore",
-                managed=False,
-                db_table_name=layer_name,
-            )
+            return None, layer_name
         elif (
             (not dataset_exists and dynamic_schema_exists)
             or (dataset_exists and dynamic_schema_exists and not should_be_overwritten)
@@ -476,17 +557,82 @@ class BaseVectorFileHandler(BaseHandler):
             to the layer to let it proceed to the next steps
             """
             layer_name = create_alternate(layer_name, execution_id)
-            dynamic_schema, _ = ModelSchema.objects.get_or_create(
-                name=layer_name,
-                db_name="datastore",
-                managed=False,
-                db_table_name=layer_name,
-            )
+            return prefetched["schemas"].get(layer_name.lower()), layer_name
         else:
             raise ImportException(
                 "Error during the upload of the gpkg file. The dataset does not exists"
             )
 
+    def create_dynamic_model_schemas(
+        self,
+        layer_names: list,
+        execution_id: str,
+        should_be_overwritten: bool,
+        username: str,
+        prefetched: dict,
+    ):
+        """
+        Create the dynamic model schemas missing for the layers of the upload.
+        Each schema is created one by one, since ModelSchema.save()
+        registers the dynamic model and bulk_create would skip it.
+        The resolved schemas are saved in the prefetched dict so
+        setup_dynamic_model will not evaluate them again.
+        Returns the created schemas by layer name
+        """
+        resolved = prefetched.setdefault("resolved", {})
+        created = {}
+        for layer_name in layer_names:
+            dynamic_schema, schema_name = self.resolve_dynamic_model_schema(
+                layer_name, execution_id, should_be_overwritten, username, prefetched
+            )
+            if dynamic_schema is None:
+                dynamic_schema = ModelSchema.objects.create(
+                    name=schema_name,
+                    db_name="datastore",
+                    managed=False,
+                    db_table_name=schema_name,
+                )
+                created[layer_name] = dynamic_schema
+            resolved[layer_name] = (dynamic_schema, schema_name)
+        return created
+
+    def setup_dynamic_model(
+        self,
+        layer: ogr.Layer,
+        execution_id: str,
+        should_be_overwritten: bool,
+        username: str,
+        prefetched: dict = None,
+    ):
+        """
+        Extract from the geopackage the layers name and their schema
+        after the extraction define the dynamic model instances.
+        The prefetched resources (see prefetch_existing_resources) avoid any
+        further query, if not provided they are loaded for the layer
+        Returns:
+            - dynamic_model as model, so the actual dynamic instance
+            - alternate -> the alternate of the resource which contains (if needed) the uuid
+            - celery_group -> the celery group of the field creation
+        """
+
+        layer_name = self.fixup_name(layer.GetName())
+        if prefetched is None:
+            prefetched = prefetch_existing_resources([layer_name], execution_id)
+
+        if layer_name in prefetched.get("resolved", {}):
+            dynamic_schema, layer_name = prefetched["resolved"][layer_name]
+        else:
+            dynamic_schema, layer_name = self.resolve_dynamic_model_schema(
+                layer_name, execution_id, should_be_overwritten, username, prefetched
+            )
+            if dynamic_schema is None:
+                dynamic_schema = ModelSchema.objects.create(
+                    name=layer_name,
+                    db_name="datastore",
+                    managed=False,
+                    db_table_name=layer_name,
+                )
+
         # define standard field mapping from ogr to django
         dynamic_model, celery_group = self.create_dynamic_model_fields(
             layer=layer,
@@ -536,19 +682,12 @@ class BaseVectorFileHandler(BaseHandler):
                 }
             ]
 
-        # ones we have the schema, here we create a list of chunked value
-        # so the async task will handle max of 30 field per task
-        list_chunked = [
-            layer_schema[i : i + 30] for i in range(0, len(layer_schema), 30)  # noqa
-        ]
-
-        # definition of the celery group needed to run the async workflow.
-        # in this way each task of the group will handle only 30 field
+        # the whole schema of the layer is synchronized by a single task,
+        # the fields are created/updated in bulk inside one transaction
         celery_group = group(
             create_dynamic_structure.s(
-                execution_id, schema, dynamic_model_schema.id, overwrite, layer_name
+                execution_id, layer_schema, dynamic_model_schema.id, overwrite, layer_name
             )
-            for schema in list_chunked
         )
 
         return dynamic_model_schema, celery_group
@@ -587,11 +726,13 @@ class BaseVectorFileHandler(BaseHandler):
         _overwrite = _exec.input_params.get("overwrite_existing_layer", False)
         # if the layer exists, we just update the information of the dataset by
         # let it recreate the catalogue
-        if not saved_dataset.exists() and _overwrite:
+        if _overwrite and not saved_dataset.exists():
             logger.warning(
                 f"The dataset required {alternate} does not exists, but an overwrite is required, the resource will be created"
             )
 
+        # the creation synchronizes the dataset with GeoServer and assigns
+        # the default style of the layer, so the returned instance is up to date
         saved_dataset = resource_manager.create(
             None,
             resource_type=resource_type,
@@ -601,16 +742,16 @@ class BaseVectorFileHandler(BaseHandler):
             custom=custom,
         )
 
-        saved_dataset.refresh_from_db()
+        # the hooks are needed only for the uploaded files
+        if self.has_uploaded_file(_exec, "xml_file"):
+            self.handle_xml_file(saved_dataset, _exec)
+        if self.has_uploaded_file(_exec, "sld_file"):
+            self.handle_sld_file(saved_dataset, _exec)
 
-        self.handle_xml_file(saved_dataset, _exec)
-        self.handle_sld_file(saved_dataset, _exec)
+        self.set_thumbnail(saved_dataset)
 
-        resource_manager.set_thumbnail(None, instance=saved_dataset)
-
-        ResourceBase.objects.filter(alternate=alternate).update(dirty_state=False)
-        
-        saved_dataset.refresh_from_db()
+        ResourceBase.objects.filter(pk=saved_dataset.pk).update(dirty_state=False)
+        saved_dataset.dirty_state = False
         return saved_dataset
 
     def generate_resource_payload(self, layer_name, alternate, asset, _exec, workspace):
@@ -644,21 +785,22 @@ class BaseVectorFileHandler(BaseHandler):
         # let it recreate the catalogue
         if dataset.exists() and _overwrite:
             dataset = dataset.first()
-
-            delete_dataset_cache(dataset.alternate)
-            set_geowebcache_invalidate_cache(dataset.typename)
+            previous_extent = get_dataset_extent(dataset)
 
             dataset = resource_manager.update(
-                dataset.uuid, instance=dataset, files=asset.location
+                dataset.uuid, instance=dataset, files=asset.location if asset else None
             )
+            # only the tiles inside the changed extent are removed from the cache
+            invalidate_dataset_tiles(get_catalog(), dataset, previous_extent)
 
-            self.handle_xml_file(dataset, _exec)
-            self.handle_sld_file(dataset, _exec)
+            # the dataset is already synchronized by the update and keeps its style,
+            # the hooks are needed only for the uploaded files
+            if self.has_uploaded_file(_exec, "xml_file"):
+                self.handle_xml_file(dataset, _exec)
+            if self.has_uploaded_file(_exec, "sld_file"):
+                self.handle_sld_file(dataset, _exec)
 
-            resource_manager.set_thumbnail(
-                dataset.uuid, instance=dataset, overwrite=True
-            )
-            dataset.refresh_from_db()
+            self.set_thumbnail(dataset)
             return dataset
         elif not dataset.exists() and _overwrite:
             logger.warning(
@@ -817,6 +959,26 @@ class BaseVectorFileHandler(BaseHandler):
                 logger.warning(e)
                 pass
 
+    def _copy_geonode_data_table_rollback(
+        self, exec_id, instance_name=None, *args, **kwargs
+    ):
+        """
+        Remove the table (or the view, for the lazy copy) created by the copy
+        """
+        if instance_name is None:
+            return
+        db_name = os.getenv("DEFAULT_BACKEND_DATASTORE", "datastore")
+        try:
+            relation_kind = get_relation_kind(instance_name, db_name)
+            if relation_kind is None:
+                return
+            with connections[db_name].cursor() as cursor:
+                cursor.execute(
+                    f'DROP {"VIEW" if relation_kind == "v" else "TABLE"} "{instance_name}"'
+                )
+        except Exception as e:
+            logger.warning(e)
+
     def _publish_resource_rollback(self, exec_id, instance_name=None, *args, **kwargs):
         """
         We delete the resource from geoserver
@@ -830,6 +992,20 @@ class BaseVectorFileHandler(BaseHandler):
         publisher.delete_resource(instance_name)
 
 
+def is_batch_publishing(_exec, handlers_module_path, actual_step) -> bool:
+    """
+    The layers are published by a single task if the batch publishing
+    is enabled for the execution and the publishing is the next step
+    """
+    if not IMPORTER_BATCH_PUBLISHING or "publishing_expected" not in _exec.input_params:
+        return False
+    tasks = orchestrator.load_handler(handlers_module_path).get_task_list(
+        action=exa.IMPORT.value
+    )
+    _index = tasks.index(actual_step) + 1 if actual_step in tasks else len(tasks)
+    return _index < len(tasks) and tasks[_index] == "importer.publish_resource"
+
+
 @importer_app.task(
     base=ErrorBaseTaskClass,
     name="importer.import_next_step",
@@ -853,6 +1029,20 @@ def import_next_step(
     try:
         _exec = orchestrator.get_execution_object(execution_id)
 
+        if is_batch_publishing(_exec, handlers_module_path, actual_step):
+            layers = register_layer_to_publish(
+                execution_id,
+                layer_name,
+                alternate,
+                kwargs.get("kwargs") if "kwargs" in kwargs else kwargs,
+            )
+            if layers:
+                publish_resources_batch.apply_async(
+                    (execution_id, handlers_module_path, exa.IMPORT.value),
+                    {"layers": layers},
+                )
+            return "import_next_step", alternate, execution_id
+
         _files = _exec.input_params.get("files")
         # at the end recall the import_orchestrator for the next step
 
@@ -868,6 +1058,7 @@ def import_next_step(
 
         import_orchestrator.apply_async(task_params, kwargs)
     except Exception as e:
+        register_layer_failure(execution_id, layer_name, alternate)
         call_rollback_function(
             execution_id,
             handlers_module_path=handlers_module_path,
@@ -906,9 +1097,20 @@ def import_with_ogr2ogr(
     try:
         ogr_exe = "/usr/bin/ogr2ogr"
 
+        if ovverwrite_layer and alternate:
+            # ogr2ogr cannot overwrite a view or a table with dependent views
+            materialize_lazy_copies(
+                alternate, os.getenv("DEFAULT_BACKEND_DATASTORE", "datastore")
+            )
+
         options = orchestrator.load_handler(handler_module_path).create_ogr2ogr_command(
             files, original_name, ovverwrite_layer, alternate
         )
+        _exec = ExecutionRequest.objects.filter(exec_id=execution_id).first()
+        target_crs = _exec.input_params.get("target_crs") if _exec else None
+        if target_crs:
+            # the features are reprojected while loaded, ogr2ogr skips the layers already in the target CRS
+            options += f" -t_srs {target_crs}"
         _datastore = settings.DATABASES["datastore"]
 
         copy_with_dump = ast.literal_eval(os.getenv("OGR2OGR_COPY_WITH_DUMP", "False"))
@@ -936,6 +1138,8 @@ def import_with_ogr2ogr(
             raise Exception(f"{message} for layer {alternate}")
         return "ogr2ogr", alternate, execution_id
     except Exception as e:
+        # the failed layer must not hold the publishing of the others
+        register_layer_failure(execution_id, original_name, alternate)
         call_rollback_function(
             execution_id,
             handlers_module_path=handler_module_path,
@@ -10,7 +10,12 @@ from celery import group
 from geonode.base.models import ResourceBase
 from dynamic_models.models import ModelSchema
 from importer.handlers.common.vector import BaseVectorFileHandler
-from importer.handlers.utils import GEOM_TYPE_MAPPING
+from importer.handlers.utils import (
+    GEOM_TYPE_MAPPING,
+    get_compressed_member,
+    get_vsi_path,
+    is_compressed_file,
+)
 from importer.utils import ImporterRequestAction as ira
 
 logger = logging.getLogger(__name__)
@@ -22,6 +27,8 @@ class CSVFileHandler(BaseVectorFileHandler):
     It must provide the task_lists required to comple the upload
     """
 
+    REMOTE_READ_SUPPORTED = True
+
     ACTIONS = {
         exa.IMPORT.value: (
             "start_import",
@@ -67,38 +74,41 @@ class CSVFileHandler(BaseVectorFileHandler):
         base = _data.get("base_file")
         if not base:
             return False
-        return (
-            base.lower().endswith(".csv")
-            if isinstance(base, str)
-            else base.name.lower().endswith(".csv")
-        )
+        filename = base if isinstance(base, str) else base.name
+        if is_compressed_file(base):
+            # gzip/tar archives are handled if they contain a CSV
+            filename = get_compressed_member(base, extensions=("csv",)) or ""
+        return filename.lower().endswith(".csv")
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         BaseVectorFileHandler.is_valid(files, user)
-        # getting the upload limit validation
-        upload_validator = UploadLimitValidator(user)
-        upload_validator.validate_parallelism_limit_per_user()
-        actual_upload = upload_validator._get_parallel_uploads_count()
-        max_upload = upload_validator._get_max_parallel_uploads()
-
-        layers = CSVFileHandler().get_ogr2ogr_driver().Open(files.get("base_file"))
+        layers = CSVFileHandler().get_ogr2ogr_driver().Open(
+            get_vsi_path(files.get("base_file"))
+        )
 
         if not layers:
             raise InvalidCSVException("The CSV provided is invalid, no layers found")
 
-        layers_count = len(layers)
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            upload_validator = UploadLimitValidator(user)
+            upload_validator.validate_parallelism_limit_per_user()
+            actual_upload = upload_validator._get_parallel_uploads_count()
+            max_upload = upload_validator._get_max_parallel_uploads()
+            layers_count = len(layers)
 
-        if layers_count >= max_upload:
-            raise UploadParallelismLimitException(
-                detail=f"The number of layers in the CSV {layers_count} is greater than "
-                f"the max parallel upload permitted: {max_upload} "
-                f"please upload a smaller file"
-            )
-        elif layers_count + actual_upload >= max_upload:
-            raise UploadParallelismLimitException(
-                detail=f"With the provided CSV, the number of max parallel upload will exceed the limit of {max_upload}"
-            )
+            if layers_count >= max_upload:
+                raise UploadParallelismLimitException(
+                    detail=f"The number of layers in the CSV {layers_count} is greater than "
+                    f"the max parallel upload permitted: {max_upload} "
+                    f"please upload a smaller file"
+                )
+            elif layers_count + actual_upload >= max_upload:
+                raise UploadParallelismLimitException(
+                    detail=f"With the provided CSV, the number of max parallel upload will exceed the limit of {max_upload}"
+                )
 
         schema_keys = [x.name.lower() for layer in layers for x in layer.schema]
         geom_is_in_schema = any(
@@ -205,19 +215,12 @@ class CSVFileHandler(BaseVectorFileHandler):
                 }
             ]
 
-        # ones we have the schema, here we create a list of chunked value
-        # so the async task will handle max of 30 field per task
-        list_chunked = [
-            layer_schema[i : i + 30] for i in range(0, len(layer_schema), 30)  # noqa
-        ]
-
-        # definition of the celery group needed to run the async workflow.
-        # in this way each task of the group will handle only 30 field
+        # the whole schema of the layer is synchronized by a single task,
+        # the fields are created/updated in bulk inside one transaction
         celery_group = group(
             create_dynamic_structure.s(
-                execution_id, schema, dynamic_model_schema.id, overwrite, layer_name
+                execution_id, layer_schema, dynamic_model_schema.id, overwrite, layer_name
             )
-            for schema in list_chunked
         )
 
         return dynamic_model_schema, celery_group
@@ -237,7 +240,9 @@ class CSVFileHandler(BaseVectorFileHandler):
                 }
             ]
 
-        layers = self.get_ogr2ogr_driver().Open(files.get("base_file"), 0)
+        layers = self.get_ogr2ogr_driver().Open(
+            get_vsi_path(files.get("base_file")), 0
+        )
         if not layers:
             return []
         return [
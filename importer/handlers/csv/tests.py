@@ -140,6 +140,21 @@ class TestCSVHandler(TestCase):
         actual = self.handler.can_handle({"base_file": "random.file"})
         self.assertFalse(actual)
 
+    def test_can_handle_should_return_true_for_gzip_csv(self):
+        actual = self.handler.can_handle(
+            {"base_file": f"{project_dir}/tests/fixture/valid.csv.gz"}
+        )
+        self.assertTrue(actual)
+
+    def test_create_ogr2ogr_command_should_read_gzip_via_vsigzip(self):
+        actual = self.handler.create_ogr2ogr_command(
+            {"base_file": f"{project_dir}/tests/fixture/valid.csv.gz"},
+            "valid",
+            False,
+            "alternate",
+        )
+        self.assertIn(f'"/vsigzip/{project_dir}/tests/fixture/valid.csv.gz"', actual)
+
     @patch("importer.handlers.common.vector.Popen")
     def test_import_with_ogr2ogr_without_errors_should_call_the_right_command(
         self, _open
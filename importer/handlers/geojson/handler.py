@@ -6,6 +6,11 @@ from geonode.upload.utils import UploadLimitValidator
 from importer.handlers.common.vector import BaseVectorFileHandler
 from osgeo import ogr
 from importer.utils import ImporterRequestAction as ira
+from importer.handlers.utils import (
+    get_compressed_member,
+    is_compressed_file,
+    open_uncompressed,
+)
 
 from importer.handlers.geojson.exceptions import InvalidGeoJsonException
 
@@ -57,7 +62,13 @@ class GeoJsonFileHandler(BaseVectorFileHandler):
         base = _data.get("base_file")
         if not base:
             return False
-        ext = base.split(".")[-1] if isinstance(base, str) else base.name.split(".")[-1]
+        filename = base if isinstance(base, str) else base.name
+        if is_compressed_file(base):
+            # gzip/tar archives are handled if they contain a GeoJSON
+            filename = (
+                get_compressed_member(base, extensions=("json", "geojson")) or ""
+            )
+        ext = filename.split(".")[-1]
         if ext in ["json", "geojson"]:
             """
             Check if is a real geojson based on specification
@@ -65,8 +76,8 @@ class GeoJsonFileHandler(BaseVectorFileHandler):
             """
             try:
                 _file = base
-                if isinstance(base, str):
-                    with open(base, "r") as f:
+                if isinstance(base, str) or is_compressed_file(base):
+                    with open_uncompressed(base, extensions=("json", "geojson")) as f:
                         _file = json.loads(f.read())
                 else:
                     _file = json.loads(base.read())
@@ -78,21 +89,31 @@ class GeoJsonFileHandler(BaseVectorFileHandler):
         return False
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps:
         """
         # calling base validation checks
         BaseVectorFileHandler.is_valid(files, user)
-        # getting the upload limit validation
-        upload_validator = UploadLimitValidator(user)
-        upload_validator.validate_parallelism_limit_per_user()
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            UploadLimitValidator(user).validate_parallelism_limit_per_user()
 
         _file = files.get("base_file")
         if not _file:
             raise InvalidGeoJsonException("base file is not provided")
 
         filename = os.path.basename(_file)
+        if is_compressed_file(_file):
+            # the check is done on the GeoJSON inside the archive
+            filename = os.path.basename(
+                get_compressed_member(_file, extensions=("json", "geojson")) or ""
+            )
+            if not filename:
+                raise InvalidGeoJsonException(
+                    "The provided archive does not contain any GeoJson"
+                )
 
         if len(filename.split(".")) > 2:
             # means that there is a dot other than the one needed for the extension
@@ -102,7 +123,9 @@ class GeoJsonFileHandler(BaseVectorFileHandler):
             )
 
         try:
-            with open(_file, "r") as _readed_file:
+            with open_uncompressed(
+                _file, extensions=("json", "geojson")
+            ) as _readed_file:
                 json.loads(_readed_file.read())
         except Exception:
             raise InvalidGeoJsonException("The provided GeoJson is not valid")
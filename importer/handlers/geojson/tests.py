@@ -106,6 +106,18 @@ class TestGeoJsonFileHandler(TestCase):
         actual = self.handler.can_handle({"base_file": "random.gpkg"})
         self.assertFalse(actual)
 
+    def test_can_handle_should_return_true_for_gzip_geojson(self):
+        actual = self.handler.can_handle(
+            {"base_file": f"{project_dir}/tests/fixture/valid.geojson.gz"}
+        )
+        self.assertTrue(actual)
+
+    def test_can_handle_should_return_false_for_gzip_of_other_files(self):
+        actual = self.handler.can_handle(
+            {"base_file": f"{project_dir}/tests/fixture/valid.csv.gz"}
+        )
+        self.assertFalse(actual)
+
     @patch("importer.handlers.common.vector.Popen")
     def test_import_with_ogr2ogr_without_errors_should_call_the_right_command(
         self, _open
@@ -5,6 +5,7 @@ from geonode.resource.enumerator import ExecutionRequestAction as exa
 from geonode.upload.utils import UploadLimitValidator
 from importer.handlers.common.raster import BaseRasterFileHandler
 from importer.handlers.geotiff.exceptions import InvalidGeoTiffException
+from importer.handlers.utils import get_compressed_member, is_compressed_file
 from importer.utils import ImporterRequestAction as ira
 
 logger = logging.getLogger(__name__)
@@ -55,25 +56,47 @@ class GeoTiffFileHandler(BaseRasterFileHandler):
         base = _data.get("base_file")
         if not base:
             return False
-        ext = base.split(".")[-1] if isinstance(base, str) else base.name.split(".")[-1]
+        filename = base if isinstance(base, str) else base.name
+        if is_compressed_file(base):
+            # gzip/tar archives are handled if they contain a GeoTIFF
+            filename = (
+                get_compressed_member(
+                    base, extensions=("tiff", "geotiff", "tif", "geotif")
+                )
+                or ""
+            )
+        ext = filename.split(".")[-1]
         return ext in ["tiff", "geotiff", "tif", "geotif"]
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps:
         """
         # calling base validation checks
         BaseRasterFileHandler.is_valid(files, user)
-        # getting the upload limit validation
-        upload_validator = UploadLimitValidator(user)
-        upload_validator.validate_parallelism_limit_per_user()
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            UploadLimitValidator(user).validate_parallelism_limit_per_user()
 
         _file = files.get("base_file")
         if not _file:
             raise InvalidGeoTiffException("base file is not provided")
 
         filename = os.path.basename(_file)
+        if is_compressed_file(_file):
+            # the check is done on the GeoTIFF inside the archive
+            filename = os.path.basename(
+                get_compressed_member(
+                    _file, extensions=("tiff", "geotiff", "tif", "geotif")
+                )
+                or ""
+            )
+            if not filename:
+                raise InvalidGeoTiffException(
+                    "The provided archive does not contain any GeoTIFF"
+                )
 
         if len(filename.split(".")) > 2:
             # means that there is a dot other than the one needed for the extension
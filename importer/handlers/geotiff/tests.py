@@ -1,3 +1,7 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
 from django.test import TestCase
 from importer.handlers.geotiff.exceptions import InvalidGeoTiffException
 from django.contrib.auth import get_user_model
@@ -43,6 +47,85 @@ class TestGeoTiffFileHandler(TestCase):
         self.assertEqual(len(self.handler.ACTIONS["copy"]), 4)
         self.assertTupleEqual(expected, self.handler.ACTIONS["copy"])
 
+    @patch("importer.handlers.common.raster.IMPORTER_RASTER_COG", True)
+    def test_task_list_with_cog_conversion_enabled(self):
+        expected = (
+            "start_import",
+            "importer.import_resource",
+            "importer.convert_to_cog",
+            "importer.publish_resource",
+            "importer.create_geonode_resource",
+        )
+        self.assertTupleEqual(expected, self.handler.get_task_list("import"))
+        # the copy reuses the file of the original dataset
+        self.assertTupleEqual(
+            self.handler.ACTIONS["copy"], self.handler.get_task_list("copy")
+        )
+
+    @patch("importer.handlers.common.raster.IMPORTER_RASTER_STATISTICS", True)
+    @patch("importer.handlers.common.raster.IMPORTER_RASTER_COG", True)
+    def test_task_list_with_statistics_enabled(self):
+        # the statistics are evaluated on the COG, which is the published raster
+        expected = (
+            "start_import",
+            "importer.import_resource",
+            "importer.convert_to_cog",
+            "importer.compute_raster_statistics",
+            "importer.publish_resource",
+            "importer.create_geonode_resource",
+        )
+        self.assertTupleEqual(expected, self.handler.get_task_list("import"))
+
+    @patch("importer.handlers.common.raster.orchestrator")
+    def test_convert_to_cog_should_replace_the_base_file(self, _orchestrator):
+        with tempfile.TemporaryDirectory() as _tmp:
+            raster_path = shutil.copy(self.valid_tiff, _tmp)
+            _exec = MagicMock(input_params={"files": {"base_file": raster_path}}, output_params={})
+            with patch.object(
+                self.handler, "_get_execution_request_object", return_value=_exec
+            ):
+                stats = self.handler.convert_to_cog("exec_id")
+
+            cog_path = os.path.join(_tmp, "test_grid_cog.tif")
+            self.assertTrue(self.handler.is_cog(cog_path))
+            self.assertEqual(os.path.getsize(cog_path), stats["cog_size"])
+            _, kwargs = _orchestrator.update_execution_request_status.call_args
+            self.assertEqual(cog_path, kwargs["input_params"]["files"]["base_file"])
+            self.assertDictEqual(stats, kwargs["output_params"]["cog"])
+
+    @patch("importer.handlers.common.raster.orchestrator")
+    def test_reproject_raster_should_replace_the_base_file(self, _orchestrator):
+        with tempfile.TemporaryDirectory() as _tmp:
+            raster_path = shutil.copy(self.valid_tiff, _tmp)
+            files = {"base_file": raster_path}
+            _exec = MagicMock(
+                input_params={"files": files.copy(), "target_crs": "EPSG:3857"},
+                output_params={},
+            )
+            with patch.object(
+                self.handler, "_get_execution_request_object", return_value=_exec
+            ):
+                self.handler.reproject_raster(files, "exec_id")
+
+            warped_path = os.path.join(_tmp, "test_grid_epsg_3857.tif")
+            self.assertEqual(warped_path, files["base_file"])
+            self.assertTrue(os.path.exists(warped_path))
+            _, kwargs = _orchestrator.update_execution_request_status.call_args
+            self.assertEqual(warped_path, kwargs["input_params"]["files"]["base_file"])
+            self.assertEqual("EPSG:4326", kwargs["input_params"]["native_crs"])
+
+    @patch("importer.handlers.common.raster.orchestrator")
+    def test_reproject_raster_should_skip_without_target_crs(self, _orchestrator):
+        files = {"base_file": self.valid_tiff}
+        _exec = MagicMock(input_params={"files": files.copy()}, output_params={})
+        with patch.object(
+            self.handler, "_get_execution_request_object", return_value=_exec
+        ):
+            self.handler.reproject_raster(files, "exec_id")
+
+        self.assertEqual(self.valid_tiff, files["base_file"])
+        _orchestrator.update_execution_request_status.assert_not_called()
+
     def test_is_valid_should_raise_exception_if_the_parallelism_is_met(self):
         parallelism, created = UploadParallelismLimit.objects.get_or_create(
             slug="default_max_parallel_uploads"
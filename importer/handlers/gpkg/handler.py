@@ -3,8 +3,8 @@ import logging
 from geonode.resource.enumerator import ExecutionRequestAction as exa
 from geonode.upload.api.exceptions import UploadParallelismLimitException
 from geonode.upload.utils import UploadLimitValidator
-from geopackage_validator.validate import validate
 from importer.handlers.gpkg.exceptions import InvalidGeopackageException
+from importer.handlers.gpkg.utils import validate_geopackage
 from osgeo import ogr
 
 from importer.handlers.common.vector import BaseVectorFileHandler
@@ -73,7 +73,7 @@ class GPKGFileHandler(BaseVectorFileHandler):
         )
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps:
         Upload limit:
@@ -88,37 +88,37 @@ class GPKGFileHandler(BaseVectorFileHandler):
             RQ14: The geometry_type_name from the gpkg_geometry_columns table must be one of POINT, LINESTRING, POLYGON, MULTIPOINT, MULTILINESTRING, or MULTIPOLYGON
             RQ15: All table geometries must match the geometry_type_name from the gpkg_geometry_columns table
             RC18: It is recommended to give all GEOMETRY type columns the same name.
+        The rules are evaluated in parallel and the result is cached by the file content,
+        see importer.handlers.gpkg.utils.validate_geopackage
         """
         # calling base validation checks
         BaseVectorFileHandler.is_valid(files, user)
-        # getting the upload limit validation
-        upload_validator = UploadLimitValidator(user)
-        upload_validator.validate_parallelism_limit_per_user()
-        actual_upload = upload_validator._get_parallel_uploads_count()
-        max_upload = upload_validator._get_max_parallel_uploads()
-
         layers = GPKGFileHandler().get_ogr2ogr_driver().Open(files.get("base_file"))
 
         if not layers:
             raise InvalidGeopackageException("The geopackage provided is invalid")
 
-        layers_count = len(layers)
-
-        if layers_count >= max_upload:
-            raise UploadParallelismLimitException(
-                detail=f"The number of layers in the gpkg {layers_count} is greater than "
-                f"the max parallel upload permitted: {max_upload} "
-                f"please upload a smaller file"
-            )
-        elif layers_count + actual_upload >= max_upload:
-            raise UploadParallelismLimitException(
-                detail=f"With the provided gpkg, the number of max parallel upload will exceed the limit of {max_upload}"
-            )
-
-        validator = validate(
-            gpkg_path=files.get("base_file"),
-            validations="RQ1, RQ2, RQ13, RQ14, RQ15, RC18",
-        )
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            upload_validator = UploadLimitValidator(user)
+            upload_validator.validate_parallelism_limit_per_user()
+            actual_upload = upload_validator._get_parallel_uploads_count()
+            max_upload = upload_validator._get_max_parallel_uploads()
+            layers_count = len(layers)
+
+            if layers_count >= max_upload:
+                raise UploadParallelismLimitException(
+                    detail=f"The number of layers in the gpkg {layers_count} is greater than "
+                    f"the max parallel upload permitted: {max_upload} "
+                    f"please upload a smaller file"
+                )
+            elif layers_count + actual_upload >= max_upload:
+                raise UploadParallelismLimitException(
+                    detail=f"With the provided gpkg, the number of max parallel upload will exceed the limit of {max_upload}"
+                )
+
+        validator = validate_geopackage(files.get("base_file"))
         if not validator[-1]:
             error_to_raise = []
             for error in validator[0]:
@@ -1,4 +1,5 @@
 import shutil
+from unittest.mock import MagicMock, patch
 from django.test import TestCase, override_settings
 from importer.handlers.gpkg.exceptions import InvalidGeopackageException
 from django.contrib.auth import get_user_model
@@ -13,6 +14,7 @@ from django_celery_results.models import TaskResult
 from geonode.assets.handlers import asset_handler_registry
 
 from importer.handlers.gpkg.tasks import SingleMessageErrorHandler
+from importer.handlers.gpkg.utils import validate_geopackage
 
 
 class TestGPKGHandler(TestCase):
@@ -99,6 +101,44 @@ class TestGPKGHandler(TestCase):
     def test_is_valid_should_pass_with_valid_gpkg(self):
         self.handler.is_valid(files=self.valid_files, user=self.user)
 
+    @patch("importer.handlers.gpkg.utils.get_pool_executor")
+    @patch("importer.handlers.gpkg.utils.cache")
+    def test_validate_geopackage_should_use_the_cached_result(self, _cache, _pool):
+        _cache.get.return_value = ([], True)
+        actual = validate_geopackage(self.valid_gpkg)
+        self.assertTupleEqual(([], True), actual)
+        _pool.assert_not_called()
+
+    @patch("importer.handlers.gpkg.utils.cache")
+    def test_validate_geopackage_in_sample_mode_should_pass_with_valid_gpkg(
+        self, _cache
+    ):
+        _cache.get.return_value = None
+        errors, success = validate_geopackage(
+            self.valid_gpkg, rules=("RQ2", "RQ15"), mode="sample", sample_size=10
+        )
+        self.assertListEqual([], errors)
+        self.assertTrue(success)
+        _cache.set.assert_called_once()
+
+    @patch("importer.handlers.gpkg.utils.terminate_pool_executor")
+    @patch("importer.handlers.gpkg.utils.wait")
+    @patch("importer.handlers.gpkg.utils.get_pool_executor")
+    @patch("importer.handlers.gpkg.utils.cache")
+    def test_validate_geopackage_should_stop_the_rules_in_timeout(
+        self, _cache, _pool, _wait, terminate_pool_executor
+    ):
+        _cache.get.return_value = None
+        future = MagicMock()
+        _pool.return_value.submit.return_value = future
+        _wait.return_value = (set(), {future})
+
+        with self.assertRaises(InvalidGeopackageException):
+            validate_geopackage(self.valid_gpkg, rules=("RQ1",), timeout=1)
+
+        terminate_pool_executor.assert_called_once_with(_pool.return_value)
+        _cache.set.assert_not_called()
+
     def test_get_ogr2ogr_driver_should_return_the_expected_driver(self):
         expected = ogr.GetDriverByName("GPKG")
         actual = self.handler.get_ogr2ogr_driver()
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import wait
+
+from django.core.cache import cache
+from geopackage_validator.validate import validate
+from osgeo import ogr
+
+from importer.handlers.gpkg.exceptions import InvalidGeopackageException
+from importer.settings import (
+    IMPORTER_GPKG_VALIDATION_CACHE_TIMEOUT,
+    IMPORTER_GPKG_VALIDATION_MODE,
+    IMPORTER_GPKG_VALIDATION_SAMPLE_SIZE,
+    IMPORTER_GPKG_VALIDATION_TIMEOUT,
+    IMPORTER_GPKG_VALIDATION_WORKERS,
+)
+from importer.utils import get_pool_executor, terminate_pool_executor
+
+logger = logging.getLogger(__name__)
+
+"""
+Codes table definition is here: https://github.com/PDOK/geopackage-validator#what-does-it-do
+"""
+GPKG_VALIDATION_RULES = ("RQ1", "RQ2", "RQ13", "RQ14", "RQ15", "RC18")
+# rules that can be evaluated on a sample of the rows
+GPKG_SAMPLED_RULES = ("RQ2", "RQ15")
+
+
+def _validate_rule(gpkg_path, rule):
+    """
+    Run a single PDOK rule. Is executed inside the pool, so must be a module function
+    """
+    result = validate(gpkg_path=gpkg_path, validations=rule)
+    return result[0], result[-1]
+
+
+def _validate_rule_on_sample(gpkg_path, rule, sample_size):
+    """
+    Evaluate RQ2 and RQ15 reading only the first "sample_size" rows of each layer.
+    The errors are returned with the same structure of the PDOK validator
+    """
+    errors = []
+    datasource = ogr.Open(gpkg_path)
+    try:
+        geometry_columns = datasource.ExecuteSQL(
+            "SELECT table_name, column_name, geometry_type_name FROM gpkg_geometry_columns"
+        )
+        columns = [
+            (x.GetField(0), x.GetField(1), x.GetField(2)) for x in geometry_columns
+        ]
+        datasource.ReleaseResultSet(geometry_columns)
+
+        for table_name, column_name, geometry_type_name in columns:
+            if rule == "RQ2":
+                layer = datasource.GetLayerByName(table_name)
+                if layer is not None and layer.GetNextFeature() is None:
+                    errors.append(f"Error layer: {table_name}, found no features")
+            elif rule == "RQ15":
+                result = datasource.ExecuteSQL(
+                    f'SELECT DISTINCT upper(ST_GeometryType("{column_name}")) '
+                    f'FROM (SELECT "{column_name}" FROM "{table_name}" '
+                    f'WHERE "{column_name}" IS NOT NULL LIMIT {sample_size})'
+                )
+                found = {x.GetField(0) for x in result if x.GetField(0)}
+                datasource.ReleaseResultSet(result)
+                for geometry_type in found:
+                    # the Z/M dimensions are not part of the geometry_type_name
+                    if geometry_type.split(" ")[0] != geometry_type_name.upper():
+                        errors.append(
+                            f"Found geometry: {geometry_type} in layer: {table_name}, "
+                            f"expected: {geometry_type_name.upper()}"
+                        )
+    finally:
+        datasource = None
+
+    if not errors:
+        return [], True
+    return [
+        {
+            "validation_code": rule,
+            "validation_description": f"{rule} failed on the first {sample_size} rows of the layers",
+            "level": "ERROR",
+            "locations": errors,
+        }
+    ], False
+
+
+def get_file_key(path):
+    """
+    Identify the content of the file by path, size and modification time,
+    so the file is not read to look up the cached result
+    """
+    stat = os.stat(path)
+    return hashlib.md5(
+        f"{os.path.realpath(path)}_{stat.st_size}_{stat.st_mtime_ns}".encode()
+    ).hexdigest()
+
+
+def validate_geopackage(
+    gpkg_path,
+    rules=GPKG_VALIDATION_RULES,
+    mode=IMPORTER_GPKG_VALIDATION_MODE,
+    sample_size=IMPORTER_GPKG_VALIDATION_SAMPLE_SIZE,
+    timeout=IMPORTER_GPKG_VALIDATION_TIMEOUT,
+):
+    """
+    Run the PDOK validation rules concurrently, one rule for each worker.
+    The result is cached by path, size and modification time of the file, so the
+    validation of the same geopackage (for example after a retry) is not evaluated again.
+    On timeout the rules still running are stopped, except with the thread pool used
+    inside the celery workers where only the wait is stopped.
+    Return the same result of the PDOK validator: (errors, success)
+    """
+    cache_key = f"importer_gpkg_validation_{get_file_key(gpkg_path)}_{mode}_{sample_size}_{'_'.join(rules)}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using the cached validation result for {gpkg_path}")
+        return cached
+
+    executor = get_pool_executor(
+        max_workers=min(IMPORTER_GPKG_VALIDATION_WORKERS, len(rules))
+    )
+    futures = []
+    not_done = None
+    try:
+        futures = [
+            (
+                executor.submit(_validate_rule_on_sample, gpkg_path, rule, sample_size)
+                if mode == "sample" and rule in GPKG_SAMPLED_RULES
+                else executor.submit(_validate_rule, gpkg_path, rule)
+            )
+            for rule in rules
+        ]
+        _, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            raise InvalidGeopackageException(
+                f"The validation of the geopackage exceeded the timeout of {timeout} seconds"
+            )
+        results = [x.result() for x in futures]
+    finally:
+        # the pool is not joined, so a rule in timeout does not block the request
+        for future in futures:
+            future.cancel()
+        if not_done:
+            # the rules in timeout do not keep reading the file once the request is failed
+            terminate_pool_executor(executor)
+        else:
+            executor.shutdown(wait=False)
+
+    errors = [error for _errors, _ in results for error in _errors]
+    success = all(_success for _, _success in results)
+    cache.set(cache_key, (errors, success), IMPORTER_GPKG_VALIDATION_CACHE_TIMEOUT)
+    return errors, success
@@ -0,0 +1,9 @@
+from rest_framework.exceptions import APIException
+from rest_framework import status
+
+
+class InvalidImageMosaicException(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "The tiles provided for the ImageMosaic are invalid"
+    default_code = "invalid_imagemosaic"
+    category = "importer"
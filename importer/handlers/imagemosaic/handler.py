@@ -0,0 +1,322 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import List
+
+from geonode.resource.enumerator import ExecutionRequestAction as exa
+from geonode.upload.utils import UploadLimitValidator
+from osgeo import gdal, osr
+
+from importer.handlers.common.raster import BaseRasterFileHandler
+from importer.handlers.imagemosaic.exceptions import InvalidImageMosaicException
+from importer.orchestrator import orchestrator
+from importer.settings import IMPORTER_MOSAIC_WORKERS, IMPORTER_RASTER_COG_COMPRESSION
+from importer.utils import ImporterRequestAction as ira
+from importer.utils import get_pool_executor
+
+logger = logging.getLogger(__name__)
+
+TILE_EXTENSIONS = (".tif", ".tiff", ".geotif", ".geotiff")
+MOSAIC_DIR_SUFFIX = "_mosaic"
+
+
+def prepare_mosaic_tile(
+    tile_path: str, output_path: str, compression: str, target_crs: str = None
+) -> dict:
+    """
+    Validate a single tile and convert it to COG into the mosaic folder,
+    reprojecting it if a target CRS is provided.
+    Is executed inside the pool, so must be a module function
+    """
+    dataset = gdal.Open(tile_path)
+    if dataset is None:
+        raise ValueError(f"The tile {os.path.basename(tile_path)} is not a valid raster")
+    spatial_ref = dataset.GetSpatialRef()
+    if spatial_ref is None:
+        raise ValueError(
+            f"The tile {os.path.basename(tile_path)} does not have a Coordinate Reference System"
+        )
+    tile = {
+        "path": output_path,
+        "crs": spatial_ref.ExportToWkt(),
+        "bands": dataset.RasterCount,
+        "data_type": gdal.GetDataTypeName(dataset.GetRasterBand(1).DataType),
+    }
+    creation_options = [
+        f"COMPRESS={compression}",
+        "OVERVIEWS=AUTO",
+        "BIGTIFF=IF_SAFER",
+    ]
+    if target_crs:
+        target_ref = osr.SpatialReference()
+        target_ref.SetFromUserInput(target_crs)
+        if not spatial_ref.IsSame(target_ref):
+            gdal.Warp(
+                output_path,
+                dataset,
+                dstSRS=target_crs,
+                format="COG",
+                multithread=True,
+                creationOptions=creation_options,
+            )
+            dataset = None
+            return tile
+
+    if BaseRasterFileHandler.is_cog(tile_path):
+        dataset = None
+        shutil.copyfile(tile_path, output_path)
+        return tile
+
+    gdal.Translate(
+        output_path,
+        dataset,
+        format="COG",
+        creationOptions=creation_options,
+    )
+    dataset = None
+    return tile
+
+
+class ImageMosaicFileHandler(BaseRasterFileHandler):
+    """
+    Handler to import a zip of GeoTIFF tiles as a single GeoServer ImageMosaic
+    It must provide the task_lists required to comple the upload
+    """
+
+    ACTIONS = {
+        exa.IMPORT.value: (
+            "start_import",
+            "importer.import_resource",
+            "importer.publish_resource",
+            "importer.create_geonode_resource",
+        ),
+        ira.ROLLBACK.value: (
+            "start_rollback",
+            "importer.rollback",
+        ),
+    }
+
+    @property
+    def supported_file_extension_config(self):
+        return {
+            "id": "imagemosaic",
+            "label": "ImageMosaic",
+            "format": "raster",
+            "ext": ["zip"],
+            "mimeType": ["application/zip"],
+            "optional": ["xml", "sld"],
+        }
+
+    @classmethod
+    def get_task_list(cls, action) -> tuple:
+        # the tiles are already converted to COG during the import,
+        # so the optional steps of the raster are skipped
+        return super(BaseRasterFileHandler, cls).get_task_list(action)
+
+    @staticmethod
+    def get_tiles(base_file: str) -> List[str]:
+        """
+        Return the GeoTIFF extracted from the zip together with the base_file.
+        The granules written in the mosaic folder are skipped, otherwise
+        a second pass would ingest its own output
+        """
+        folder = Path(base_file).parent
+        return sorted(
+            str(_path)
+            for _path in folder.rglob("*")
+            if _path.is_file()
+            and _path.suffix.lower() in TILE_EXTENSIONS
+            and not _path.relative_to(folder).parts[0].endswith(MOSAIC_DIR_SUFFIX)
+        )
+
+    @staticmethod
+    def can_handle(_data) -> bool:
+        """
+        This endpoint will return True or False if with the info provided
+        the handler is able to handle the file or not.
+        Only zip with more than one GeoTIFF are handled, a zip with a
+        single GeoTIFF is handled by the GeoTiffFileHandler
+        """
+        base = _data.get("base_file")
+        if not base or not isinstance(base, str) or "zip_file" not in _data:
+            return False
+        if not base.lower().endswith(TILE_EXTENSIONS):
+            return False
+        return len(ImageMosaicFileHandler.get_tiles(base)) > 1
+
+    @staticmethod
+    def extract_params_from_data(_data, action=None):
+        """
+        Keep the name of the zip, is used as name of the mosaic
+        """
+        payload, _data = BaseRasterFileHandler.extract_params_from_data(
+            _data, action=action
+        )
+        if _data.get("original_zip_name"):
+            payload["original_zip_name"] = _data.pop("original_zip_name")
+        return payload, _data
+
+    @staticmethod
+    def is_valid(files, user, check_parallelism=True):
+        """
+        Define basic validation steps.
+        The validation of each tile is done in parallel during the import
+        """
+        # calling base validation checks
+        BaseRasterFileHandler.is_valid(files, user)
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            UploadLimitValidator(user).validate_parallelism_limit_per_user()
+
+        _file = files.get("base_file")
+        if not _file:
+            raise InvalidImageMosaicException("base file is not provided")
+
+        if not _file.lower().endswith(".vrt") and len(
+            ImageMosaicFileHandler.get_tiles(_file)
+        ) < 2:
+            raise InvalidImageMosaicException(
+                "At least two GeoTIFF are required to create an ImageMosaic"
+            )
+        return True
+
+    @staticmethod
+    def publish_resources(resources: List[str], catalog, store, workspace):
+        """
+        The mosaic folder is published as ImageMosaic coverage store.
+        GeoServer builds the granules index on the folder
+        """
+        for _resource in resources:
+            try:
+                catalog.create_coveragestore(
+                    _resource.get("name"),
+                    path=_resource.get("raster_path"),
+                    type="ImageMosaic",
+                    layer_name=_resource.get("name"),
+                    source_name=_resource.get("source_name"),
+                    workspace=workspace,
+                    overwrite=True,
+                    upload_data=False,
+                )
+            except Exception as e:
+                if (
+                    f"Resource named {_resource.get('name')} already exists in store:"
+                    in str(e)
+                ):
+                    continue
+                raise e
+        return True
+
+    def extract_resource_to_publish(
+        self, files, action, layer_name, alternate, **kwargs
+    ):
+        layers = gdal.Open(files.get("base_file"))
+        if not layers:
+            return []
+        mosaic_dir = files.get("mosaic_dir")
+        return [
+            {
+                "name": alternate or layer_name,
+                "crs": (
+                    self.identify_authority(layers) if layers.GetSpatialRef() else None
+                ),
+                "raster_path": mosaic_dir,
+                "source_name": os.path.basename(mosaic_dir),
+            }
+        ]
+
+    def prepare_import(self, files, execution_id, **kwargs):
+        """
+        Validate and convert to COG the tiles in parallel into the mosaic folder.
+        A VRT over the COG tiles is used as base_file of the execution,
+        so the standard raster workflow can read name, CRS and extent of the mosaic
+        """
+        base_file = files.get("base_file")
+        if not base_file or base_file.lower().endswith(".vrt"):
+            # the mosaic is already available, for example on retry
+            return
+
+        _exec = self._get_execution_request_object(execution_id)
+        name = self.fixup_name(
+            _exec.input_params.get("original_zip_name") or Path(base_file).stem
+        )
+        tiles = self.get_tiles(base_file)
+        root = Path(base_file).parent
+        mosaic_dir = os.path.join(root, f"{name}{MOSAIC_DIR_SUFFIX}")
+        os.makedirs(mosaic_dir, exist_ok=True)
+
+        target_crs = _exec.input_params.get("target_crs")
+        executor = get_pool_executor(max_workers=IMPORTER_MOSAIC_WORKERS)
+        try:
+            futures = [
+                executor.submit(
+                    prepare_mosaic_tile,
+                    tile,
+                    os.path.join(mosaic_dir, f"{index:06d}_{Path(tile).stem}.tif"),
+                    IMPORTER_RASTER_COG_COMPRESSION,
+                    target_crs,
+                )
+                for index, tile in enumerate(tiles)
+            ]
+            prepared = [future.result() for future in futures]
+        except Exception as e:
+            shutil.rmtree(mosaic_dir, ignore_errors=True)
+            raise InvalidImageMosaicException(str(e))
+        finally:
+            executor.shutdown(wait=True)
+
+        self._validate_tiles_consistency(prepared, mosaic_dir)
+
+        vrt_path = os.path.join(root, f"{name}.vrt")
+        gdal.BuildVRT(vrt_path, [tile["path"] for tile in prepared])
+
+        files.update({"base_file": vrt_path, "mosaic_dir": mosaic_dir})
+        extra_params = {}
+        if target_crs:
+            # the granules are reprojected, the CRS of the original tiles is kept
+            extra_params["native_crs"] = self.identify_authority(gdal.Open(tiles[0]))
+        orchestrator.update_execution_request_status(
+            execution_id=str(execution_id),
+            input_params={
+                **_exec.input_params,
+                "files": {**_exec.input_params.get("files", {}), **files},
+                "total_tiles": len(prepared),
+                **extra_params,
+            },
+        )
+        self._add_file_to_asset(_exec, vrt_path, *[tile["path"] for tile in prepared])
+
+    def _validate_tiles_consistency(self, tiles: List[dict], mosaic_dir: str):
+        """
+        All the granules of a mosaic must share CRS, number of bands and data type
+        """
+        reference = tiles[0]
+        reference_crs = osr.SpatialReference(wkt=reference["crs"])
+        for tile in tiles[1:]:
+            error = None
+            if not reference_crs.IsSame(osr.SpatialReference(wkt=tile["crs"])):
+                error = "has a different Coordinate Reference System"
+            elif tile["bands"] != reference["bands"]:
+                error = "has a different number of bands"
+            elif tile["data_type"] != reference["data_type"]:
+                error = "has a different data type"
+            if error:
+                shutil.rmtree(mosaic_dir, ignore_errors=True)
+                raise InvalidImageMosaicException(
+                    f"The tile {os.path.basename(tile['path'])} {error} from the others"
+                )
+
+    def _import_resource_rollback(self, exec_id, istance_name=None, *args, **kwargs):
+        """
+        Remove the mosaic folder and the VRT generated during the import
+        """
+        _exec = self._get_execution_request_object(exec_id)
+        files = (_exec.input_params.get("files") or {}) if _exec else {}
+        if files.get("mosaic_dir"):
+            shutil.rmtree(files.get("mosaic_dir"), ignore_errors=True)
+        if files.get("base_file", "").lower().endswith(".vrt") and os.path.exists(
+            files.get("base_file")
+        ):
+            os.remove(files.get("base_file"))
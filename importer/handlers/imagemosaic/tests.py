@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+from django.test import TestCase
+from importer import project_dir
+from importer.handlers.imagemosaic.exceptions import InvalidImageMosaicException
+from importer.handlers.imagemosaic.handler import (
+    ImageMosaicFileHandler,
+    prepare_mosaic_tile,
+)
+
+
+class TestImageMosaicFileHandler(TestCase):
+    databases = ("default",)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.handler = ImageMosaicFileHandler()
+        cls.valid_tiff = f"{project_dir}/tests/fixture/test_grid.tif"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tiles = [
+            shutil.copy(self.valid_tiff, os.path.join(self.tmp_dir, f"tile_{x}.tif"))
+            for x in range(2)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_task_list_is_the_expected_one(self):
+        expected = (
+            "start_import",
+            "importer.import_resource",
+            "importer.publish_resource",
+            "importer.create_geonode_resource",
+        )
+        self.assertTupleEqual(expected, self.handler.get_task_list("import"))
+        self.assertNotIn("copy", self.handler.ACTIONS)
+
+    def test_can_handle_should_return_true_for_zip_of_tiles(self):
+        actual = self.handler.can_handle(
+            {"base_file": self.tiles[0], "zip_file": "tiles.zip"}
+        )
+        self.assertTrue(actual)
+
+    def test_can_handle_should_return_false_for_zip_with_single_tif(self):
+        os.remove(self.tiles[1])
+        actual = self.handler.can_handle(
+            {"base_file": self.tiles[0], "zip_file": "tiles.zip"}
+        )
+        self.assertFalse(actual)
+
+    def test_get_tiles_should_skip_the_mosaic_folder(self):
+        mosaic_dir = os.path.join(self.tmp_dir, "tiles_mosaic")
+        os.makedirs(mosaic_dir)
+        shutil.copy(self.valid_tiff, os.path.join(mosaic_dir, "000000_tile_0.tif"))
+
+        self.assertListEqual(sorted(self.tiles), self.handler.get_tiles(self.tiles[0]))
+
+    def test_can_handle_should_return_false_if_not_a_zip(self):
+        self.assertFalse(self.handler.can_handle({"base_file": self.tiles[0]}))
+
+    def test_prepare_mosaic_tile_should_convert_to_cog(self):
+        output = os.path.join(self.tmp_dir, "cog.tif")
+        tile = prepare_mosaic_tile(self.tiles[0], output, "DEFLATE")
+        self.assertEqual(output, tile["path"])
+        self.assertTrue(self.handler.is_cog(output))
+        self.assertGreater(tile["bands"], 0)
+
+    def test_validate_tiles_consistency_should_raise_if_bands_are_different(self):
+        tile = prepare_mosaic_tile(
+            self.tiles[0], os.path.join(self.tmp_dir, "cog.tif"), "DEFLATE"
+        )
+        with self.assertRaises(InvalidImageMosaicException):
+            self.handler._validate_tiles_consistency(
+                [tile, {**tile, "bands": tile["bands"] + 1}], self.tmp_dir
+            )
@@ -19,6 +19,8 @@ class KMLFileHandler(BaseVectorFileHandler):
     It must provide the task_lists required to comple the upload
     """
 
+    REMOTE_READ_SUPPORTED = True
+
     ACTIONS = {
         exa.IMPORT.value: (
             "start_import",
@@ -73,7 +75,7 @@ class KMLFileHandler(BaseVectorFileHandler):
         )
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps:
         Upload limit:
@@ -82,29 +84,30 @@ class KMLFileHandler(BaseVectorFileHandler):
         """
         # calling base validation checks
         BaseVectorFileHandler.is_valid(files, user)
-        # getting the upload limit validation
-        upload_validator = UploadLimitValidator(user)
-        upload_validator.validate_parallelism_limit_per_user()
-        actual_upload = upload_validator._get_parallel_uploads_count()
-        max_upload = upload_validator._get_max_parallel_uploads()
-
         layers = KMLFileHandler().get_ogr2ogr_driver().Open(files.get("base_file"))
 
         if not layers:
             raise InvalidKmlException("The kml provided is invalid")
 
-        layers_count = len(layers)
-
-        if layers_count >= max_upload:
-            raise UploadParallelismLimitException(
-                detail=f"The number of layers in the kml {layers_count} is greater than "
-                f"the max parallel upload permitted: {max_upload} "
-                f"please upload a smaller file"
-            )
-        elif layers_count + actual_upload >= max_upload:
-            raise UploadParallelismLimitException(
-                detail=f"With the provided kml, the number of max parallel upload will exceed the limit of {max_upload}"
-            )
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            upload_validator = UploadLimitValidator(user)
+            upload_validator.validate_parallelism_limit_per_user()
+            actual_upload = upload_validator._get_parallel_uploads_count()
+            max_upload = upload_validator._get_max_parallel_uploads()
+            layers_count = len(layers)
+
+            if layers_count >= max_upload:
+                raise UploadParallelismLimitException(
+                    detail=f"The number of layers in the kml {layers_count} is greater than "
+                    f"the max parallel upload permitted: {max_upload} "
+                    f"please upload a smaller file"
+                )
+            elif layers_count + actual_upload >= max_upload:
+                raise UploadParallelismLimitException(
+                    detail=f"With the provided kml, the number of max parallel upload will exceed the limit of {max_upload}"
+                )
 
         filename = os.path.basename(files.get("base_file"))
 
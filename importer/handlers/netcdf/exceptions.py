@@ -0,0 +1,9 @@
+from rest_framework.exceptions import APIException
+from rest_framework import status
+
+
+class InvalidNetCDFException(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "The NetCDF/HDF file provided is invalid"
+    default_code = "invalid_netcdf"
+    category = "importer"
@@ -0,0 +1,434 @@
+import logging
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from geonode.resource.enumerator import ExecutionRequestAction as exa
+from geonode.upload.utils import UploadLimitValidator
+from geoserver.support import DimensionInfo
+from osgeo import gdal
+
+from importer.handlers.common.raster import BaseRasterFileHandler
+from importer.handlers.imagemosaic.handler import ImageMosaicFileHandler
+from importer.handlers.netcdf.exceptions import InvalidNetCDFException
+from importer.orchestrator import orchestrator
+from importer.settings import IMPORTER_MOSAIC_WORKERS, IMPORTER_RASTER_COG_COMPRESSION
+from importer.utils import ImporterRequestAction as ira
+from importer.utils import get_pool_executor
+
+logger = logging.getLogger(__name__)
+
+NETCDF_EXTENSIONS = ("nc", "nc4", "cdf", "h5", "hdf5", "he5", "hdf")
+
+STANDARD_CALENDARS = ("standard", "gregorian", "proleptic_gregorian", "julian")
+CALENDAR_MONTH_DAYS = {
+    "noleap": (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    "365_day": (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    "360_day": (30,) * 12,
+}
+TIME_UNITS = {
+    "seconds": 1,
+    "second": 1,
+    "secs": 1,
+    "sec": 1,
+    "s": 1,
+    "minutes": 60,
+    "minute": 60,
+    "mins": 60,
+    "min": 60,
+    "hours": 3600,
+    "hour": 3600,
+    "hrs": 3600,
+    "hr": 3600,
+    "h": 3600,
+    "days": 86400,
+    "day": 86400,
+    "d": 86400,
+}
+# format of the time in the name of the granules, is parsed by GeoServer with the timeregex
+TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+MOSAIC_INDEXER = """TimeAttribute=ingestion
+Schema=*the_geom:Polygon,location:String,ingestion:java.util.Date
+PropertyCollectors=TimestampFileNameExtractorSPI[timeregex](ingestion)
+"""
+# anchored to the "_<time>.tif" suffix of the granules, so the digits in the
+# name of the variable or of the file are not read as time.
+# The dot is in a class since the backslashes are dropped by the properties parser
+MOSAIC_TIMEREGEX = (
+    "regex=(?<=_)[0-9]{8}T[0-9]{6}(?=[.]tif$),format=yyyyMMdd'T'HHmmss\n"
+)
+
+
+def _add_calendar_days(origin: datetime, days: float, _calendar: str) -> datetime:
+    """
+    Add the days to the origin, following the CF calendar of the time dimension
+    """
+    if _calendar in STANDARD_CALENDARS:
+        return origin + timedelta(days=days)
+    if _calendar not in CALENDAR_MONTH_DAYS:
+        raise InvalidNetCDFException(f"The calendar {_calendar} is not supported")
+
+    month_days = CALENDAR_MONTH_DAYS[_calendar]
+    whole_days, fraction = divmod(days, 1)
+    day_of_year = sum(month_days[: origin.month - 1]) + origin.day - 1 + int(whole_days)
+    year, day_of_year = divmod(day_of_year, sum(month_days))
+    month = 0
+    while day_of_year >= month_days[month]:
+        day_of_year -= month_days[month]
+        month += 1
+    try:
+        date = datetime(
+            origin.year + year,
+            month + 1,
+            day_of_year + 1,
+            origin.hour,
+            origin.minute,
+            origin.second,
+        )
+    except ValueError:
+        # eg: the 30th of February of the 360_day calendar, moving it to another day
+        # would give two slices the same time (and the same granule)
+        raise InvalidNetCDFException(
+            f"The date {origin.year + year}-{month + 1:02d}-{day_of_year + 1:02d} of the {_calendar} calendar does not exist in the gregorian calendar"
+        )
+    return date + timedelta(days=fraction)
+
+
+def get_slice_time(value: float, units: str, _calendar: str = "standard") -> datetime:
+    """
+    Convert the value of a CF time dimension (eg: "days since 1850-01-01") to datetime
+    """
+    unit, _, origin = units.partition(" since ")
+    seconds = TIME_UNITS.get(unit.strip().lower())
+    match = re.match(
+        r"\s*(\d{1,4})-(\d{1,2})-(\d{1,2})(?:[ T](\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?",
+        origin,
+    )
+    if not seconds or not match:
+        raise InvalidNetCDFException(f"The time units {units} are not supported")
+    origin = datetime(*[int(x) for x in match.groups() if x is not None])
+    return _add_calendar_days(
+        origin, value * seconds / 86400, (_calendar or "standard").lower()
+    )
+
+
+def get_time_slices(dataset) -> List[tuple]:
+    """
+    Return the bands to export as (band index, timestamp).
+    A band is a slice of the variable, only the slices with the other dimensions
+    (eg: the depth) at their first value are imported.
+    Without a time dimension only the first band is imported
+    """
+    metadata = dataset.GetMetadata()
+    extra_dimensions = [
+        x for x in metadata.get("NETCDF_DIM_EXTRA", "").strip("{}").split(",") if x
+    ]
+    time_dimension = next(
+        (x for x in extra_dimensions if " since " in metadata.get(f"{x}#units", "")),
+        None,
+    )
+    if time_dimension is None:
+        return [(1, None)]
+
+    units = metadata.get(f"{time_dimension}#units")
+    _calendar = metadata.get(f"{time_dimension}#calendar", "standard")
+    slices = []
+    first_values = {}
+    for band_index in range(1, dataset.RasterCount + 1):
+        band_metadata = dataset.GetRasterBand(band_index).GetMetadata()
+        dimensions = {
+            x: band_metadata.get(f"NETCDF_DIM_{x}") for x in extra_dimensions
+        }
+        time_value = dimensions.pop(time_dimension)
+        if any(
+            value != first_values.setdefault(key, value)
+            for key, value in dimensions.items()
+        ):
+            continue
+        timestamp = get_slice_time(float(time_value), units, _calendar).strftime(
+            TIME_FORMAT
+        )
+        if any(timestamp == x for _, x in slices):
+            # the granules of the mosaic are named by time, so they would overwrite each other
+            raise InvalidNetCDFException(
+                f"More than one time slice at {timestamp}, the variable cannot be published as mosaic"
+            )
+        slices.append((band_index, timestamp))
+    return slices
+
+
+def export_slice(
+    subdataset: str,
+    band_index: int,
+    output_path: str,
+    compression: str,
+    target_crs: str = None,
+) -> str:
+    """
+    Export a single slice of the variable as COG granule of the mosaic.
+    Is executed inside the pool, so must be a module function
+    """
+    source = gdal.Translate("", subdataset, format="VRT", bandList=[band_index])
+    creation_options = [
+        f"COMPRESS={compression}",
+        "OVERVIEWS=AUTO",
+        "BIGTIFF=IF_SAFER",
+    ]
+    if target_crs:
+        gdal.Warp(
+            output_path,
+            source,
+            dstSRS=target_crs,
+            format="COG",
+            multithread=True,
+            creationOptions=creation_options,
+        )
+    else:
+        gdal.Translate(
+            output_path, source, format="COG", creationOptions=creation_options
+        )
+    source = None
+    return output_path
+
+
+class NetCDFFileHandler(BaseRasterFileHandler):
+    """
+    Handler to import the multidimensional rasters (NetCDF/HDF).
+    Each variable is imported as a time-enabled ImageMosaic
+    It must provide the task_lists required to comple the upload
+    """
+
+    ACTIONS = {
+        exa.IMPORT.value: (
+            "start_import",
+            "importer.import_resource",
+            "importer.publish_resource",
+            "importer.create_geonode_resource",
+        ),
+        ira.ROLLBACK.value: (
+            "start_rollback",
+            "importer.rollback",
+        ),
+    }
+
+    @property
+    def supported_file_extension_config(self):
+        return {
+            "id": "netcdf",
+            "label": "NetCDF/HDF",
+            "format": "raster",
+            "ext": list(NETCDF_EXTENSIONS),
+            "mimeType": ["application/x-netcdf", "application/x-hdf"],
+            "optional": ["xml", "sld"],
+        }
+
+    @classmethod
+    def get_task_list(cls, action) -> tuple:
+        # the slices are already exported to COG during the import,
+        # so the optional steps of the raster are skipped
+        return super(BaseRasterFileHandler, cls).get_task_list(action)
+
+    @staticmethod
+    def can_handle(_data) -> bool:
+        """
+        This endpoint will return True or False if with the info provided
+        the handler is able to handle the file or not
+        """
+        base = _data.get("base_file")
+        if not base:
+            return False
+        filename = base if isinstance(base, str) else base.name
+        return filename.split(".")[-1].lower() in NETCDF_EXTENSIONS
+
+    @staticmethod
+    def is_valid(files, user, check_parallelism=True):
+        """
+        Define basic validation steps:
+        """
+        # calling base validation checks
+        BaseRasterFileHandler.is_valid(files, user)
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            UploadLimitValidator(user).validate_parallelism_limit_per_user()
+
+        _file = files.get("base_file")
+        if not _file:
+            raise InvalidNetCDFException("base file is not provided")
+
+        try:
+            variables = NetCDFFileHandler.get_variables(_file)
+        except Exception as e:
+            raise InvalidNetCDFException(f"The file cannot be opened: {e}")
+        if not variables:
+            raise InvalidNetCDFException(
+                "The file does not contain any georeferenced variable"
+            )
+        return True
+
+    @staticmethod
+    def get_variables(raster_path: str) -> List[dict]:
+        """
+        Enumerate the subdatasets of the file, only the georeferenced
+        variables (not the bounds or the coordinates) can be imported
+        """
+        dataset = gdal.Open(raster_path)
+        subdatasets = [name for name, _ in dataset.GetSubDatasets()] or [raster_path]
+        dataset = None
+
+        variables = []
+        for subdataset in subdatasets:
+            _dataset = gdal.Open(subdataset)
+            if (
+                _dataset is None
+                or _dataset.GetSpatialRef() is None
+                or _dataset.RasterXSize < 2
+                or _dataset.RasterYSize < 2
+            ):
+                continue
+            name = (
+                subdataset.split(":")[-1].split("/")[-1]
+                if subdataset != raster_path
+                else Path(raster_path).stem
+            )
+            variables.append(
+                {
+                    "name": name,
+                    "subdataset": subdataset,
+                    "slices": get_time_slices(_dataset),
+                }
+            )
+            _dataset = None
+        return variables
+
+    def get_variable_layer_name(self, base_file: str, variable: str) -> str:
+        return self.fixup_name(f"{Path(base_file).stem}_{variable}")
+
+    @staticmethod
+    def get_mosaic_dir(base_file: str, layer_name: str) -> str:
+        return os.path.join(os.path.dirname(base_file), f"{layer_name}_mosaic")
+
+    def get_raster_layers(self, files: dict, _exec) -> List[str]:
+        """
+        One layer is created for each variable exported during the prepare_import
+        """
+        return list((_exec.input_params.get("variables") or {}).keys())
+
+    def prepare_import(self, files, execution_id, **kwargs):
+        """
+        Export the slices of each variable to COG in parallel.
+        The granules of a variable are saved in its own folder, which is
+        then published as ImageMosaic with the time extracted from the granule name
+        """
+        base_file = files.get("base_file")
+        _exec = self._get_execution_request_object(execution_id)
+        if _exec.input_params.get("variables"):
+            # the slices are already available, for example on retry
+            return
+
+        target_crs = _exec.input_params.get("target_crs")
+        variables = {}
+        jobs = []
+        for variable in self.get_variables(base_file):
+            layer_name = self.get_variable_layer_name(base_file, variable["name"])
+            mosaic_dir = self.get_mosaic_dir(base_file, layer_name)
+            os.makedirs(mosaic_dir, exist_ok=True)
+            for band_index, timestamp in variable["slices"]:
+                filename = f"{layer_name}_{timestamp}.tif" if timestamp else f"{layer_name}.tif"
+                jobs.append(
+                    (variable["subdataset"], band_index, os.path.join(mosaic_dir, filename))
+                )
+            time_enabled = variable["slices"][0][1] is not None
+            if time_enabled:
+                with open(os.path.join(mosaic_dir, "indexer.properties"), "w") as _file:
+                    _file.write(MOSAIC_INDEXER)
+                with open(os.path.join(mosaic_dir, "timeregex.properties"), "w") as _file:
+                    _file.write(MOSAIC_TIMEREGEX)
+            variables[layer_name] = {
+                "variable": variable["name"],
+                "slices": len(variable["slices"]),
+                "time": time_enabled,
+            }
+
+        executor = get_pool_executor(max_workers=IMPORTER_MOSAIC_WORKERS)
+        try:
+            futures = [
+                executor.submit(
+                    export_slice, *job, IMPORTER_RASTER_COG_COMPRESSION, target_crs
+                )
+                for job in jobs
+            ]
+            granules = [future.result() for future in futures]
+        except Exception as e:
+            for layer_name in variables:
+                shutil.rmtree(self.get_mosaic_dir(base_file, layer_name), ignore_errors=True)
+            raise InvalidNetCDFException(str(e))
+        finally:
+            executor.shutdown(wait=True)
+
+        extra_params = {}
+        if target_crs and jobs:
+            # the granules are reprojected, the CRS of the variables is kept
+            extra_params["native_crs"] = self.identify_authority(gdal.Open(jobs[0][0]))
+        orchestrator.update_execution_request_status(
+            execution_id=str(execution_id),
+            input_params={
+                **_exec.input_params,
+                "variables": variables,
+                **extra_params,
+            },
+        )
+        self._add_file_to_asset(_exec, *granules)
+
+    def extract_resource_to_publish(
+        self, files, action, layer_name, alternate, **kwargs
+    ):
+        mosaic_dir = self.get_mosaic_dir(files.get("base_file"), layer_name)
+        granules = sorted(Path(mosaic_dir).glob("*.tif"))
+        if not granules:
+            return []
+        layers = gdal.Open(str(granules[0]))
+        return [
+            {
+                "name": alternate or layer_name,
+                "crs": (
+                    self.identify_authority(layers) if layers.GetSpatialRef() else None
+                ),
+                "raster_path": mosaic_dir,
+                "source_name": os.path.basename(mosaic_dir),
+                "time": os.path.exists(os.path.join(mosaic_dir, "timeregex.properties")),
+            }
+        ]
+
+    @staticmethod
+    def publish_resources(resources: List[str], catalog, store, workspace):
+        """
+        Each variable is published as ImageMosaic coverage store,
+        then the time dimension of the coverage is enabled
+        """
+        ImageMosaicFileHandler.publish_resources(resources, catalog, store, workspace)
+        for _resource in resources:
+            if not _resource.get("time"):
+                continue
+            coverage = catalog.get_resource(_resource.get("name"), workspace=workspace)
+            coverage.metadata = {
+                **(coverage.metadata or {}),
+                "time": DimensionInfo("time", "true", "LIST", None, "ISO8601", None),
+            }
+            catalog.save(coverage)
+        return True
+
+    def _import_resource_rollback(self, exec_id, istance_name=None, *args, **kwargs):
+        """
+        Remove the folders of the granules exported during the import
+        """
+        _exec = self._get_execution_request_object(exec_id)
+        if not _exec:
+            return
+        base_file = (_exec.input_params.get("files") or {}).get("base_file")
+        for layer_name in _exec.input_params.get("variables") or {}:
+            shutil.rmtree(self.get_mosaic_dir(base_file, layer_name), ignore_errors=True)
@@ -0,0 +1,133 @@
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+from osgeo import gdal
+
+from importer import project_dir
+from importer.handlers.netcdf.exceptions import InvalidNetCDFException
+from importer.handlers.netcdf.handler import (
+    MOSAIC_TIMEREGEX,
+    NetCDFFileHandler,
+    export_slice,
+    get_slice_time,
+    get_time_slices,
+)
+
+
+class TestNetCDFFileHandler(TestCase):
+    databases = ("default",)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.handler = NetCDFFileHandler()
+        cls.valid_tiff = f"{project_dir}/tests/fixture/test_grid.tif"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.valid_netcdf = os.path.join(self.tmp_dir, "test_grid.nc")
+        gdal.Translate(self.valid_netcdf, self.valid_tiff, format="netCDF")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_task_list_is_the_expected_one(self):
+        expected = (
+            "start_import",
+            "importer.import_resource",
+            "importer.publish_resource",
+            "importer.create_geonode_resource",
+        )
+        self.assertTupleEqual(expected, self.handler.get_task_list("import"))
+        self.assertNotIn("copy", self.handler.ACTIONS)
+
+    def test_can_handle_should_return_true_for_netcdf_and_hdf(self):
+        self.assertTrue(self.handler.can_handle({"base_file": "climate.nc"}))
+        self.assertTrue(self.handler.can_handle({"base_file": "climate.h5"}))
+        self.assertFalse(self.handler.can_handle({"base_file": "climate.tif"}))
+
+    def test_get_slice_time_with_standard_calendar(self):
+        self.assertEqual(
+            datetime(2000, 3, 1, 12),
+            get_slice_time(60.5, "days since 2000-01-01 00:00:00"),
+        )
+        self.assertEqual(
+            datetime(2000, 1, 2),
+            get_slice_time(24, "hours since 2000-01-01"),
+        )
+
+    def test_get_slice_time_with_model_calendars(self):
+        # 2000 is a leap year, but not in the noleap calendar
+        self.assertEqual(
+            datetime(2000, 3, 1), get_slice_time(59, "days since 2000-01-01", "noleap")
+        )
+        self.assertEqual(
+            datetime(2001, 1, 1), get_slice_time(360, "days since 2000-01-01", "360_day")
+        )
+
+    def test_get_slice_time_should_raise_with_dates_not_in_the_gregorian_calendar(self):
+        self.assertEqual(
+            datetime(2001, 2, 28), get_slice_time(57, "days since 2001-01-01", "360_day")
+        )
+        # 29th and 30th of February
+        for value in (58, 59):
+            with self.assertRaises(InvalidNetCDFException):
+                get_slice_time(value, "days since 2001-01-01", "360_day")
+
+    def test_get_time_slices_should_raise_with_duplicated_times(self):
+        dataset = MagicMock(RasterCount=2)
+        dataset.GetMetadata.return_value = {
+            "NETCDF_DIM_EXTRA": "{time}",
+            "time#units": "seconds since 2000-01-01",
+        }
+        bands_metadata = [{"NETCDF_DIM_time": "0.2"}, {"NETCDF_DIM_time": "0.4"}]
+        dataset.GetRasterBand.side_effect = lambda index: MagicMock(
+            **{"GetMetadata.return_value": bands_metadata[index - 1]}
+        )
+        with self.assertRaises(InvalidNetCDFException):
+            get_time_slices(dataset)
+
+    def test_get_slice_time_should_raise_with_unsupported_units(self):
+        with self.assertRaises(InvalidNetCDFException):
+            get_slice_time(1, "months since 2000-01-01")
+
+    def test_get_time_slices_should_keep_the_other_dimensions_at_first_value(self):
+        dataset = MagicMock(RasterCount=4)
+        dataset.GetMetadata.return_value = {
+            "NETCDF_DIM_EXTRA": "{time,lev}",
+            "time#units": "days since 2000-01-01",
+        }
+        bands_metadata = [
+            {"NETCDF_DIM_time": "0", "NETCDF_DIM_lev": "10"},
+            {"NETCDF_DIM_time": "0", "NETCDF_DIM_lev": "20"},
+            {"NETCDF_DIM_time": "1", "NETCDF_DIM_lev": "10"},
+            {"NETCDF_DIM_time": "1", "NETCDF_DIM_lev": "20"},
+        ]
+        dataset.GetRasterBand.side_effect = lambda index: MagicMock(
+            **{"GetMetadata.return_value": bands_metadata[index - 1]}
+        )
+        self.assertListEqual(
+            [(1, "20000101T000000"), (3, "20000102T000000")],
+            get_time_slices(dataset),
+        )
+
+    def test_timeregex_should_match_only_the_time_suffix(self):
+        regex = MOSAIC_TIMEREGEX.split(",format=")[0][len("regex="):]
+        actual = re.findall(regex, "temp_20000101T000000_20210304T050607.tif")
+        self.assertListEqual(["20210304T050607"], actual)
+
+    def test_get_variables_without_subdatasets(self):
+        variables = self.handler.get_variables(self.valid_netcdf)
+        self.assertEqual(1, len(variables))
+        self.assertEqual("test_grid", variables[0]["name"])
+        self.assertListEqual([(1, None)], variables[0]["slices"])
+
+    def test_export_slice_should_create_a_cog(self):
+        output = os.path.join(self.tmp_dir, "slice.tif")
+        export_slice(self.valid_netcdf, 1, output, "DEFLATE")
+        self.assertTrue(self.handler.is_cog(output))
@@ -237,3 +237,9 @@ class TestRemoteWMSResourceHandler(TestCase):
         self.assertTrue(
             ResourceBase.objects.filter(alternate="layeralternate").exists()
         )
+
+    def test_needs_thumbnail_only_with_the_bbox(self):
+        _exec = MagicMock(input_params={"bbox": ["1", "2", "3", "4"]})
+        self.assertTrue(self.handler.needs_thumbnail(MagicMock(), _exec))
+        _exec.input_params = {}
+        self.assertFalse(self.handler.needs_thumbnail(MagicMock(), _exec))
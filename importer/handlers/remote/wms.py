@@ -9,7 +9,6 @@ from importer.handlers.remote.serializers.wms import RemoteWMSSerializer
 from importer.orchestrator import orchestrator
 from geonode.harvesting.harvesters.wms import WebMapService
 from geonode.services.serviceprocessors.wms import WmsServiceHandler
-from geonode.resource.manager import resource_manager
 
 logger = logging.getLogger(__name__)
 
@@ -128,9 +127,15 @@ class RemoteWMSResourceHandler(BaseRemoteResourceHandler):
         remote_bbox = _exec.input_params.get("bbox")
         if remote_bbox:
             resource.set_bbox_polygon(remote_bbox, "EPSG:4326")
-            resource_manager.set_thumbnail(None, instance=resource)
+            self.set_thumbnail(resource)
         return resource
 
+    def needs_thumbnail(self, resource, _exec) -> bool:
+        """
+        The thumbnail of the remote layer is generated only if the bbox is provided
+        """
+        return bool(_exec.input_params.get("bbox"))
+
     def generate_resource_payload(
         self, layer_name, alternate, asset, _exec, workspace, **kwargs
     ):
@@ -9,6 +9,7 @@ from osgeo import ogr
 from pathlib import Path
 
 from importer.handlers.shapefile.exceptions import InvalidShapeFileException
+from importer.handlers.utils import get_target_crs
 from importer.handlers.shapefile.serializer import ShapeFileSerializer
 from importer.utils import ImporterRequestAction as ira
 
@@ -92,18 +93,20 @@ class ShapeFileHandler(BaseVectorFileHandler):
             "overwrite_existing_layer": _data.pop("overwrite_existing_layer", "False"),
             "store_spatial_file": _data.pop("store_spatial_files", "True"),
             "source": _data.pop("source", "upload"),
+            "target_crs": get_target_crs(_data),
         }
 
         return additional_params, _data
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps:
         """
-        # getting the upload limit validation
-        upload_validator = UploadLimitValidator(user)
-        upload_validator.validate_parallelism_limit_per_user()
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            UploadLimitValidator(user).validate_parallelism_limit_per_user()
 
         _file = files.get("base_file")
         if not _file:
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from dynamic_rest.serializers import DynamicModelSerializer
 from geonode.upload.models import Upload
+from importer.api.serializer import validate_crs
 
 
 class ShapeFileSerializer(DynamicModelSerializer):
@@ -19,6 +20,7 @@ class ShapeFileSerializer(DynamicModelSerializer):
             "overwrite_existing_layer",
             "skip_existing_layers",
             "source",
+            "target_crs",
         )
 
     base_file = serializers.FileField()
@@ -31,3 +33,4 @@ class ShapeFileSerializer(DynamicModelSerializer):
     overwrite_existing_layer = serializers.BooleanField(required=False, default=False)
     skip_existing_layers = serializers.BooleanField(required=False, default=False)
     source = serializers.CharField(required=False, default="upload")
+    target_crs = serializers.CharField(required=False, validators=[validate_crs])
@@ -50,7 +50,7 @@ class SLDFileHandler(MetadataFileHandler):
         )
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps
         """
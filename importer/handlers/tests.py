@@ -1,12 +1,34 @@
-from django.test import TestCase
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
 from geonode.base.populate_test_data import create_single_dataset
 from django.contrib.auth import get_user_model
 from dynamic_models.models import ModelSchema
+import os
+from unittest.mock import patch
+import tarfile
+import tempfile
+from importer import project_dir
+from importer.api.exception import InvalidInputFileException
 from importer.handlers.utils import (
+    _run_on_new_connection,
+    copy_table,
     create_alternate,
     drop_dynamic_model_schema,
+    get_compressed_member,
+    get_target_crs,
+    get_vsi_path,
+    identify_crs_authority,
+    link_or_copy_file,
+    normalize_crs,
+    open_uncompressed,
+    prefetch_existing_resources,
+    register_layer_to_publish,
+    resolve_crs_authority,
     should_be_imported,
 )
+from importer.models import CRSAuthority
+from geonode.resource.models import ExecutionRequest
+from osgeo import osr
 
 
 class TestHandlersUtils(TestCase):
@@ -42,6 +64,37 @@ class TestHandlersUtils(TestCase):
         )
         self.assertFalse(result)
 
+    def test_should_be_imported_with_prefetched_resources(self):
+        """
+        The existing datasets and schemas are loaded once and
+        should_be_imported does not run any query
+        """
+        user, _ = get_user_model().objects.get_or_create(username="admin")
+        dataset = create_single_dataset(name="single_dataset", owner=user)
+        schema = ModelSchema.objects.create(name="single_dataset", db_name="datastore")
+        try:
+            prefetched = prefetch_existing_resources([dataset.name, "not_existing"])
+            self.assertIn("single_dataset", prefetched["schemas"])
+            with self.assertNumQueries(0):
+                self.assertFalse(
+                    should_be_imported(
+                        layer=dataset.name,
+                        user=user,
+                        prefetched=prefetched,
+                        skip_existing_layer=True,
+                    )
+                )
+                self.assertTrue(
+                    should_be_imported(
+                        layer="not_existing",
+                        user=user,
+                        prefetched=prefetched,
+                        skip_existing_layer=True,
+                    )
+                )
+        finally:
+            schema.delete()
+
     def test_create_alternate_shuould_appen_an_hash(self):
         actual = create_alternate(layer_name="name", execution_id="1234")
         self.assertTrue(actual.startswith("name_"))
@@ -69,3 +122,204 @@ class TestHandlersUtils(TestCase):
         drop_dynamic_model_schema(schema_model=_model_schema)
 
         self.assertFalse(ModelSchema.objects.filter(name="model_schema").exists())
+
+    def test_get_vsi_path_should_return_the_path_for_not_compressed_files(self):
+        self.assertEqual("/tmp/file.csv", get_vsi_path("/tmp/file.csv"))
+
+    def test_get_vsi_path_should_use_vsigzip_for_gzip_files(self):
+        actual = get_vsi_path(f"{project_dir}/tests/fixture/valid.csv.gz")
+        self.assertEqual(f"/vsigzip/{project_dir}/tests/fixture/valid.csv.gz", actual)
+
+    def test_get_vsi_path_should_use_vsitar_with_the_data_member(self):
+        with tempfile.TemporaryDirectory() as _tmp:
+            archive = os.path.join(_tmp, "valid.tar.gz")
+            with tarfile.open(archive, "w:gz") as tar:
+                tar.add(f"{project_dir}/tests/fixture/valid.csv", arcname="valid.csv")
+
+            self.assertEqual("valid.csv", get_compressed_member(archive))
+            self.assertEqual(f"/vsitar/{archive}/valid.csv", get_vsi_path(archive))
+
+    def test_open_uncompressed_should_stream_the_gzip_content(self):
+        with open(f"{project_dir}/tests/fixture/valid.csv", "rb") as _file:
+            expected = _file.read()
+        with open_uncompressed(f"{project_dir}/tests/fixture/valid.csv.gz") as _file:
+            self.assertEqual(expected, _file.read())
+
+    def test_open_uncompressed_should_read_the_member_of_the_handler(self):
+        with tempfile.TemporaryDirectory() as _tmp:
+            archive = os.path.join(_tmp, "valid.tar.gz")
+            with tarfile.open(archive, "w:gz") as tar:
+                tar.add(f"{project_dir}/tests/fixture/valid.csv", arcname="valid.csv")
+                tar.add(
+                    f"{project_dir}/tests/fixture/valid.geojson", arcname="valid.geojson"
+                )
+
+            with open(f"{project_dir}/tests/fixture/valid.geojson", "rb") as _file:
+                expected = _file.read()
+            with open_uncompressed(archive, extensions=("json", "geojson")) as _file:
+                self.assertEqual(expected, _file.read())
+
+    def test_get_compressed_member_of_a_missing_archive(self):
+        self.assertIsNone(get_compressed_member("/tmp/missing/archive.tar.gz"))
+
+    def test_normalize_crs_should_return_the_authority_code(self):
+        self.assertEqual("EPSG:3857", normalize_crs("EPSG:3857"))
+        self.assertEqual("EPSG:4326", normalize_crs("+proj=longlat +datum=WGS84 +no_defs"))
+
+    def test_normalize_crs_should_reject_an_invalid_crs(self):
+        with self.assertRaises(InvalidInputFileException):
+            normalize_crs("not a crs")
+        with self.assertRaises(InvalidInputFileException):
+            get_target_crs({"target_crs": "EPSG:999999"})
+
+    def test_get_target_crs_should_use_the_payload_value(self):
+        _data = {"target_crs": "epsg:3857"}
+        self.assertEqual("EPSG:3857", get_target_crs(_data))
+        self.assertNotIn("target_crs", _data)
+
+    @patch("importer.handlers.utils.IMPORTER_TARGET_CRS", "EPSG:4326")
+    def test_get_target_crs_should_fallback_to_the_setting(self):
+        self.assertEqual("EPSG:4326", get_target_crs({}))
+
+    def test_get_target_crs_should_return_none_if_not_requested(self):
+        self.assertIsNone(get_target_crs({}))
+
+    @patch("importer.handlers.utils.search_crs_authority", return_value="EPSG:4326")
+    def test_identify_crs_authority_should_resolve_each_crs_once(self, search):
+        resolve_crs_authority.cache_clear()
+        spatial_ref = osr.SpatialReference()
+        spatial_ref.ImportFromEPSG(4326)
+
+        self.assertEqual("EPSG:4326", identify_crs_authority(spatial_ref))
+        self.assertEqual("EPSG:4326", identify_crs_authority(spatial_ref.Clone()))
+        search.assert_called_once()
+        self.assertEqual(1, CRSAuthority.objects.count())
+
+        # a new worker reuses the authority saved in the table
+        resolve_crs_authority.cache_clear()
+        self.assertEqual("EPSG:4326", identify_crs_authority(spatial_ref))
+        search.assert_called_once()
+
+    @patch("importer.handlers.utils.search_crs_authority", return_value="EPSG:4326")
+    def test_resolve_crs_authority_should_not_break_the_outer_transaction(self, _):
+        resolve_crs_authority.cache_clear()
+        spatial_ref = osr.SpatialReference()
+        spatial_ref.ImportFromEPSG(4326)
+        # the cache table is not available, the queries fail on the database
+        with patch.object(CRSAuthority._meta, "db_table", "importer_missing_table"):
+            self.assertEqual("EPSG:4326", identify_crs_authority(spatial_ref))
+        # the test transaction is still usable
+        self.assertEqual(0, CRSAuthority.objects.count())
+
+    def test_link_or_copy_file_should_link_on_the_same_filesystem(self):
+        with tempfile.TemporaryDirectory() as _tmp:
+            source = os.path.join(_tmp, "source.tif")
+            with open(source, "wb") as _file:
+                _file.write(os.urandom(1024))
+
+            method = link_or_copy_file(source, os.path.join(_tmp, "linked.tif"))
+            self.assertIn(method, ("reflink", "hardlink"))
+
+            method = link_or_copy_file(
+                source, os.path.join(_tmp, "copied.tif"), allow_links=False
+            )
+            self.assertIn(method, ("copy_file_range", "copy"))
+
+            # removing the original does not affect the copies
+            with open(source, "rb") as _file:
+                expected = _file.read()
+            os.remove(source)
+            for name in ("linked.tif", "copied.tif"):
+                with open(os.path.join(_tmp, name), "rb") as _file:
+                    self.assertEqual(expected, _file.read())
+
+    def test_register_layer_to_publish_should_release_the_last_layer(self):
+        _exec = ExecutionRequest.objects.create(
+            func_name="test", input_params={"publishing_expected": 3}
+        )
+        self.assertIsNone(register_layer_to_publish(_exec.exec_id, "a", "a"))
+        self.assertIsNone(
+            register_layer_to_publish(_exec.exec_id, "b", "b", failed=True)
+        )
+        layers = register_layer_to_publish(_exec.exec_id, "c", "c_alt", {"key": 1})
+        self.assertListEqual(
+            [
+                {"layer_name": "a", "alternate": "a", "kwargs": {}},
+                {"layer_name": "c", "alternate": "c_alt", "kwargs": {"key": 1}},
+            ],
+            layers,
+        )
+        # the batch is released only once
+        self.assertIsNone(register_layer_to_publish(_exec.exec_id, "c", "c_alt"))
+        _exec.delete()
+
+    def test_register_layer_to_publish_should_count_each_layer_once(self):
+        _exec = ExecutionRequest.objects.create(
+            func_name="test", input_params={"publishing_expected": 3}
+        )
+        self.assertIsNone(register_layer_to_publish(_exec.exec_id, "a", "a"))
+        # the failure of the layer is reported by more steps
+        register_layer_to_publish(_exec.exec_id, "b", "b", failed=True)
+        self.assertIsNone(register_layer_to_publish(_exec.exec_id, "b", "b", failed=True))
+        # the import stopped before dispatching the third layer
+        layers = register_layer_to_publish(_exec.exec_id, expected=2)
+        self.assertListEqual(
+            [{"layer_name": "a", "alternate": "a", "kwargs": {}}], layers
+        )
+        _exec.delete()
+
+
+class TestCopyTable(TransactionTestCase):
+    # the rows are copied by other connections, so the test data must be committed
+    databases = ("datastore",)
+
+    def setUp(self):
+        with connections["datastore"].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE "copy_source" (fid serial PRIMARY KEY, name varchar(10))'
+            )
+            cursor.execute('CREATE INDEX "copy_source_name_idx" ON "copy_source" (name)')
+            cursor.execute(
+                "INSERT INTO \"copy_source\" (name) SELECT 'row' || x FROM generate_series(1, 1000) x"
+            )
+
+    def tearDown(self):
+        with connections["datastore"].cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS "copy_target"')
+            cursor.execute('DROP TABLE IF EXISTS "copy_source"')
+
+    def _table_exists(self, name):
+        with connections["datastore"].cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f'"{name}"'])
+            return cursor.fetchone()[0]
+
+    def test_copy_table_should_keep_rows_and_indexes(self):
+        timings = copy_table("copy_source", "copy_target", "datastore", workers=2)
+
+        self.assertSetEqual({"create", "copy", "indexes", "analyze"}, set(timings))
+        with connections["datastore"].cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM "copy_target"')
+            self.assertEqual(1000, cursor.fetchone()[0])
+            cursor.execute(
+                "SELECT count(*) FROM pg_indexes WHERE tablename = 'copy_target'"
+            )
+            # primary key and name index
+            self.assertEqual(2, cursor.fetchone()[0])
+
+    def test_copy_table_should_drop_the_partial_copy_on_failure(self):
+        calls = []
+
+        def _fail_the_second_batch(db_name, sql):
+            calls.append(sql)
+            if len(calls) == 2:
+                raise Exception("worker failed")
+            _run_on_new_connection(db_name, sql)
+
+        with patch(
+            "importer.handlers.utils._run_on_new_connection",
+            side_effect=_fail_the_second_batch,
+        ):
+            with self.assertRaises(Exception):
+                copy_table("copy_source", "copy_target", "datastore", workers=2)
+
+        self.assertFalse(self._table_exists("copy_target"))
@@ -24,6 +24,8 @@ class Tiles3DFileHandler(BaseVectorFileHandler):
     It must provide the task_lists required to comple the upload
     """
 
+    SEED_SUPPORTED = False
+
     ACTIONS = {
         exa.IMPORT.value: (
             "start_import",
@@ -68,15 +70,16 @@ class Tiles3DFileHandler(BaseVectorFileHandler):
         return False
 
     @staticmethod
-    def is_valid(files, user):
+    def is_valid(files, user, check_parallelism=True):
         """
         Define basic validation steps:
         """
         # calling base validation checks
         BaseVectorFileHandler.is_valid(files, user)
-        # getting the upload limit validation
-        upload_validator = UploadLimitValidator(user)
-        upload_validator.validate_parallelism_limit_per_user()
+        # getting the upload limit validation, the children of a batch upload
+        # are limited by the concurrency of the batch
+        if check_parallelism:
+            UploadLimitValidator(user).validate_parallelism_limit_per_user()
 
         _file = files.get("base_file")
         if not _file:
@@ -1,14 +1,39 @@
+import gzip
 import hashlib
+import os
+import re
+import shutil
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 
 from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connections, transaction
+from django.db.models.functions import Lower
+from dynamic_models.models import ModelSchema
 from geonode.base.models import ResourceBase
+from geonode.layers.models import Dataset
 from geonode.resource.models import ExecutionRequest
 import logging
 from dynamic_models.schema import ModelSchemaEditor
 from django.utils.module_loading import import_string
 from uuid import UUID
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import pyproj
+from osgeo import osr
+
+from importer.api.exception import InvalidInputFileException
+
+from importer.models import CRSAuthority
 from importer.publisher import DataPublisher
+from importer.settings import IMPORTER_CRS_CACHE_SIZE, IMPORTER_TARGET_CRS
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +68,304 @@ GEOM_TYPE_MAPPING = {
 }
 
 
-def should_be_imported(layer: str, user: get_user_model(), **kwargs) -> bool:  # type: ignore
+GZIP_EXTENSIONS = (".gz",)
+TAR_EXTENSIONS = (".tar", ".tar.gz", ".tgz")
+# extensions of the data files that can be read on the fly via the GDAL virtual file systems
+VSI_SUPPORTED_EXTENSIONS = ("csv", "json", "geojson", "tif", "tiff", "geotif", "geotiff")
+
+
+def _get_file_name(base) -> str:
+    return base if isinstance(base, str) else base.name
+
+
+def is_tar_file(base) -> bool:
+    return _get_file_name(base).lower().endswith(TAR_EXTENSIONS)
+
+
+def is_compressed_file(base) -> bool:
+    """
+    True if the file provided (path or uploaded file) is a gzip or a tar archive
+    """
+    name = _get_file_name(base).lower()
+    return name.endswith(TAR_EXTENSIONS) or name.endswith(GZIP_EXTENSIONS)
+
+
+def get_compressed_member(base, extensions=VSI_SUPPORTED_EXTENSIONS):
+    """
+    Return the name of the data file contained in a gzip or tar archive.
+    - gzip: is the name of the file without the .gz suffix
+    - tar: is the first member with one of the expected extensions.
+    The tar is read as a stream, so is decompressed only up to the matching member
+    None is returned if the archive does not contain any of the expected files
+    """
+    name = _get_file_name(base)
+    if is_tar_file(base):
+        _fileobj = None if isinstance(base, str) else base
+        try:
+            with tarfile.open(
+                name=name if _fileobj is None else None, fileobj=_fileobj, mode="r|*"
+            ) as tar:
+                for member in tar:
+                    if member.isfile() and member.name.lower().split(".")[-1] in extensions:
+                        return member.name
+        except (tarfile.TarError, OSError) as e:
+            # eg: the archive is corrupted, missing or not readable
+            logger.error(f"Error during the read of the archive {name}: {e}")
+        finally:
+            if _fileobj is not None:
+                _fileobj.seek(0)
+        return None
+    if name.lower().endswith(GZIP_EXTENSIONS):
+        member = os.path.basename(name)[: -len(".gz")]
+        return member if member.lower().split(".")[-1] in extensions else None
+    return None
+
+
+def get_vsi_path(path: str, extensions=VSI_SUPPORTED_EXTENSIONS) -> str:
+    """
+    Return the path of the GDAL virtual file system needed to read the
+    gzip or tar content on the fly without extracting it:
+    - /vsigzip/path/to/file.csv.gz
+    - /vsitar/path/to/archive.tar.gz/file.csv
+    Not compressed files (or paths already virtual) are returned as they are
+    """
+    if not path or path.startswith("/vsi"):
+        return path
+    if is_tar_file(path):
+        member = get_compressed_member(path, extensions)
+        return f"/vsitar/{path}/{member}" if member else path
+    if path.lower().endswith(GZIP_EXTENSIONS):
+        return f"/vsigzip/{path}"
+    return path
+
+
+@contextmanager
+def open_uncompressed(base, extensions=VSI_SUPPORTED_EXTENSIONS):
+    """
+    Yield a binary file object which decompress on the fly the content of
+    a gzip or tar archive. Not compressed files are opened as they are.
+    The member of a tar is the first one with the extensions of the calling handler
+    """
+    name = _get_file_name(base)
+    _fileobj = None if isinstance(base, str) else base
+    try:
+        if is_tar_file(base):
+            member_name = get_compressed_member(base, extensions)
+            with tarfile.open(
+                name=name if _fileobj is None else None, fileobj=_fileobj, mode="r|*"
+            ) as tar:
+                member = next((x for x in tar if x.name == member_name), None)
+                if member is None:
+                    raise FileNotFoundError(f"No data file found in the archive {name}")
+                yield tar.extractfile(member)
+        elif name.lower().endswith(GZIP_EXTENSIONS):
+            with gzip.open(name if _fileobj is None else _fileobj, "rb") as _file:
+                yield _file
+        elif _fileobj is not None:
+            yield _fileobj
+        else:
+            with open(name, "rb") as _file:
+                yield _file
+    finally:
+        if _fileobj is not None:
+            _fileobj.seek(0)
+
+
+# ioctl request to clone a file (reflink) on btrfs and XFS, from linux/fs.h
+FICLONE = 0x40049409
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def link_or_copy_file(source: str, target: str, allow_links: bool = True) -> str:
+    """
+    Copy the file without rewriting the data whenever possible:
+    if source and target share the filesystem, the file is cloned (reflink)
+    or hardlinked, otherwise the copy is done by the kernel with copy_file_range.
+    A plain copy is the last fallback. Return the method used.
+    Deleting one of the files just drops a reference, so the other is untouched
+    """
+    if allow_links and os.stat(source).st_dev == os.stat(os.path.dirname(target)).st_dev:
+        if fcntl is not None:
+            try:
+                with open(source, "rb") as _source, open(target, "wb") as _target:
+                    fcntl.ioctl(_target.fileno(), FICLONE, _source.fileno())
+                return "reflink"
+            except OSError:
+                # the filesystem does not support the copy-on-write clone
+                os.remove(target)
+        try:
+            os.link(source, target)
+            return "hardlink"
+        except OSError:
+            pass
+
+    try:
+        with open(source, "rb") as _source, open(target, "wb") as _target:
+            remaining = os.fstat(_source.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(
+                    _source.fileno(),
+                    _target.fileno(),
+                    min(remaining, COPY_CHUNK_SIZE),
+                )
+                if not copied:
+                    break
+                remaining -= copied
+        if not remaining:
+            return "copy_file_range"
+    except (AttributeError, OSError):
+        # copy_file_range is not available on this platform or between these filesystems
+        pass
+    shutil.copyfile(source, target)
+    return "copy"
+
+
+def search_crs_authority(spatial_ref) -> str:
+    """
+    Search the authority code of the CRS in the PROJ database.
+    If not found, fallback to the identification of GDAL
+    """
+    try:
+        _name = "EPSG"
+        _code = pyproj.CRS(spatial_ref.ExportToWkt()).to_epsg(min_confidence=20)
+        if _code is None:
+            _code = pyproj.CRS(spatial_ref.ExportToProj4()).to_epsg(min_confidence=20)
+            if _code is None:
+                raise Exception(
+                    "CRS authority code not found, fallback to default behaviour"
+                )
+    except Exception:
+        spatial_ref = spatial_ref.Clone()
+        spatial_ref.AutoIdentifyEPSG()
+        _name = spatial_ref.GetAuthorityName(None) or spatial_ref.GetAttrValue(
+            "AUTHORITY", 0
+        )
+        _code = (
+            spatial_ref.GetAuthorityCode("PROJCS")
+            or spatial_ref.GetAuthorityCode("GEOGCS")
+            or spatial_ref.GetAttrValue("AUTHORITY", 1)
+        )
+    return f"{_name}:{_code}"
+
+
+@lru_cache(maxsize=IMPORTER_CRS_CACHE_SIZE)
+def resolve_crs_authority(wkt: str) -> str:
+    """
+    Return the authority code of the CRS, resolved once for each WKT.
+    The codes are cached in memory and in the CRSAuthority table,
+    so are shared between the workers and survive to the restarts
+    """
+    wkt_hash = hashlib.sha256(wkt.encode()).hexdigest()
+    # the queries run in a savepoint, so an error does not break an outer transaction
+    try:
+        with transaction.atomic():
+            authority = (
+                CRSAuthority.objects.filter(wkt_hash=wkt_hash)
+                .values_list("authority", flat=True)
+                .first()
+            )
+        if authority:
+            return authority
+    except DatabaseError as e:
+        logger.warning(f"Error reading the CRS authority cache: {e}")
+
+    authority = search_crs_authority(osr.SpatialReference(wkt=wkt))
+    try:
+        with transaction.atomic():
+            CRSAuthority.objects.get_or_create(
+                wkt_hash=wkt_hash, defaults={"authority": authority}
+            )
+    except DatabaseError as e:
+        logger.warning(f"Error saving the CRS authority cache: {e}")
+    return authority
+
+
+def identify_crs_authority(spatial_ref) -> str:
+    """
+    Identify the authority code (eg: EPSG:4326) of a GDAL/OGR spatial reference.
+    The WKT exported by GDAL is normalized, so the same CRS is resolved only once
+    even if read from different layers or files
+    """
+    if spatial_ref is None:
+        raise Exception("The layer does not have a Coordinate Reference System")
+    return resolve_crs_authority(" ".join(spatial_ref.ExportToWkt().split()))
+
+
+def normalize_crs(value: str) -> str:
+    """
+    Return the authority code (eg: EPSG:3857) of a CRS provided
+    as authority code, WKT or proj4 string
+    """
+    try:
+        authority = pyproj.CRS.from_user_input(value).to_authority(min_confidence=20)
+    except pyproj.exceptions.CRSError as e:
+        raise InvalidInputFileException(detail=f"Invalid CRS {value}: {e}")
+    if authority is None:
+        raise InvalidInputFileException(
+            detail=f"CRS authority code not found for: {value}"
+        )
+    return ":".join(authority)
+
+
+def get_target_crs(_data: dict):
+    """
+    Pop from the payload the CRS requested for the upload.
+    If not provided, the IMPORTER_TARGET_CRS is used.
+    Return None if the data should be kept in its native CRS
+    """
+    target_crs = _data.pop("target_crs", None) or IMPORTER_TARGET_CRS
+    return normalize_crs(target_crs) if target_crs else None
+
+
+def prefetch_existing_resources(layer_names: list, execution_id: str = None) -> dict:
+    """
+    Load in bulk what is already available for the layers of an upload:
+    - the default workspace (a single GeoServer call)
+    - the datasets with the same alternate (one query)
+    - the dynamic model schemas with the layer names or with their
+      execution alternate (one query)
+    The result can be passed to should_be_imported and to the handlers
+    to avoid the per-layer queries
+    """
+    workspace = DataPublisher(None).workspace.name
+    alternates = {f"{workspace}:{name}".lower() for name in layer_names}
+    datasets = {}
+    for alternate, owner_id in (
+        Dataset.objects.annotate(lower_alternate=Lower("alternate"))
+        .filter(lower_alternate__in=alternates)
+        .values_list("alternate", "owner_id")
+    ):
+        datasets.setdefault(alternate.lower(), []).append((alternate, owner_id))
+
+    schema_names = {name.lower() for name in layer_names}
+    if execution_id:
+        schema_names.update(
+            create_alternate(name, execution_id).lower() for name in layer_names
+        )
+    schemas = {
+        schema.name.lower(): schema
+        for schema in ModelSchema.objects.annotate(lower_name=Lower("name")).filter(
+            lower_name__in=schema_names
+        )
+    }
+    return {"workspace": workspace, "datasets": datasets, "schemas": schemas}
+
+
+def get_prefetched_datasets(prefetched: dict, layer_name: str, owner=None) -> list:
+    """
+    Return the alternates of the prefetched datasets (case insensitive) for the layer
+    """
+    datasets = prefetched["datasets"].get(
+        f"{prefetched['workspace']}:{layer_name}".lower(), []
+    )
+    return [
+        alternate
+        for alternate, owner_id in datasets
+        if owner is None or owner_id == owner.pk
+    ]
+
+
+def should_be_imported(layer: str, user: get_user_model(), prefetched: dict = None, **kwargs) -> bool:  # type: ignore
     """
     If layer_name + user (without the addition of any execution id)
     already exists, will apply one of the rule available:
@@ -53,11 +375,18 @@ def should_be_imported(layer: str, user: get_user_model(), **kwargs) -> bool:  #
         - ogr2ogr should overwrite the layer
         - the publisher should republish the resource
         - geonode should update it
+    If the existing resources are prefetched (see prefetch_existing_resources)
+    no query is executed
     """
-    workspace = DataPublisher(None).workspace
-    exists = ResourceBase.objects.filter(
-        alternate=f"{workspace.name}:{layer}", owner=user
-    ).exists()
+    if prefetched is not None:
+        exists = f"{prefetched['workspace']}:{layer}" in get_prefetched_datasets(
+            prefetched, layer, owner=user
+        )
+    else:
+        workspace = DataPublisher(None).workspace
+        exists = ResourceBase.objects.filter(
+            alternate=f"{workspace.name}:{layer}", owner=user
+        ).exists()
 
     if exists and kwargs.get("skip_existing_layer", False):
         return False
@@ -65,6 +394,56 @@ def should_be_imported(layer: str, user: get_user_model(), **kwargs) -> bool:  #
     return True
 
 
+def register_layer_to_publish(
+    execution_id: str,
+    layer_name: str = None,
+    alternate: str = None,
+    kwargs: dict = None,
+    failed: bool = False,
+    expected: int = None,
+):
+    """
+    Barrier of the batch publishing.
+    Each imported (or failed) layer is registered in the ExecutionRequest, the row is
+    locked so the layers imported in parallel cannot overwrite each other.
+    A layer is registered once, even if more steps report its failure.
+    With `expected` the number of layers to wait is updated, eg: when the import
+    stops before dispatching all the layers.
+    Returns the layers to publish only to the caller registering the last expected layer
+    """
+    with transaction.atomic():
+        _exec = (
+            ExecutionRequest.objects.select_for_update()
+            .filter(exec_id=execution_id)
+            .first()
+        )
+        if not _exec or "publishing_expected" not in _exec.input_params:
+            return None
+        input_params = _exec.input_params
+        if expected is not None:
+            input_params["publishing_expected"] = expected
+        registered_alternates = {
+            x["alternate"]
+            for key in ("ready_to_publish", "failed_to_publish")
+            for x in input_params.get(key, [])
+        }
+        if alternate is not None and alternate not in registered_alternates:
+            key = "failed_to_publish" if failed else "ready_to_publish"
+            input_params[key] = input_params.get(key, []) + [
+                {"layer_name": layer_name, "alternate": alternate, "kwargs": kwargs or {}}
+            ]
+        ready = input_params.get("ready_to_publish", [])
+        registered = len(ready) + len(input_params.get("failed_to_publish", []))
+        is_last = (
+            registered >= input_params["publishing_expected"]
+            and not input_params.get("publishing_dispatched")
+        )
+        if is_last:
+            input_params["publishing_dispatched"] = True
+        ExecutionRequest.objects.filter(pk=_exec.pk).update(input_params=input_params)
+    return ready if is_last and ready else None
+
+
 def create_alternate(layer_name, execution_id):
     """
     Utility to generate the expected alternate for the resource
@@ -138,3 +517,217 @@ def evaluate_error(celery_task, exc, task_id, args, kwargs, einfo):
     orchestrator.evaluate_execution_progress(
         get_uuid(args), _log=str(exc.detail if hasattr(exc, "detail") else exc.args[0])
     )
+
+
+def get_relation_kind(table_name: str, db_name: str):
+    """
+    Return the postgres relkind of the relation: "r" for tables, "v" for views
+    None is returned if the relation does not exists
+    """
+    with connections[db_name].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = %s AND n.nspname = ANY(current_schemas(false))",
+            [table_name],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def get_dependent_views(table_name: str, db_name: str) -> list:
+    """
+    Return the views which read from the table, like the lazy copies of a dataset
+    """
+    with connections[db_name].cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT v.relname FROM pg_depend d "
+            "JOIN pg_rewrite r ON r.oid = d.objid "
+            "JOIN pg_class v ON v.oid = r.ev_class "
+            "JOIN pg_class t ON t.oid = d.refobjid "
+            "WHERE t.relname = %s AND v.relkind = 'v' AND v.oid <> t.oid",
+            [table_name],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def get_view_source(view_name: str, db_name: str):
+    """
+    Return the table read by the view
+    """
+    with connections[db_name].cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT t.relname FROM pg_depend d "
+            "JOIN pg_rewrite r ON r.oid = d.objid "
+            "JOIN pg_class v ON v.oid = r.ev_class "
+            "JOIN pg_class t ON t.oid = d.refobjid "
+            "WHERE v.relname = %s AND t.relkind = 'r' AND v.oid <> t.oid",
+            [view_name],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _assign_own_sequences(cursor, table_name: str):
+    """
+    A table created with LIKE ... INCLUDING ALL share the serial sequences
+    with the source table. Each serial column gets its own sequence
+    aligned with the data already available
+    """
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = %s AND column_default LIKE 'nextval(%%'",
+        [table_name],
+    )
+    for (column,) in cursor.fetchall():
+        sequence = f"{table_name}_{column}_seq"[:63]
+        cursor.execute(f'CREATE SEQUENCE "{sequence}" OWNED BY "{table_name}"."{column}"')
+        cursor.execute(
+            f'ALTER TABLE "{table_name}" ALTER COLUMN "{column}" '
+            f"SET DEFAULT nextval('\"{sequence}\"')"
+        )
+        cursor.execute(
+            f"SELECT setval('\"{sequence}\"', COALESCE(MAX(\"{column}\"), 0) + 1, false) "
+            f'FROM "{table_name}"'
+        )
+
+
+def materialize_view(view_name: str, db_name: str):
+    """
+    Replace the view of a lazy copy with a real table, with the same
+    structure, indexes and constraints of the source table.
+    The serial columns get their own sequence, so the copy does not
+    share the sequence of the original table
+    """
+    source = get_view_source(view_name, db_name)
+    if source is None:
+        raise Exception(f"Source table of the view {view_name} not found")
+
+    logger.info(f"Materializing the lazy copy {view_name} of {source}")
+    with transaction.atomic(using=db_name):
+        with connections[db_name].cursor() as cursor:
+            cursor.execute(f'DROP VIEW "{view_name}"')
+            cursor.execute(f'CREATE TABLE "{view_name}" (LIKE "{source}" INCLUDING ALL)')
+            cursor.execute(
+                f'INSERT INTO "{view_name}" OVERRIDING SYSTEM VALUE SELECT * FROM "{source}"'
+            )
+            _assign_own_sequences(cursor, view_name)
+            cursor.execute(f'ANALYZE "{view_name}"')
+
+
+def materialize_lazy_copies(table_name: str, db_name: str):
+    """
+    Before a table is modified (overwritten or deleted):
+    - if the table is a lazy copy (a view), it is materialized
+    - the lazy copies reading from the table are materialized
+    """
+    if get_relation_kind(table_name, db_name) == "v":
+        materialize_view(table_name, db_name)
+    for view_name in get_dependent_views(table_name, db_name):
+        materialize_view(view_name, db_name)
+
+
+def _run_on_new_connection(db_name: str, sql: str):
+    """
+    Execute the statement in the thread of the pool.
+    Django connections are per thread, so each worker uses its own connection
+    """
+    try:
+        with connections[db_name].cursor() as cursor:
+            cursor.execute(sql)
+    finally:
+        connections[db_name].close()
+
+
+def copy_table(source: str, target: str, db_name: str, workers: int = 1) -> dict:
+    """
+    Copy the table keeping structure, defaults, constraints and indexes:
+    - the target is created with LIKE ... INCLUDING ALL but without the indexes
+    - the rows are copied in parallel by ctid ranges of the source pages
+    - primary key, unique constraints and indexes are built once the data are loaded
+    - the target is analyzed, so the planner has the statistics from the first request
+    The rows are copied by other connections, so on failure the target table is dropped
+    instead of leaving a partial copy committed.
+    Return the timings of each phase in seconds
+    """
+    timings = {}
+    start = time.perf_counter()
+    with transaction.atomic(using=db_name):
+        with connections[db_name].cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE "{target}" (LIKE "{source}" INCLUDING ALL EXCLUDING INDEXES)'
+            )
+            cursor.execute(
+                "SELECT pg_relation_size(%s::regclass) / current_setting('block_size')::int",
+                [f'"{source}"'],
+            )
+            pages = cursor.fetchone()[0]
+            # constraints backed by an index (primary key, unique, exclude)
+            cursor.execute(
+                "SELECT con.conname, pg_get_constraintdef(con.oid), con.conindid FROM pg_constraint con "
+                "JOIN pg_class t ON t.oid = con.conrelid WHERE t.relname = %s AND con.conindid <> 0",
+                [source],
+            )
+            constraints = cursor.fetchall()
+            cursor.execute(
+                "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+                "JOIN pg_class t ON t.oid = x.indrelid JOIN pg_class i ON i.oid = x.indexrelid "
+                "WHERE t.relname = %s AND NOT (x.indexrelid = ANY(%s))",
+                [source, [x[2] for x in constraints]],
+            )
+            indexes = cursor.fetchall()
+    timings["create"] = time.perf_counter() - start
+
+    try:
+        start = time.perf_counter()
+        workers = max(1, min(workers, pages or 1))
+        step = (pages // workers) + 1
+        batches = []
+        for index in range(workers):
+            condition = f"ctid >= '({index * step},0)'::tid"
+            if index < workers - 1:
+                condition += f" AND ctid < '({(index + 1) * step},0)'::tid"
+            batches.append(
+                f'INSERT INTO "{target}" OVERRIDING SYSTEM VALUE SELECT * FROM "{source}" WHERE {condition}'
+            )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result in [executor.submit(_run_on_new_connection, db_name, x) for x in batches]:
+                result.result()
+        timings["copy"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        def _rename(name):
+            # the names of the indexes must be unique in the schema
+            return (
+                name.replace(source, target, 1) if source in name else f"{target}_{name}"
+            )[:63]
+
+        statements = [
+            f'ALTER TABLE "{target}" ADD CONSTRAINT "{_rename(name)}" {definition}'
+            for name, definition, _ in constraints
+        ] + [
+            re.sub(
+                r"^CREATE (UNIQUE )?INDEX .+? ON (ONLY )?\S+ USING ",
+                lambda match: f'CREATE {match.group(1) or ""}INDEX "{_rename(name)}" ON "{target}" USING ',
+                definition,
+                count=1,
+            )
+            for name, definition in indexes
+        ]
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(statements) or 1))) as executor:
+            for result in [executor.submit(_run_on_new_connection, db_name, x) for x in statements]:
+                result.result()
+        timings["indexes"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with connections[db_name].cursor() as cursor:
+            _assign_own_sequences(cursor, target)
+            cursor.execute(f'ANALYZE "{target}"')
+        timings["analyze"] = time.perf_counter() - start
+    except Exception:
+        with connections[db_name].cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS "{target}"')
+        raise
+
+    logger.info(f"Table {source} copied into {target}, timings: {timings}")
+    return timings
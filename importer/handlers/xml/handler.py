@@ -50,7 +50,7 @@ class XMLFileHandler(MetadataFileHandler):
         )
 
     @staticmethod
-    def is_valid(files, user=None):
+    def is_valid(files, user=None, check_parallelism=True):
         """
         Define basic validation steps
         """
@@ -0,0 +1,83 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from geonode.layers.models import Dataset
+from geonode.resource.manager import resource_manager
+
+from importer.thumbnails import generate_local_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the thumbnail generation of GeoServer with the local backend "
+        "on the last datasets created by the importer. "
+        "NOTE: the thumbnails of the datasets are regenerated"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Number of datasets used for the benchmark",
+        )
+        parser.add_argument(
+            "--backend",
+            choices=["geoserver", "local", "both"],
+            default="both",
+            help="Backend to benchmark",
+        )
+
+    def handle(self, *args, **options):
+        datasets = [
+            x.get_real_instance()
+            for x in Dataset.objects.filter(resourcehandlerinfo__isnull=False)
+            .distinct()
+            .order_by("-pk")[: options["limit"]]
+        ]
+        if not datasets:
+            self.stdout.write("No datasets created by the importer are available")
+            return
+        self.stdout.write(f"Benchmarking the thumbnails of {len(datasets)} datasets")
+
+        if options["backend"] in ("geoserver", "both"):
+            timings = []
+            failures = 0
+            batch_start = time.perf_counter()
+            for dataset in datasets:
+                start = time.perf_counter()
+                try:
+                    resource_manager.set_thumbnail(
+                        dataset.uuid, instance=dataset, overwrite=True
+                    )
+                except Exception:
+                    failures += 1
+                    continue
+                timings.append(time.perf_counter() - start)
+            self._report(
+                "geoserver", timings, time.perf_counter() - batch_start, failures
+            )
+
+        if options["backend"] in ("local", "both"):
+            # the local backend renders the datasets in parallel: the timings are
+            # measured for each thumbnail, the elapsed time for the whole batch
+            timings = []
+            start = time.perf_counter()
+            not_rendered = generate_local_thumbnails(datasets, timings=timings)
+            self._report(
+                "local", timings, time.perf_counter() - start, len(not_rendered)
+            )
+
+    def _report(self, backend, timings, elapsed, failures):
+        if not timings:
+            self.stdout.write(f"{backend}: no thumbnail generated, failures: {failures}")
+            return
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{backend}: {len(timings)} thumbnails in {elapsed:.2f}s "
+            f"({len(timings) / (elapsed or 1):.1f}/s), "
+            f"mean {statistics.mean(timings) * 1000:.1f}ms, "
+            f"p95 {p95 * 1000:.1f}ms, failures: {failures}"
+        )
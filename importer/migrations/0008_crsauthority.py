@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("importer", "0007_align_resourcehandler_with_asset"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CRSAuthority",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("wkt_hash", models.CharField(max_length=64, unique=True)),
+                ("authority", models.CharField(max_length=250)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
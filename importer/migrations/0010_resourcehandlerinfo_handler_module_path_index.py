@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("importer", "0009_resumableupload"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="resourcehandlerinfo",
+            name="handler_module_path",
+            field=models.CharField(db_index=True, max_length=250),
+        ),
+    ]
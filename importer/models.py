@@ -1,5 +1,8 @@
 import logging
+import os
+import uuid
 
+from django.conf import settings
 from django.db import models
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
@@ -37,10 +40,51 @@ class ResourceHandlerInfo(models.Model):
     resource = models.ForeignKey(
         ResourceBase, blank=False, null=False, on_delete=models.CASCADE
     )
-    handler_module_path = models.CharField(max_length=250, blank=False, null=False)
+    handler_module_path = models.CharField(
+        max_length=250, blank=False, null=False, db_index=True
+    )
     execution_request = models.ForeignKey(
         ExecutionRequest, null=True, default=None, on_delete=models.SET_NULL
     )
     kwargs = models.JSONField(
         verbose_name="Storing strictly related information of the handler", default=dict
     )
+
+
+class CRSAuthority(models.Model):
+    """
+    Persistent cache of the authority code identified for a CRS.
+    The identification is a search in the PROJ database, so is evaluated once for each WKT
+    """
+
+    wkt_hash = models.CharField(max_length=64, unique=True)
+    authority = models.CharField(max_length=250)
+    created = models.DateTimeField(auto_now_add=True)
+
+
+class ResumableUpload(models.Model):
+    """
+    File uploaded in chunks. The chunks are written in upload_dir at their offset,
+    so an interrupted upload can be resumed from the last byte received
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    upload_dir = models.CharField(max_length=1000)
+    params = models.JSONField(
+        verbose_name="Import params used when the upload is finalized", default=dict
+    )
+    execution_id = models.UUIDField(null=True, default=None)
+    created = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    @property
+    def file_path(self):
+        return os.path.join(self.upload_dir, self.filename)
+
+    @property
+    def is_complete(self):
+        return self.offset == self.size
@@ -16,6 +16,7 @@ from importer.api.exception import ImportException
 from importer.api.serializer import ImporterSerializer
 from importer.celery_app import importer_app
 from importer.handlers.base import BaseHandler
+from importer.handlers.utils import GZIP_EXTENSIONS, TAR_EXTENSIONS
 from importer.utils import error_handler
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,32 @@ class ImportOrchestrator:
         logger.error("Handler not found")
         return None
 
+    def get_handler_by_extension(self, filename) -> Optional[BaseHandler]:
+        """
+        Return the handler of a file which is not available yet (eg: the file of a URL)
+        using only the extension of its name, the handlers cannot read the file.
+        The tar archives are not handled since their content is unknown,
+        a gzip file is handled by the handler of the compressed file
+        """
+        name = filename.lower()
+        if name.endswith(TAR_EXTENSIONS):
+            return None
+        if name.endswith(GZIP_EXTENSIONS):
+            name = name[: -len(".gz")]
+        ext = name.split(".")[-1]
+        for handler in BaseHandler.get_registry():
+            config = handler().supported_file_extension_config
+            # the zip archives and the metadata files cannot be imported alone
+            if (
+                isinstance(config, dict)
+                and config.get("format") in ("vector", "raster")
+                and ext != "zip"
+                and ext in config.get("ext", [])
+            ):
+                return handler()
+        logger.error("Handler not found")
+        return None
+
     def get_serializer(self, _data) -> serializers.Serializer:
         for handler in BaseHandler.get_registry():
             _serializer = handler.has_serializer(_data)
@@ -105,6 +132,11 @@ class ImportOrchestrator:
                 self.update_execution_request_status(
                     execution_id=str(_exec_obj.exec_id),
                     status=ExecutionRequest.STATUS_RUNNING,
+                    # the duration of the import excludes the time spent in the queue
+                    output_params={
+                        **(_exec_obj.output_params or {}),
+                        "started": timezone.now().isoformat(),
+                    },
                 )
             # finding in the task_list the last step done
             remaining_tasks = tasks[_index:] if not _index >= len(tasks) else []
@@ -175,6 +207,7 @@ class ImportOrchestrator:
                 asset = asset_handler.objects.filter(pk=exec_obj.input_params["asset_id"])
                 if asset.exists():
                     asset.first().delete()
+        self._notify_batch(execution_id)
 
     def set_as_partially_failed(self, execution_id, reason=None):
         """
@@ -187,6 +220,7 @@ class ImportOrchestrator:
             last_updated=timezone.now(),
             log=f"The execution is completed, but the following layers are not imported: \n {', '.join(reason)}. Check the logs for additional infos",
         )
+        self._notify_batch(execution_id)
 
     def set_as_completed(self, execution_id):
         """
@@ -198,6 +232,23 @@ class ImportOrchestrator:
             finished=timezone.now(),
             last_updated=timezone.now(),
         )
+        self._notify_batch(execution_id)
+
+    def _notify_batch(self, execution_id):
+        """
+        If the execution is a child of a batch upload, the batch
+        is notified so the next child execution can be started
+        """
+        input_params = (
+            ExecutionRequest.objects.filter(exec_id=execution_id)
+            .values_list("input_params", flat=True)
+            .first()
+        )
+        batch_execution_id = (input_params or {}).get("batch_execution_id")
+        if batch_execution_id:
+            from importer.celery_tasks import dispatch_batch_upload
+
+            dispatch_batch_upload.apply_async((batch_execution_id,))
 
     def evaluate_execution_progress(
         self, execution_id, _log=None, handler_module_path=None
@@ -0,0 +1,186 @@
+import logging
+import os
+
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from geonode.resource.models import ExecutionRequest
+from osgeo import gdal
+
+from importer.settings import IMPORTER_PLAN_HISTORY_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def get_input_size(files: dict) -> int:
+    """
+    Return the size in bytes of the files of the dataset,
+    the remote files (/vsicurl/) are evaluated with a HEAD request by GDAL
+    """
+    size = 0
+    for path in set(x for x in files.values() if isinstance(x, str)):
+        if path.startswith("/vsi"):
+            stat = gdal.VSIStatL(path)
+            size += stat.size if stat else 0
+        elif os.path.isfile(path):
+            size += os.path.getsize(path)
+    return size
+
+
+def get_tables_stats(table_names: list, db_name="datastore") -> tuple:
+    """
+    Return the rows and the disk size (with indexes and toast) of the tables.
+    The tables are analyzed first, the rows estimated by PostgreSQL are not
+    available until then. The statistics are useful to query the new tables too
+    """
+    connection = connections[db_name]
+    with connection.cursor() as cursor:
+        for table_name in table_names:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(table_name)}")
+        cursor.execute(
+            "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0), COALESCE(SUM(pg_total_relation_size(c.oid)), 0) "
+            "FROM pg_class c WHERE c.relname = ANY(%s) AND c.relkind = 'r'",
+            [list(table_names)],
+        )
+        rows, size = cursor.fetchone()
+    return int(rows), int(size)
+
+
+def get_execution_stats(_exec):
+    """
+    Collect the throughput of a completed execution: input size and duration.
+    The duration starts with the first step of the import, so the time spent
+    in the queue is excluded. The tables are evaluated later by update_tables_stats.
+    None is returned for the executions without local files (eg: remote resources)
+    """
+    input_bytes = get_input_size(_exec.input_params.get("files") or {})
+    if not input_bytes or _exec.input_params.get("file_url_mode") == "vsicurl":
+        return None
+    started = parse_datetime((_exec.output_params or {}).get("started") or "")
+    if not started:
+        return None
+    return {
+        "input_bytes": input_bytes,
+        "seconds": max((timezone.now() - started).total_seconds(), 0),
+    }
+
+
+def update_tables_stats(execution_id):
+    """
+    Add to the stats of a completed execution the rows and the disk size
+    of the tables of its vector datasets.
+    The tables are analyzed, so is called in background once the execution is completed
+    """
+    from importer.models import ResourceHandlerInfo
+
+    tables = [
+        x.resource.alternate.split(":")[-1]
+        for x in ResourceHandlerInfo.objects.filter(
+            execution_request__exec_id=execution_id
+        ).select_related("resource")
+        if x.resource.subtype == "vector"
+    ]
+    if not tables:
+        return None
+    features, stored_bytes = get_tables_stats(tables)
+    with transaction.atomic():
+        _exec = ExecutionRequest.objects.select_for_update().get(exec_id=execution_id)
+        if not (_exec.output_params or {}).get("stats"):
+            return None
+        _exec.output_params["stats"].update(
+            {"features": features or None, "stored_bytes": stored_bytes}
+        )
+        _exec.save(update_fields=["output_params"])
+    return _exec.output_params["stats"]
+
+
+def estimate_cost(handler_module_path, input_bytes, features=None) -> dict:
+    """
+    Estimate the ingestion time and the disk footprint of a dataset from the stats
+    of the last executions completed by the same handler.
+    The time is based on the features per second if the features are known,
+    otherwise on the bytes per second. Without history nothing is estimated
+    """
+    from importer.models import ResourceHandlerInfo
+
+    # the executions of the handler are found by the indexed ResourceHandlerInfo,
+    # a filter on the input_params would scan all the executions
+    history = [
+        x["stats"]
+        for x in ExecutionRequest.objects.filter(
+            pk__in=ResourceHandlerInfo.objects.filter(
+                handler_module_path=handler_module_path
+            ).values("execution_request"),
+            status=ExecutionRequest.STATUS_FINISHED,
+            output_params__stats__isnull=False,
+        )
+        .order_by("-finished")
+        .values_list("output_params", flat=True)[:IMPORTER_PLAN_HISTORY_SIZE]
+        if x and x.get("stats")
+    ]
+    estimate = {
+        "estimated_seconds": None,
+        "estimated_disk_bytes": None,
+        "based_on_executions": len(history),
+    }
+    seconds = sum(x["seconds"] for x in history)
+    if not history or not seconds:
+        return estimate
+
+    with_features = [x for x in history if x.get("features")]
+    if features and with_features:
+        rate = sum(x["features"] for x in with_features) / sum(
+            x["seconds"] for x in with_features
+        )
+        estimate["estimated_seconds"] = round(features / rate, 1) if rate else None
+    else:
+        rate = sum(x["input_bytes"] for x in history) / seconds
+        estimate["estimated_seconds"] = round(input_bytes / rate, 1) if rate else None
+
+    with_storage = [x for x in history if x.get("stored_bytes")]
+    if with_storage:
+        # ratio between the size in the database and the size of the file
+        ratio = sum(x["stored_bytes"] for x in with_storage) / sum(
+            x["input_bytes"] for x in with_storage
+        )
+    else:
+        # the raster files are stored as they are
+        ratio = 1
+    estimate["estimated_disk_bytes"] = int(input_bytes * ratio)
+    return estimate
+
+
+def plan_dataset(_data: dict, handler, name=None) -> dict:
+    """
+    Describe the layers that the import of the dataset would create,
+    with the estimated cost. Nothing is created
+    """
+    files = {k: v for k, v in _data.items() if k.endswith("_file")}
+    input_bytes = get_input_size(files)
+    plan = {
+        "name": name or os.path.basename(str(files.get("base_file"))),
+        "handler": str(handler) if handler else None,
+        "size": input_bytes,
+        "layers": [],
+        "error": None,
+    }
+    if not handler:
+        plan["error"] = "No handlers found for this dataset type"
+        return plan
+    try:
+        plan["layers"] = handler.describe_layers(files)
+    except Exception as e:
+        plan["error"] = str(getattr(e, "detail", e))
+        return plan
+
+    imported = [x for x in plan["layers"] if x["will_be_imported"]]
+    if plan["layers"] and not imported:
+        plan.update(
+            {"estimated_seconds": 0, "estimated_disk_bytes": 0, "based_on_executions": 0}
+        )
+        return plan
+    # the features are used only if all the layers could count them
+    counts = [x["feature_count"] for x in imported]
+    features = sum(counts) if None not in counts else None
+    plan.update(estimate_cost(str(handler), input_bytes, features=features))
+    return plan
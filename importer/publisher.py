@@ -1,5 +1,7 @@
 import logging
 import os
+import threading
+import time
 from typing import List
 
 from geonode import settings
@@ -9,24 +11,111 @@ from geonode.utils import OGC_Servers_Handler
 from django.utils.module_loading import import_string
 
 from importer.api.exception import PublishResourceException
+from importer.rest import AsyncGeoServerClient, TimeoutHTTPAdapter
+from importer.settings import (
+    IMPORTER_BATCH_PUBLISHING_WORKERS,
+    IMPORTER_GEOSERVER_CACHE_TIMEOUT,
+    IMPORTER_GEOSERVER_POOL_SIZE,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
-class DataPublisher:
+class PooledCatalog(Catalog):
     """
-    Given a list of resources, will publish them on GeoServer
+    Catalog shared by the tasks of a worker process.
+    The HTTP connections are kept alive in a pool and the lookups of
+    workspaces and stores are cached for IMPORTER_GEOSERVER_CACHE_TIMEOUT seconds.
+    The cache is invalidated when something is created or deleted
     """
 
-    def __init__(self, handler_module_path) -> None:
-        ogc_server_settings = OGC_Servers_Handler(settings.OGC_SERVER)["default"]
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lookups = {}
+        self._lookups_lock = threading.Lock()
+        if getattr(self, "client", None) is not None:
+            # replaces the adapter of gsconfig: the adapter applies the timeout of the
+            # calls and retries the idempotent ones, except the calls of the
+            # AsyncGeoServerClient which are retried only by the client
+            adapter = TimeoutHTTPAdapter(
+                pool_connections=IMPORTER_GEOSERVER_POOL_SIZE,
+                pool_maxsize=IMPORTER_GEOSERVER_POOL_SIZE,
+            )
+            self.client.mount("http://", adapter)
+            self.client.mount("https://", adapter)
 
-        _user, _password = ogc_server_settings.credentials
+    def _cached_lookup(self, key, loader):
+        now = time.monotonic()
+        with self._lookups_lock:
+            cached = self._lookups.get(key)
+            if cached and cached[0] > now:
+                return cached[1]
+        value = loader()
+        # the missing objects are not cached, they can be created by the next steps
+        if value is not None:
+            with self._lookups_lock:
+                self._lookups[key] = (now + IMPORTER_GEOSERVER_CACHE_TIMEOUT, value)
+        return value
+
+    def invalidate_lookups(self):
+        with self._lookups_lock:
+            self._lookups.clear()
+
+    def get_workspace(self, name):
+        return self._cached_lookup(
+            ("workspace", name), lambda: Catalog.get_workspace(self, name)
+        )
 
-        self.cat = Catalog(
-            service_url=ogc_server_settings.rest, username=_user, password=_password
+    def get_store(self, name, workspace=None):
+        return self._cached_lookup(
+            ("store", getattr(workspace, "name", workspace), name),
+            lambda: Catalog.get_store(self, name, workspace=workspace),
         )
+
+    def create_workspace(self, *args, **kwargs):
+        self.invalidate_lookups()
+        return super().create_workspace(*args, **kwargs)
+
+    def create_coveragestore(self, *args, **kwargs):
+        self.invalidate_lookups()
+        return super().create_coveragestore(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        self.invalidate_lookups()
+        return super().delete(*args, **kwargs)
+
+
+_catalog = None
+_catalog_pid = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> PooledCatalog:
+    """
+    Return the catalog of the current process.
+    A forked worker creates its own, since the connections cannot be shared between processes
+    """
+    global _catalog, _catalog_pid
+    with _catalog_lock:
+        if _catalog is None or _catalog_pid != os.getpid():
+            ogc_server_settings = OGC_Servers_Handler(settings.OGC_SERVER)["default"]
+            _user, _password = ogc_server_settings.credentials
+            _catalog = PooledCatalog(
+                service_url=ogc_server_settings.rest, username=_user, password=_password
+            )
+            _catalog_pid = os.getpid()
+        return _catalog
+
+
+class DataPublisher:
+    """
+    Given a list of resources, will publish them on GeoServer
+    """
+
+    def __init__(self, handler_module_path) -> None:
+        self.cat = get_catalog()
+        self.client = AsyncGeoServerClient(self.cat)
         self.workspace = self._get_default_workspace(create=True)
 
         self.store = None
@@ -66,15 +155,85 @@ class DataPublisher:
         Will publish the resorces on geoserver
         """
         self.get_or_create_store(default=resources[0]["name"])
-        result = self.handler.publish_resources(
-            resources=resources,
-            catalog=self.cat,
-            store=self.store,
-            workspace=self.workspace,
+        (result,) = self.client.run(
+            self.client.call(
+                "publish_resources",
+                self.handler.publish_resources,
+                idempotent=False,
+                resources=resources,
+                catalog=self.cat,
+                store=self.store,
+                workspace=self.workspace,
+            )
         )
         self.sanity_checks(resources)
         return result
 
+    def publish_resources_batch(
+        self,
+        resources: List[dict],
+        overwrite=False,
+        workers=IMPORTER_BATCH_PUBLISHING_WORKERS,
+    ):
+        """
+        Publish together the resources of an execution.
+        The store is resolved once and the feature types are created concurrently,
+        with at most `workers` calls in flight over the catalog connections.
+        The resources are checked with a single listing of the store
+        """
+        self.get_or_create_store(default=resources[0]["name"])
+        published = self.get_published_names()
+        to_overwrite = [
+            x for x in resources if overwrite and x["name"].split(":")[-1] in published
+        ]
+        to_publish = [x for x in resources if x not in to_overwrite]
+
+        client = AsyncGeoServerClient(self.cat, concurrency=workers)
+        client.run(
+            *[
+                client.call(
+                    f"publish {_resource['name']}",
+                    self.handler.publish_resources,
+                    idempotent=False,
+                    resources=[_resource],
+                    catalog=self.cat,
+                    store=self.store,
+                    workspace=self.workspace,
+                )
+                for _resource in to_publish
+            ]
+        )
+
+        for _resource in to_overwrite:
+            self.handler.overwrite_geoserver_resource(
+                resource=_resource,
+                catalog=self.cat,
+                store=self.store,
+                workspace=self.workspace,
+            )
+
+        published = self.get_published_names()
+        missing = [x for x in resources if x["name"].split(":")[-1] not in published]
+        if missing:
+            raise PublishResourceException(
+                f"The resources {missing} are not published, Please check Geoserver logs"
+            )
+        return True
+
+    def get_published_names(self) -> set:
+        """
+        Return the names of the resources available in the store with a single request
+        """
+        (resources,) = self.client.run(
+            self.client.call(
+                "get_resources",
+                self.cat.get_resources,
+                stores=[self.store],
+                workspaces=[self.workspace],
+            )
+        )
+        return {x.name for x in resources}
+
     def overwrite_resources(self, resources: List[str]):
         """
         We dont need to do anything for now. The data is replaced via ogr2ogr
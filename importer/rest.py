@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from functools import partial
+
+from geoserver.catalog import FailedRequestError
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+from urllib3.util.retry import Retry
+
+from importer.settings import (
+    IMPORTER_GEOSERVER_BACKOFF,
+    IMPORTER_GEOSERVER_CONCURRENCY,
+    IMPORTER_GEOSERVER_RETRIES,
+    IMPORTER_GEOSERVER_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# gsconfig reports the status code only inside the message of the error
+STATUS_CODE_REGEX = re.compile(r"\b(5\d\d)\b")
+# answers meaning that GeoServer did not process the request
+NOT_PROCESSED_STATUS_CODES = (503,)
+# requests retried by the HTTP adapter of the catalog
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+# flags the threads running the calls of the AsyncGeoServerClient, which retries them itself
+_client_thread = threading.local()
+
+
+class GeoServerRequestError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter applying a default timeout to the requests,
+    gsconfig does not set any timeout on the calls to GeoServer.
+    The idempotent requests sent directly by the catalog are retried on connection
+    errors and 502/503/504 answers. The calls of the AsyncGeoServerClient are sent
+    without retries, since the client retries them itself
+    """
+
+    def __init__(
+        self,
+        *args,
+        timeout=IMPORTER_GEOSERVER_TIMEOUT,
+        retries=IMPORTER_GEOSERVER_RETRIES,
+        backoff=IMPORTER_GEOSERVER_BACKOFF,
+        **kwargs,
+    ):
+        self.timeout = timeout
+        super().__init__(
+            *args,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=IDEMPOTENT_METHODS,
+                raise_on_status=False,
+            ),
+            **kwargs,
+        )
+        self._without_retries = HTTPAdapter(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if getattr(_client_thread, "active", False):
+            return self._without_retries.send(request, **kwargs)
+        return super().send(request, **kwargs)
+
+    def close(self):
+        super().close()
+        self._without_retries.close()
+
+
+def is_transient_error(error, idempotent=True) -> bool:
+    """
+    True if the error is worth a retry: timeouts, connection errors
+    and the 5xx answers of GeoServer.
+    A request that is not idempotent (eg: the publishing) may have been processed
+    by GeoServer before a timeout or a 502/504, so is retried only if it was
+    not sent or GeoServer answered that it was not processed.
+    The RetryError of requests is not transient, it means that the retries
+    are already exhausted by the HTTP adapter
+    """
+    if isinstance(error, ConnectTimeout):
+        return True
+    status_code = None
+    if isinstance(error, GeoServerRequestError):
+        status_code = error.status_code
+    elif isinstance(error, FailedRequestError):
+        match = STATUS_CODE_REGEX.search(str(error))
+        status_code = int(match.group(1)) if match else None
+    if not idempotent:
+        return status_code in NOT_PROCESSED_STATUS_CODES
+    if isinstance(error, (Timeout, ConnectionError)):
+        return True
+    return bool(status_code and status_code >= 500)
+
+
+def _run_without_adapter_retries(func, *args, **kwargs):
+    _client_thread.active = True
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _client_thread.active = False
+
+
+class AsyncGeoServerClient:
+    """
+    Run the GeoServer REST calls of the importer concurrently.
+    gsconfig is blocking, so each call is executed in a thread of the event loop
+    and a semaphore bounds the number of calls in flight.
+    The transient errors are retried with an exponential backoff and the
+    latency of each call is collected in the metrics.
+    The client is the only layer retrying its calls: the HTTP adapter of the catalog
+    does not retry the requests sent by the client threads (see TimeoutHTTPAdapter)
+    and applies the timeout, so a call in timeout is not left running in its thread
+    """
+
+    def __init__(
+        self,
+        catalog,
+        concurrency=IMPORTER_GEOSERVER_CONCURRENCY,
+        retries=IMPORTER_GEOSERVER_RETRIES,
+        backoff=IMPORTER_GEOSERVER_BACKOFF,
+    ):
+        self.catalog = catalog
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = []
+        self._semaphore = None
+
+    async def call(self, name, func, *args, idempotent=True, **kwargs):
+        """
+        Execute the blocking function in a thread, retrying it on transient errors.
+        The calls creating something on GeoServer must be flagged as not idempotent
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.monotonic()
+            try:
+                async with self._semaphore:
+                    result = await loop.run_in_executor(
+                        None, partial(_run_without_adapter_retries, func, *args, **kwargs)
+                    )
+                self._add_metric(name, start, attempt, "success")
+                return result
+            except Exception as e:
+                if attempt > self.retries or not is_transient_error(e, idempotent):
+                    self._add_metric(name, start, attempt, "failure")
+                    raise e
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"GeoServer call {name} failed with: {e}, retrying in {delay}s"
+                )
+                self._add_metric(name, start, attempt, "retry")
+                await asyncio.sleep(delay)
+
+    async def request(self, method, path, data=None, headers=None, idempotent=True):
+        """
+        Send a request to the GeoServer REST API, the 5xx answers are raised
+        so they can be retried.
+        The path is relative to the REST endpoint of the catalog, unless is a full URL
+        """
+        return await self.call(
+            f"{method.upper()} {path}",
+            self._send,
+            method,
+            path,
+            data,
+            headers or {},
+            idempotent=idempotent,
+        )
+
+    def _send(self, method, path, data, headers):
+        url = path
+        if not path.startswith(("http://", "https://")):
+            url = f"{self.catalog.service_url.rstrip('/')}/{path.lstrip('/')}"
+        response = self.catalog.http_request(
+            url, data=data, method=method, headers=headers
+        )
+        if response.status_code >= 500:
+            raise GeoServerRequestError(
+                f"{method.upper()} {path} returned {response.status_code}: {response.text}",
+                status_code=response.status_code,
+            )
+        return response
+
+    def run(self, *coroutines):
+        """
+        Run the coroutines concurrently from the synchronous code of the tasks.
+        Returns their results in order, the first error is raised
+        """
+
+        async def _gather():
+            # the semaphore must be created inside the loop running the calls
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            return await asyncio.gather(*coroutines)
+
+        return asyncio.run(_gather())
+
+    def _add_metric(self, name, start, attempt, outcome):
+        elapsed = time.monotonic() - start
+        logger.debug(
+            f"GeoServer call {name} attempt {attempt}: {outcome} in {elapsed:.3f}s"
+        )
+        self.metrics.append(
+            {"call": name, "attempt": attempt, "outcome": outcome, "elapsed": elapsed}
+        )
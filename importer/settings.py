@@ -1,3 +1,4 @@
+import ast
 import os
 
 """
@@ -10,12 +11,195 @@ IMPORTER_RESOURCE_CREATION_RATE_LIMIT = os.getenv(
 )
 IMPORTER_RESOURCE_COPY_RATE_LIMIT = os.getenv("IMPORTER_RESOURCE_COPY_RATE_LIMIT", 10)
 
+"""
+GeoPackage validation settings
+IMPORTER_GPKG_VALIDATION_MODE:
+    - full: the PDOK rules are evaluated on the whole geopackage
+    - sample: RQ2 and RQ15 are evaluated on the first IMPORTER_GPKG_VALIDATION_SAMPLE_SIZE rows of each layer
+"""
+IMPORTER_GPKG_VALIDATION_MODE = os.getenv("IMPORTER_GPKG_VALIDATION_MODE", "full")
+IMPORTER_GPKG_VALIDATION_SAMPLE_SIZE = int(
+    os.getenv("IMPORTER_GPKG_VALIDATION_SAMPLE_SIZE", 1000)
+)
+IMPORTER_GPKG_VALIDATION_TIMEOUT = int(os.getenv("IMPORTER_GPKG_VALIDATION_TIMEOUT", 600))
+IMPORTER_GPKG_VALIDATION_WORKERS = int(os.getenv("IMPORTER_GPKG_VALIDATION_WORKERS", 6))
+IMPORTER_GPKG_VALIDATION_CACHE_TIMEOUT = int(
+    os.getenv("IMPORTER_GPKG_VALIDATION_CACHE_TIMEOUT", 86400)
+)
+
+# seconds the workspaces and stores retrieved from GeoServer are cached by each worker
+IMPORTER_GEOSERVER_CACHE_TIMEOUT = int(os.getenv("IMPORTER_GEOSERVER_CACHE_TIMEOUT", 60))
+# keep-alive connections to GeoServer kept by each worker
+IMPORTER_GEOSERVER_POOL_SIZE = int(os.getenv("IMPORTER_GEOSERVER_POOL_SIZE", 10))
+"""
+Calls to the GeoServer REST API: number of calls in flight of each task,
+retries with exponential backoff (seconds) on 5xx answers and timeouts
+and connection/read timeout of each request (seconds)
+"""
+IMPORTER_GEOSERVER_CONCURRENCY = int(os.getenv("IMPORTER_GEOSERVER_CONCURRENCY", 4))
+IMPORTER_GEOSERVER_RETRIES = int(os.getenv("IMPORTER_GEOSERVER_RETRIES", 3))
+IMPORTER_GEOSERVER_BACKOFF = float(os.getenv("IMPORTER_GEOSERVER_BACKOFF", 0.5))
+IMPORTER_GEOSERVER_TIMEOUT = int(os.getenv("IMPORTER_GEOSERVER_TIMEOUT", 60))
+
+"""
+If True, the layers of a vector execution are published together by a single task,
+once all of them are imported. The feature types are created by a pool of threads
+"""
+IMPORTER_BATCH_PUBLISHING = ast.literal_eval(
+    os.getenv("IMPORTER_BATCH_PUBLISHING", "False")
+)
+IMPORTER_BATCH_PUBLISHING_WORKERS = int(
+    os.getenv("IMPORTER_BATCH_PUBLISHING_WORKERS", 4)
+)
+
+"""
+GeoWebCache invalidation after an overwrite.
+If IMPORTER_GWC_TARGETED_TRUNCATE is True, only the tiles inside the previous and the new
+extent of the dataset are truncated for the configured gridsets and formats.
+The layers with parameter filters (styles, CQL, time) lose their whole cache anyway.
+If IMPORTER_GWC_RESEED is True, the truncated tiles are rendered again in background
+between the configured zoom levels, with IMPORTER_GWC_RESEED_THREADS threads of GeoWebCache
+"""
+IMPORTER_GWC_TARGETED_TRUNCATE = ast.literal_eval(
+    os.getenv("IMPORTER_GWC_TARGETED_TRUNCATE", "False")
+)
+IMPORTER_GWC_GRIDSETS = ast.literal_eval(
+    os.getenv("IMPORTER_GWC_GRIDSETS", "['EPSG:4326', 'EPSG:900913']")
+)
+IMPORTER_GWC_FORMATS = ast.literal_eval(
+    os.getenv("IMPORTER_GWC_FORMATS", "['image/png', 'image/jpeg']")
+)
+IMPORTER_GWC_RESEED = ast.literal_eval(os.getenv("IMPORTER_GWC_RESEED", "False"))
+IMPORTER_GWC_RESEED_ZOOM_START = int(os.getenv("IMPORTER_GWC_RESEED_ZOOM_START", 0))
+IMPORTER_GWC_RESEED_ZOOM_STOP = int(os.getenv("IMPORTER_GWC_RESEED_ZOOM_STOP", 12))
+IMPORTER_GWC_RESEED_THREADS = int(os.getenv("IMPORTER_GWC_RESEED_THREADS", 1))
+IMPORTER_GWC_RESEED_RATE_LIMIT = os.getenv("IMPORTER_GWC_RESEED_RATE_LIMIT", "10/m")
+"""
+If True, the tiles of the new layers are seeded in GeoWebCache up to IMPORTER_GWC_SEED_ZOOM_STOP
+as last step of the import. The seeding waits while GeoWebCache is running
+IMPORTER_GWC_SEED_MAX_TASKS tasks, checking every IMPORTER_GWC_SEED_POLL_INTERVAL seconds
+for IMPORTER_GWC_SEED_WAIT_RETRIES times, then is skipped. The import does not wait for it
+"""
+IMPORTER_GWC_SEED = ast.literal_eval(os.getenv("IMPORTER_GWC_SEED", "False"))
+IMPORTER_GWC_SEED_ZOOM_STOP = int(os.getenv("IMPORTER_GWC_SEED_ZOOM_STOP", 10))
+IMPORTER_GWC_SEED_MAX_TASKS = int(os.getenv("IMPORTER_GWC_SEED_MAX_TASKS", 4))
+IMPORTER_GWC_SEED_POLL_INTERVAL = int(os.getenv("IMPORTER_GWC_SEED_POLL_INTERVAL", 30))
+IMPORTER_GWC_SEED_WAIT_RETRIES = int(os.getenv("IMPORTER_GWC_SEED_WAIT_RETRIES", 20))
+
+"""
+If True, the thumbnails are generated in background by the importer.generate_thumbnails task
+once the execution is completed, a single task handles all the resources of the execution
+"""
+IMPORTER_ASYNC_THUMBNAILS = ast.literal_eval(
+    os.getenv("IMPORTER_ASYNC_THUMBNAILS", "True")
+)
+IMPORTER_THUMBNAILS_RATE_LIMIT = os.getenv("IMPORTER_THUMBNAILS_RATE_LIMIT", "30/m")
+"""
+Backend used to generate the thumbnails:
+    - geoserver: the thumbnail is a WMS GetMap of GeoServer
+    - local: the vector datasets are drawn from the simplified geometries in PostGIS and the
+        raster datasets from their overviews, by a pool of IMPORTER_THUMBNAIL_WORKERS workers.
+        The other resources are still rendered by GeoServer
+"""
+IMPORTER_THUMBNAIL_BACKEND = os.getenv("IMPORTER_THUMBNAIL_BACKEND", "geoserver")
+IMPORTER_THUMBNAIL_MAX_FEATURES = int(
+    os.getenv("IMPORTER_THUMBNAIL_MAX_FEATURES", 50000)
+)
+IMPORTER_THUMBNAIL_WORKERS = int(
+    os.getenv("IMPORTER_THUMBNAIL_WORKERS", os.cpu_count() or 1)
+)
+
+"""
+If True, the copy of a vector dataset is created as a view over the original table.
+The view is materialized into a table only when the copy or the original table is
+overwritten or deleted
+"""
+IMPORTER_LAZY_COPY = ast.literal_eval(os.getenv("IMPORTER_LAZY_COPY", "False"))
+# number of parallel connections used to copy the rows of a table in the copy action
+IMPORTER_COPY_WORKERS = int(os.getenv("IMPORTER_COPY_WORKERS", 4))
+
+"""
+If True, the raster are converted to Cloud Optimized GeoTIFF before the publishing
+"""
+IMPORTER_RASTER_COG = ast.literal_eval(os.getenv("IMPORTER_RASTER_COG", "False"))
+IMPORTER_RASTER_COG_COMPRESSION = os.getenv("IMPORTER_RASTER_COG_COMPRESSION", "DEFLATE")
+"""
+If True, the band statistics and histograms of the raster are precomputed before the publishing.
+Are saved in the .aux.xml sidecar of the raster and used to generate a stretched
+default style when no SLD is uploaded
+"""
+IMPORTER_RASTER_STATISTICS = ast.literal_eval(
+    os.getenv("IMPORTER_RASTER_STATISTICS", "False")
+)
+IMPORTER_RASTER_STATISTICS_BINS = int(os.getenv("IMPORTER_RASTER_STATISTICS_BINS", 256))
+# number of threads reading the windows of the raster, each one keeps a block in memory
+IMPORTER_RASTER_STATISTICS_WORKERS = int(
+    os.getenv("IMPORTER_RASTER_STATISTICS_WORKERS", min(4, os.cpu_count() or 1))
+)
+"""
+If True, the copy of a raster dataset is a reflink or a hardlink of the original files
+when they share the filesystem, otherwise the data is copied with copy_file_range
+"""
+IMPORTER_RASTER_COPY_LINKS = ast.literal_eval(
+    os.getenv("IMPORTER_RASTER_COPY_LINKS", "True")
+)
+# number of workers used to validate and convert to COG the tiles of an ImageMosaic
+IMPORTER_MOSAIC_WORKERS = int(os.getenv("IMPORTER_MOSAIC_WORKERS", os.cpu_count() or 1))
+
+# number of CRS authority codes kept in memory by each worker, the codes are persisted in the CRSAuthority table
+IMPORTER_CRS_CACHE_SIZE = int(os.getenv("IMPORTER_CRS_CACHE_SIZE", 1024))
+
+"""
+If set (eg: EPSG:3857), the uploaded datasets are reprojected to this CRS during the import.
+Can be overridden for each upload with the "target_crs" parameter
+"""
+IMPORTER_TARGET_CRS = os.getenv("IMPORTER_TARGET_CRS", None)
+
+"""
+Resumable uploads, the chunks are written directly in the asset directory
+"""
+# size of the buffer used to write the received chunks on disk
+IMPORTER_UPLOAD_BUFFER_SIZE = int(os.getenv("IMPORTER_UPLOAD_BUFFER_SIZE", 1024 * 1024))
+# maximum size in bytes of an upload, lower than the GeoNode upload size limit.
+# 0 means that only the GeoNode limit is applied
+IMPORTER_UPLOAD_MAX_SIZE = int(os.getenv("IMPORTER_UPLOAD_MAX_SIZE", 0))
+# hours after which the resumable uploads not updated anymore are removed
+# by the importer.cleanup_resumable_uploads task
+IMPORTER_UPLOAD_EXPIRATION = int(os.getenv("IMPORTER_UPLOAD_EXPIRATION", 24))
+
+"""
+Batch uploads, the datasets of an archive are imported as child executions
+of a single batch execution
+"""
+# child executions of a batch running at the same time
+IMPORTER_BATCH_UPLOAD_CONCURRENCY = int(
+    os.getenv("IMPORTER_BATCH_UPLOAD_CONCURRENCY", 10)
+)
+
+"""
+Files imported from a URL (file_url), downloaded by the importer.fetch_remote_file task.
+The download is resumed with range requests after a network error
+"""
+IMPORTER_FETCH_RETRIES = int(os.getenv("IMPORTER_FETCH_RETRIES", 5))
+IMPORTER_FETCH_TIMEOUT = int(os.getenv("IMPORTER_FETCH_TIMEOUT", 60))
+IMPORTER_FETCH_CHUNK_SIZE = int(os.getenv("IMPORTER_FETCH_CHUNK_SIZE", 1024 * 1024))
+# hosts of the URLs that can be imported, the wildcards are supported (eg: *.example.com).
+# An empty list allows any host, the private, loopback and link-local addresses are always rejected
+IMPORTER_FETCH_ALLOWED_HOSTS = ast.literal_eval(
+    os.getenv("IMPORTER_FETCH_ALLOWED_HOSTS", "[]")
+)
+
+# number of the last completed executions of a handler used to estimate the cost of a planned import
+IMPORTER_PLAN_HISTORY_SIZE = int(os.getenv("IMPORTER_PLAN_HISTORY_SIZE", 50))
+
 SYSTEM_HANDLERS = [
     'importer.handlers.gpkg.handler.GPKGFileHandler',
     'importer.handlers.geojson.handler.GeoJsonFileHandler',
     'importer.handlers.shapefile.handler.ShapeFileHandler',
     'importer.handlers.kml.handler.KMLFileHandler',
     'importer.handlers.csv.handler.CSVFileHandler',
+    'importer.handlers.imagemosaic.handler.ImageMosaicFileHandler',
+    'importer.handlers.netcdf.handler.NetCDFFileHandler',
     'importer.handlers.geotiff.handler.GeoTiffFileHandler',
     'importer.handlers.xml.handler.XMLFileHandler',
     'importer.handlers.sld.handler.SLDFileHandler',
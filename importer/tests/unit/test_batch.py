@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from geonode.resource.models import ExecutionRequest
+from geonode.tests.base import GeoNodeBaseTestSupport
+
+from importer.api.exception import InvalidInputFileException
+from importer.batch import extract_archive, find_batch_datasets
+from importer.celery_tasks import dispatch_batch_upload
+from importer.orchestrator import orchestrator
+
+
+class TestBatchUpload(GeoNodeBaseTestSupport):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in (
+            "roads.shp",
+            "roads.dbf",
+            "roads.shx",
+            "roads.prj",
+            "roads.xml",
+            "points.geojson",
+            "points.sld",
+            "readme.txt",
+        ):
+            open(os.path.join(self.directory, name), "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_find_batch_datasets_should_group_the_files_by_name(self):
+        datasets = sorted(
+            find_batch_datasets(self.directory, orchestrator.get_handler),
+            key=lambda x: x["base_file"],
+        )
+        self.assertEqual(2, len(datasets))
+        points, roads = datasets
+        self.assertTrue(points["base_file"].endswith("points.geojson"))
+        self.assertTrue(points["sld_file"].endswith("points.sld"))
+        self.assertTrue(roads["base_file"].endswith("roads.shp"))
+        self.assertSetEqual(
+            {"base_file", "dbf_file", "shx_file", "prj_file", "xml_file"}, set(roads)
+        )
+
+    def test_find_batch_datasets_should_select_the_datasets_of_the_manifest(self):
+        datasets = find_batch_datasets(
+            self.directory,
+            orchestrator.get_handler,
+            manifest=[{"base_file": "roads.shp", "overwrite_existing_layer": True}],
+        )
+        self.assertEqual(1, len(datasets))
+        self.assertTrue(datasets[0]["overwrite_existing_layer"])
+
+        with self.assertRaises(InvalidInputFileException):
+            find_batch_datasets(
+                self.directory,
+                orchestrator.get_handler,
+                manifest=[{"base_file": "missing.shp"}],
+            )
+
+    def test_extract_archive_should_reject_paths_outside_the_directory(self):
+        archive_path = os.path.join(self.directory, "batch.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("../outside.geojson", "{}")
+        with self.assertRaises(InvalidInputFileException):
+            extract_archive(archive_path, os.path.join(self.directory, "extracted"))
+
+    def test_find_batch_datasets_should_give_a_sidecar_to_a_single_dataset(self):
+        for name in ("points.gpkg", "points.kml"):
+            open(os.path.join(self.directory, name), "w").close()
+
+        datasets = [
+            x
+            for x in find_batch_datasets(self.directory, lambda _data: True)
+            if "points" in x["base_file"]
+        ]
+
+        self.assertEqual(3, len(datasets))
+        self.assertEqual(1, len([x for x in datasets if "sld_file" in x]))
+
+    def test_extract_archive_should_reject_a_large_uncompressed_size(self):
+        archive_path = os.path.join(self.directory, "batch.zip")
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("points.geojson", "0" * 1000)
+        extracted = os.path.join(self.directory, "extracted")
+
+        with self.assertRaises(InvalidInputFileException):
+            extract_archive(archive_path, extracted, max_size=100)
+        self.assertFalse(os.path.exists(os.path.join(extracted, "points.geojson")))
+
+        extract_archive(archive_path, extracted, max_size=1000)
+        self.assertTrue(os.path.exists(os.path.join(extracted, "points.geojson")))
+
+    @patch("importer.celery_tasks.IMPORTER_BATCH_UPLOAD_CONCURRENCY", 2)
+    @patch("importer.celery_tasks.import_orchestrator.apply_async")
+    @patch("importer.orchestrator.ImportOrchestrator._notify_batch")
+    def test_dispatch_batch_upload_should_respect_the_concurrency(
+        self, _notify_batch, import_orchestrator
+    ):
+        user = get_user_model().objects.get(username="admin")
+        batch_id = orchestrator.create_execution_request(
+            user=user, func_name="importer.dispatch_batch_upload", step="step"
+        )
+        children = [
+            str(
+                orchestrator.create_execution_request(
+                    user=user,
+                    func_name="start_import",
+                    step="start_import",
+                    input_params={"files": {}, "batch_execution_id": str(batch_id)},
+                )
+            )
+            for _ in range(3)
+        ]
+        orchestrator.update_execution_request_status(
+            execution_id=str(batch_id), input_params={"children": children}
+        )
+
+        dispatch_batch_upload(str(batch_id))
+        self.assertEqual(2, import_orchestrator.call_count)
+
+        # a running child keeps its slot
+        dispatch_batch_upload(str(batch_id))
+        self.assertEqual(2, import_orchestrator.call_count)
+
+        orchestrator.set_as_completed(children[0])
+        dispatch_batch_upload(str(batch_id))
+        self.assertEqual(3, import_orchestrator.call_count)
+
+        orchestrator.set_as_completed(children[1])
+        orchestrator.set_as_failed(children[2], reason="error")
+        dispatch_batch_upload(str(batch_id))
+
+        _exec = orchestrator.get_execution_object(str(batch_id))
+        self.assertEqual(ExecutionRequest.STATUS_FAILED, _exec.status)
+        self.assertEqual(2, _exec.output_params["progress"]["finished"])
+        self.assertEqual(3, import_orchestrator.call_count)
@@ -1,4 +1,5 @@
 from django.test import TestCase
+from unittest.mock import patch
 from importer import project_dir
 from importer.orchestrator import orchestrator
 from importer.datastore import DataStoreManager
@@ -50,3 +51,18 @@ class TestDataStoreManager(TestCase):
 
     def test_input_is_valid_with_urls(self):
         self.assertTrue(self.datastore_url.input_is_valid())
+
+    @patch("importer.handlers.gpkg.handler.GPKGFileHandler.is_valid")
+    def test_input_is_valid_should_skip_the_parallelism_of_a_batch_child(self, is_valid):
+        execution_id = orchestrator.create_execution_request(
+            user=self.user,
+            func_name="create",
+            step="create",
+            action="import",
+            input_params={"batch_execution_id": "batch"},
+        )
+        DataStoreManager(
+            self.files, "importer.handlers.gpkg.handler.GPKGFileHandler", self.user, execution_id
+        ).input_is_valid()
+
+        is_valid.assert_called_once_with(self.files, self.user, check_parallelism=False)
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from importer.api.exception import InvalidInputFileException
+from importer.fetch import (
+    download_file,
+    get_url_filename,
+    get_vsicurl_path,
+    validate_url,
+)
+
+CONTENT = b"x" * 5000 + b"y" * 5000
+
+
+class StubFileHandler(BaseHTTPRequestHandler):
+    """
+    Close the connection after half of the file on the first request,
+    the following requests are answered with the range requested
+    """
+
+    requests = []
+    validators = []
+
+    def do_GET(self):
+        StubFileHandler.requests.append(self.headers.get("Range"))
+        StubFileHandler.validators.append(self.headers.get("If-Range"))
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTENT) - start))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        if len(StubFileHandler.requests) == 1:
+            self.wfile.write(CONTENT[: len(CONTENT) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(CONTENT[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@patch("importer.fetch.get_upload_max_size", return_value=0)
+@patch("importer.fetch.validate_url")
+@patch("importer.fetch.time.sleep")
+class TestDownloadFile(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(("127.0.0.1", 0), StubFileHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/data/valid.gpkg"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubFileHandler.requests = []
+        StubFileHandler.validators = []
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, get_url_filename(self.url))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_download_should_resume_with_a_range_request(self, _sleep, *_):
+        checksum = f"sha256:{hashlib.sha256(CONTENT).hexdigest()}"
+        download_file(self.url, self.path, checksum=checksum)
+
+        with open(self.path, "rb") as _file:
+            self.assertEqual(CONTENT, _file.read())
+        self.assertListEqual([None, f"bytes={len(CONTENT) // 2}-"], StubFileHandler.requests)
+        # the range is valid only if the file is not changed on the server
+        self.assertListEqual([None, '"v1"'], StubFileHandler.validators)
+
+    def test_download_should_apply_the_upload_size_limit(self, _sleep, *_):
+        with self.assertRaises(InvalidInputFileException):
+            download_file(self.url, self.path, max_size=len(CONTENT) - 1)
+
+    def test_download_should_fail_if_the_checksum_does_not_match(self, _sleep, *_):
+        checksum = f"sha256:{hashlib.sha256(b'other').hexdigest()}"
+        with self.assertRaises(InvalidInputFileException):
+            download_file(self.url, self.path, checksum=checksum)
+
+    def test_url_filename(self, _sleep, *_):
+        self.assertEqual("valid.gpkg", get_url_filename(self.url))
+        self.assertEqual(
+            "my_data.csv", get_url_filename("https://example.com/files/my%20data.csv?x=1")
+        )
+
+
+class TestValidateUrl(SimpleTestCase):
+    def test_validate_url_should_reject_the_private_addresses(self):
+        for url in (
+            "http://127.0.0.1/data.gpkg",
+            "http://169.254.169.254/latest/meta-data/",
+            "http://10.0.0.1/data.gpkg",
+            "http://[::1]/data.gpkg",
+            "ftp://93.184.216.34/data.gpkg",
+        ):
+            with self.assertRaises(InvalidInputFileException):
+                validate_url(url)
+        validate_url("https://93.184.216.34/data.gpkg")
+
+    def test_validate_url_should_accept_only_the_allowed_hosts(self):
+        with self.assertRaises(InvalidInputFileException):
+            validate_url("https://93.184.216.34/data.gpkg", allowed_hosts=["*.example.com"])
+        validate_url("https://93.184.216.34/data.gpkg", allowed_hosts=["93.184.216.*"])
+
+    def test_vsicurl_path_requires_the_allowed_hosts(self):
+        # GDAL follows the redirects of a remote read without checking them
+        with self.assertRaises(InvalidInputFileException):
+            get_vsicurl_path("https://93.184.216.34/data.csv", allowed_hosts=[])
+        self.assertEqual(
+            "/vsicurl/https://93.184.216.34/data.csv",
+            get_vsicurl_path(
+                "https://93.184.216.34/data.csv", allowed_hosts=["93.184.216.*"]
+            ),
+        )
@@ -0,0 +1,166 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from importer.handlers.gpkg.handler import GPKGFileHandler
+from importer.handlers.imagemosaic.handler import ImageMosaicFileHandler
+from importer.handlers.remote.tiles3d import RemoteTiles3DResourceHandler
+from importer.handlers.remote.wms import RemoteWMSResourceHandler
+from importer.handlers.tiles3d.handler import Tiles3DFileHandler
+from importer.celery_tasks import seed_resource, submit_resource_seeding
+from importer.gwc import (
+    build_seed_request,
+    invalidate_dataset_tiles,
+    transform_extent,
+    union_extent,
+)
+
+
+class TestGeoWebCacheInvalidation(SimpleTestCase):
+    def test_union_extent_should_cover_the_previous_and_the_new_extent(self):
+        self.assertTupleEqual(
+            (-10, -5, 20, 15), union_extent((-10, 0, 10, 10), None, (0, -5, 20, 15))
+        )
+        self.assertIsNone(union_extent(None, None))
+
+    def test_transform_extent_to_the_mercator_gridset(self):
+        minx, miny, maxx, maxy = transform_extent((-180, -90, 180, 90), "EPSG:900913")
+        self.assertAlmostEqual(-20037508.34, minx, places=1)
+        self.assertAlmostEqual(20037508.34, maxy, places=1)
+        self.assertTupleEqual((0, 0, 1, 1), transform_extent((0, 0, 1, 1), "EPSG:4326"))
+
+    def test_build_seed_request(self):
+        request = build_seed_request(
+            "geonode:layer", "EPSG:4326", (0, 0, 1, 1), "truncate", 0, 30, "image/png"
+        )["seedRequest"]
+        self.assertEqual("truncate", request["type"])
+        self.assertListEqual([0, 0, 1, 1], request["bounds"]["coords"]["double"])
+
+    @patch("importer.gwc.IMPORTER_GWC_TARGETED_TRUNCATE", True)
+    @patch("importer.gwc.has_parameter_filters", return_value=False)
+    @patch("importer.gwc.set_geowebcache_invalidate_cache")
+    @patch("importer.gwc.delete_dataset_cache")
+    @patch("importer.gwc.truncate_tiles")
+    def test_invalidate_dataset_tiles_should_truncate_the_changed_extent(
+        self, truncate_tiles, delete_dataset_cache, invalidate_cache, _
+    ):
+        # the 4xx answers are the gridsets or the formats not cached for the layer
+        truncate_tiles.return_value = [
+            MagicMock(status_code=200),
+            MagicMock(status_code=400),
+        ]
+        dataset = MagicMock(alternate="geonode:layer", ll_bbox_polygon=None)
+        invalidate_dataset_tiles(MagicMock(), dataset, (0, 0, 1, 1))
+
+        truncate_tiles.assert_called_once()
+        self.assertTupleEqual((0, 0, 1, 1), truncate_tiles.call_args[0][2])
+        delete_dataset_cache.assert_not_called()
+        invalidate_cache.assert_not_called()
+
+    @patch("importer.gwc.IMPORTER_GWC_TARGETED_TRUNCATE", True)
+    @patch("importer.gwc.has_parameter_filters", return_value=False)
+    @patch("importer.gwc.set_geowebcache_invalidate_cache")
+    @patch("importer.gwc.delete_dataset_cache")
+    @patch("importer.gwc.truncate_tiles")
+    def test_invalidate_dataset_tiles_should_fallback_to_the_whole_cache(
+        self,
+        truncate_tiles,
+        delete_dataset_cache,
+        invalidate_cache,
+        has_parameter_filters,
+    ):
+        dataset = MagicMock(alternate="geonode:layer", ll_bbox_polygon=None)
+        for truncate_error, parameter_filters in (
+            (Exception("GeoWebCache unavailable"), False),
+            (None, True),
+        ):
+            truncate_tiles.side_effect = truncate_error
+            has_parameter_filters.return_value = parameter_filters
+            invalidate_dataset_tiles(MagicMock(), dataset, (0, 0, 1, 1))
+
+        # a failed truncate request
+        truncate_tiles.side_effect = None
+        has_parameter_filters.return_value = False
+        truncate_tiles.return_value = [
+            MagicMock(status_code=200),
+            MagicMock(status_code=500),
+        ]
+        invalidate_dataset_tiles(MagicMock(), dataset, (0, 0, 1, 1))
+
+        self.assertEqual(3, delete_dataset_cache.call_count)
+        delete_dataset_cache.assert_called_with("geonode:layer")
+        self.assertEqual(3, invalidate_cache.call_count)
+
+    @patch("importer.gwc.set_geowebcache_invalidate_cache")
+    @patch("importer.gwc.delete_dataset_cache")
+    @patch("importer.gwc.truncate_tiles")
+    def test_invalidate_dataset_tiles_should_remove_the_whole_cache_by_default(
+        self, truncate_tiles, delete_dataset_cache, invalidate_cache
+    ):
+        dataset = MagicMock(alternate="geonode:layer", ll_bbox_polygon=None)
+        invalidate_dataset_tiles(MagicMock(), dataset, (0, 0, 1, 1))
+
+        truncate_tiles.assert_not_called()
+        delete_dataset_cache.assert_called_once_with("geonode:layer")
+
+    @patch("importer.handlers.base.IMPORTER_GWC_SEED", True)
+    def test_seeding_should_be_the_last_step_of_the_import(self):
+        for handler in (GPKGFileHandler, ImageMosaicFileHandler):
+            tasks = handler.get_task_list("import")
+            self.assertEqual("importer.seed_resource", tasks[-1])
+            self.assertEqual("importer.create_geonode_resource", tasks[-2])
+        self.assertNotIn(
+            "importer.seed_resource", GPKGFileHandler.get_task_list("rollback")
+        )
+        # the remote resources and the 3D Tiles have no local GeoWebCache layer
+        for handler in (
+            RemoteWMSResourceHandler,
+            RemoteTiles3DResourceHandler,
+            Tiles3DFileHandler,
+        ):
+            self.assertNotIn("importer.seed_resource", handler.get_task_list("import"))
+
+    @patch("importer.celery_tasks.import_orchestrator")
+    @patch("importer.celery_tasks.submit_resource_seeding")
+    @patch("importer.celery_tasks.update_seeding_status")
+    @patch("importer.celery_tasks.get_dataset_extent", return_value=(0, 0, 1, 1))
+    @patch("importer.celery_tasks.ResourceHandlerInfo")
+    @patch("importer.celery_tasks.orchestrator")
+    def test_seed_resource_should_not_wait_for_a_free_slot(
+        self, _orc, handler_info, _, update_seeding_status, submit, import_orchestrator
+    ):
+        handler_info.objects.filter.return_value.select_related.return_value.first.return_value = MagicMock(
+            resource=MagicMock(alternate="geonode:layer")
+        )
+
+        seed_resource("exec_id", step_name="importer.seed_resource", alternate="layer")
+
+        update_seeding_status.assert_called_once_with("exec_id", "layer", status="waiting")
+        submit.apply_async.assert_called_once_with(
+            ("exec_id", "layer", "geonode:layer", [0, 0, 1, 1])
+        )
+        # the execution moves to the next step
+        import_orchestrator.apply_async.assert_called_once()
+
+    @patch("importer.celery_tasks.IMPORTER_GWC_SEED_WAIT_RETRIES", 1)
+    @patch("importer.celery_tasks.track_resource_seeding")
+    @patch("importer.celery_tasks.update_seeding_status")
+    @patch("importer.celery_tasks.get_catalog")
+    @patch("importer.celery_tasks.seed_tiles_if_available", return_value=False)
+    @patch("importer.celery_tasks.submit_resource_seeding.apply_async")
+    def test_submit_resource_seeding_should_wait_for_a_free_slot(
+        self, apply_async, seed_tiles_if_available, _, update_seeding_status, track
+    ):
+        submit_resource_seeding("exec_id", "layer", "geonode:layer", [0, 0, 1, 1])
+        apply_async.assert_called_once()
+        self.assertEqual(1, apply_async.call_args.args[0][-1])
+
+        # after the last attempt the seeding is skipped
+        submit_resource_seeding("exec_id", "layer", "geonode:layer", [0, 0, 1, 1], 1)
+        self.assertEqual(1, apply_async.call_count)
+        self.assertEqual("skipped", update_seeding_status.call_args.kwargs["status"])
+
+        seed_tiles_if_available.return_value = True
+        submit_resource_seeding("exec_id", "layer", "geonode:layer", [0, 0, 1, 1])
+        self.assertEqual("submitted", update_seeding_status.call_args.kwargs["status"])
+        track.apply_async.assert_called_once()
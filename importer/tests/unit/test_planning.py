@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from geonode.base.populate_test_data import create_single_dataset
+from geonode.resource.models import ExecutionRequest
+from geonode.tests.base import GeoNodeBaseTestSupport
+from unittest.mock import patch
+
+from importer.models import ResourceHandlerInfo
+from importer.planning import (
+    estimate_cost,
+    get_execution_stats,
+    update_tables_stats,
+)
+
+HANDLER = "importer.handlers.gpkg.handler.GPKGFileHandler"
+
+
+class TestImportPlanning(GeoNodeBaseTestSupport):
+    def _create_execution(self, stats, status=ExecutionRequest.STATUS_FINISHED):
+        _exec = ExecutionRequest.objects.create(
+            user=get_user_model().objects.get(username="admin"),
+            func_name="import",
+            status=status,
+            finished=timezone.now(),
+            input_params={"handler_module_path": HANDLER},
+            output_params={"stats": stats},
+        )
+        ResourceHandlerInfo.objects.create(
+            resource=create_single_dataset(name=f"planning_{_exec.pk}"),
+            handler_module_path=HANDLER,
+            execution_request=_exec,
+        )
+        return _exec
+
+    def test_estimate_cost_without_history(self):
+        estimate = estimate_cost(HANDLER, 1000)
+        self.assertIsNone(estimate["estimated_seconds"])
+        self.assertIsNone(estimate["estimated_disk_bytes"])
+        self.assertEqual(0, estimate["based_on_executions"])
+
+    def test_estimate_cost_from_the_completed_executions(self):
+        self._create_execution(
+            {"input_bytes": 1000, "seconds": 10, "features": 100, "stored_bytes": 2000}
+        )
+        self._create_execution(
+            {"input_bytes": 1000, "seconds": 1, "features": 100, "stored_bytes": 2000},
+            status=ExecutionRequest.STATUS_FAILED,
+        )
+
+        estimate = estimate_cost(HANDLER, 500)
+        self.assertEqual(1, estimate["based_on_executions"])
+        self.assertEqual(5, estimate["estimated_seconds"])
+        self.assertEqual(1000, estimate["estimated_disk_bytes"])
+
+        # the features are preferred to the size of the file
+        self.assertEqual(20, estimate_cost(HANDLER, 500, features=200)["estimated_seconds"])
+
+    @patch("importer.planning.get_input_size", return_value=1000)
+    def test_execution_stats_exclude_the_queue(self, _):
+        _exec = ExecutionRequest.objects.create(
+            user=get_user_model().objects.get(username="admin"),
+            func_name="import",
+            input_params={"files": {"base_file": "/tmp/file.gpkg"}},
+            output_params={},
+        )
+        _exec.created = timezone.now() - timedelta(hours=1)
+        # the execution is not started yet
+        self.assertIsNone(get_execution_stats(_exec))
+
+        _exec.output_params = {
+            "started": (timezone.now() - timedelta(seconds=10)).isoformat()
+        }
+        stats = get_execution_stats(_exec)
+        self.assertEqual(1000, stats["input_bytes"])
+        self.assertTrue(10 <= stats["seconds"] < 3600)
+
+    @patch("importer.planning.get_tables_stats", return_value=(100, 2000))
+    def test_tables_stats_are_added_to_the_completed_execution(self, get_tables_stats):
+        _exec = self._create_execution({"input_bytes": 1000, "seconds": 10})
+
+        update_tables_stats(str(_exec.exec_id))
+
+        _exec.refresh_from_db()
+        self.assertEqual(
+            {"input_bytes": 1000, "seconds": 10, "features": 100, "stored_bytes": 2000},
+            _exec.output_params["stats"],
+        )
+        get_tables_stats.assert_called_once()
@@ -2,7 +2,7 @@ import os
 from django.test import TestCase
 from mock import patch
 from importer import project_dir
-from importer.publisher import DataPublisher
+from importer.publisher import DataPublisher, get_catalog
 from unittest.mock import MagicMock
 
 
@@ -98,3 +98,55 @@ class TestDataPublisher(TestCase):
 
         self.assertTrue(result)
         publish_featuretype.assert_called_once()
+
+    def test_publishers_should_share_the_catalog(self):
+        publisher = DataPublisher(
+            handler_module_path="importer.handlers.gpkg.handler.GPKGFileHandler"
+        )
+        self.assertIs(get_catalog(), publisher.cat)
+        self.assertIs(self.publisher.cat, publisher.cat)
+
+    def test_catalog_should_retry_only_the_idempotent_calls(self):
+        catalog = get_catalog()
+        for prefix in ("http://", "https://"):
+            adapter = catalog.client.get_adapter(prefix)
+            self.assertTrue(adapter.max_retries.total)
+            self.assertNotIn("POST", adapter.max_retries.allowed_methods)
+            # the calls of the AsyncGeoServerClient are retried only by the client
+            self.assertEqual(0, adapter._without_retries.max_retries.total)
+
+    @patch("importer.publisher.Catalog.get_workspace")
+    def test_workspace_lookup_should_be_cached_until_invalidated(self, get_workspace):
+        catalog = get_catalog()
+        catalog.invalidate_lookups()
+        get_workspace.return_value = MagicMock()
+
+        catalog.get_workspace("geonode")
+        catalog.get_workspace("geonode")
+        get_workspace.assert_called_once()
+
+        catalog.invalidate_lookups()
+        catalog.get_workspace("geonode")
+        self.assertEqual(2, get_workspace.call_count)
+
+    @patch("importer.publisher.Catalog.get_resources")
+    @patch("importer.publisher.Catalog.publish_featuretype")
+    def test_publish_resources_batch_should_check_with_a_single_listing(
+        self, publish_featuretype, get_resources
+    ):
+        self.publisher.get_or_create_store = MagicMock()
+        published = [MagicMock(), MagicMock()]
+        published[0].name = "layer_one"
+        published[1].name = "layer_two"
+        get_resources.side_effect = [[], published]
+
+        result = self.publisher.publish_resources_batch(
+            [
+                {"crs": "EPSG:4326", "name": "layer_one"},
+                {"crs": "EPSG:4326", "name": "layer_two"},
+            ]
+        )
+
+        self.assertTrue(result)
+        self.assertEqual(2, publish_featuretype.call_count)
+        self.assertEqual(2, get_resources.call_count)
@@ -0,0 +1,122 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.test import SimpleTestCase
+from requests.exceptions import ReadTimeout
+
+from importer.publisher import PooledCatalog
+from importer.rest import (
+    AsyncGeoServerClient,
+    GeoServerRequestError,
+    is_transient_error,
+)
+
+
+class StubGeoServerHandler(BaseHTTPRequestHandler):
+    """
+    Answer 503 to the first `failures` requests, then 200
+    """
+
+    failures = 0
+    requests = 0
+
+    def do_GET(self):
+        StubGeoServerHandler.requests += 1
+        status = 503 if StubGeoServerHandler.requests <= self.failures else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"workspaces": ""}')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncGeoServerClient(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(("127.0.0.1", 0), StubGeoServerHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.catalog = PooledCatalog(
+            service_url=f"http://127.0.0.1:{cls.server.server_port}/geoserver/rest",
+            username="admin",
+            password="geoserver",
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubGeoServerHandler.requests = 0
+
+    def test_request_should_be_retried_on_5xx(self):
+        StubGeoServerHandler.failures = 2
+        client = AsyncGeoServerClient(self.catalog, retries=3, backoff=0.01)
+
+        (response,) = client.run(client.request("get", "workspaces.json"))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, StubGeoServerHandler.requests)
+        self.assertListEqual(
+            ["retry", "retry", "success"], [x["outcome"] for x in client.metrics]
+        )
+
+    def test_direct_catalog_calls_should_be_retried_by_the_adapter(self):
+        StubGeoServerHandler.failures = 2
+
+        response = self.catalog.http_request(f"{self.catalog.service_url}/workspaces.json")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, StubGeoServerHandler.requests)
+
+    def test_request_should_raise_when_the_retries_are_exhausted(self):
+        StubGeoServerHandler.failures = 10
+        client = AsyncGeoServerClient(self.catalog, retries=1, backoff=0.01)
+
+        with self.assertRaises(GeoServerRequestError):
+            client.run(client.request("get", "workspaces.json"))
+        self.assertEqual(2, StubGeoServerHandler.requests)
+
+    def test_not_idempotent_calls_should_be_retried_only_if_not_processed(self):
+        client = AsyncGeoServerClient(self.catalog, retries=3, backoff=0.01)
+        calls = []
+
+        def _publish(status_code):
+            calls.append(status_code)
+            raise GeoServerRequestError("publishing failed", status_code=status_code)
+
+        # a 502 may hide a resource already published
+        with self.assertRaises(GeoServerRequestError):
+            client.run(client.call("publish", _publish, 502, idempotent=False))
+        self.assertEqual(1, len(calls))
+
+        with self.assertRaises(GeoServerRequestError):
+            client.run(client.call("publish", _publish, 503, idempotent=False))
+        self.assertEqual(5, len(calls))
+
+    def test_timeouts_are_transient_only_for_idempotent_calls(self):
+        self.assertTrue(is_transient_error(ReadTimeout()))
+        self.assertFalse(is_transient_error(ReadTimeout(), idempotent=False))
+
+    def test_calls_in_flight_should_be_bounded(self):
+        client = AsyncGeoServerClient(self.catalog, concurrency=2)
+        lock = threading.Lock()
+        in_flight = {"current": 0, "max": 0}
+
+        def _call():
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            threading.Event().wait(0.05)
+            with lock:
+                in_flight["current"] -= 1
+
+        client.run(*[client.call("stub", _call) for _ in range(6)])
+
+        self.assertEqual(2, in_flight["max"])
+        self.assertEqual(6, len(client.metrics))
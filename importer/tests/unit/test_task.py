@@ -4,7 +4,7 @@ import shutil
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.test.utils import override_settings
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from importer.api.exception import InvalidInputFileException
 
 from importer.celery_tasks import (
@@ -13,6 +13,7 @@ from importer.celery_tasks import (
     copy_geonode_resource,
     create_dynamic_structure,
     create_geonode_resource,
+    dynamic_model_error_callback,
     import_orchestrator,
     import_resource,
     orchestrator,
@@ -329,6 +330,28 @@ class TestCeleryTasks(ImporterBaseTestSupport):
             )
         call_rollback_function.assert_called_once()
 
+    @patch("importer.celery_tasks.IMPORTER_BATCH_PUBLISHING", True)
+    @patch("importer.celery_tasks.publish_resources_batch.apply_async")
+    def test_failed_layer_should_release_the_batch_publishing(self, publish):
+        ExecutionRequest.objects.filter(exec_id=str(self.exec_id)).update(
+            input_params={
+                "handler_module_path": "importer.handlers.gpkg.handler.GPKGFileHandler",
+                "publishing_expected": 2,
+                "ready_to_publish": [
+                    {"layer_name": "a", "alternate": "a_alt", "kwargs": {}}
+                ],
+            }
+        )
+        # the create_dynamic_structure of the second layer failed
+        request = MagicMock(args=(str(self.exec_id), [], 1, False, "b_alt"))
+        dynamic_model_error_callback(request, Exception("error"), None)
+
+        publish.assert_called_once()
+        self.assertListEqual(
+            [{"layer_name": "a", "alternate": "a_alt", "kwargs": {}}],
+            publish.call_args[0][1]["layers"],
+        )
+
     @patch("importer.celery_tasks.import_orchestrator.apply_async")
     def test_copy_geonode_resource(self, async_call):
         alternate = "geonode:cloning"
@@ -604,6 +627,49 @@ class TestDynamicModelSchema(TransactionImporterBaseTestSupport):
             ModelSchema.objects.filter(name=f"schema_{name}").delete()
             FieldSchema.objects.filter(name="field1").delete()
 
+    def test_create_dynamic_structure_should_update_and_create_in_overwrite(self):
+        try:
+            name = str(self.exec_id)
+
+            schema = ModelSchema.objects.create(
+                name=f"schema_{name}", db_name="datastore"
+            )
+            FieldSchema.objects.create(
+                name="field1",
+                class_name="django.contrib.gis.db.models.fields.LineStringField",
+                model_schema=schema,
+            )
+            dynamic_fields = [
+                {
+                    "name": "field1",
+                    "class_name": "django.db.models.CharField",
+                    "null": True,
+                },
+                {
+                    "name": "field2",
+                    "class_name": "django.db.models.IntegerField",
+                    "null": True,
+                },
+            ]
+
+            create_dynamic_structure(
+                execution_id=str(self.exec_id),
+                fields=dynamic_fields,
+                dynamic_model_schema_id=schema.pk,
+                overwrite=True,
+                layer_name="test_layer",
+            )
+
+            fields = FieldSchema.objects.filter(model_schema=schema)
+            self.assertEqual(2, fields.count())
+            updated = fields.get(name="field1")
+            self.assertEqual("django.db.models.CharField", updated.class_name)
+            self.assertDictEqual({"null": True, "max_length": 255}, updated.kwargs)
+
+        finally:
+            FieldSchema.objects.filter(name__in=["field1", "field2"]).delete()
+            ModelSchema.objects.filter(name=f"schema_{name}").delete()
+
     @patch("importer.celery_tasks.import_orchestrator.apply_async")
     @patch.dict(os.environ, {"IMPORTER_ENABLE_DYN_MODELS": "True"})
     def test_copy_dynamic_model_should_work(self, async_call):
@@ -657,11 +723,9 @@ class TestDynamicModelSchema(TransactionImporterBaseTestSupport):
             FieldSchema.objects.filter(name="field_").delete()
 
     @patch("importer.celery_tasks.import_orchestrator.apply_async")
-    @patch("importer.celery_tasks.connections")
-    def test_copy_geonode_data_table_should_work(self, mock_connection, async_call):
-        mock_cursor = mock_connection.__getitem__(
-            "datastore"
-        ).cursor.return_value.__enter__.return_value
+    @patch("importer.celery_tasks.copy_table")
+    def test_copy_geonode_data_table_should_work(self, mock_copy, async_call):
+        mock_copy.return_value = {"create": 0.1, "copy": 1, "indexes": 1, "analyze": 0.1}
         ModelSchema.objects.create(
             name=f"schema_copy_{str(self.exec_id)}", db_name="datastore"
         )
@@ -678,6 +742,46 @@ class TestDynamicModelSchema(TransactionImporterBaseTestSupport):
                 "new_dataset_alternate": f"schema_copy_{str(self.exec_id)}",  # this alternate is generated dring the geonode resource copy
             },
         )
+        mock_copy.assert_called_once_with(
+            f"schema_{str(self.exec_id)}",
+            f"schema_copy_{str(self.exec_id)}",
+            "datastore",
+            workers=4,
+        )
+        self.assertDictEqual(
+            mock_copy.return_value,
+            orchestrator.get_execution_object(self.exec_id).output_params.get(
+                "copy_timings"
+            ),
+        )
+        async_call.assert_called_once()
+
+    @patch("importer.celery_tasks.IMPORTER_LAZY_COPY", True)
+    @patch("importer.celery_tasks.import_orchestrator.apply_async")
+    @patch("importer.celery_tasks.connections")
+    def test_copy_geonode_data_table_should_create_a_view_with_lazy_copy(
+        self, mock_connection, async_call
+    ):
+        mock_cursor = mock_connection.__getitem__(
+            "datastore"
+        ).cursor.return_value.__enter__.return_value
+
+        copy_geonode_data_table(
+            exec_id=str(self.exec_id),
+            actual_step="copy",
+            layer_name=f"schema_{str(self.exec_id)}",
+            alternate=f"geonode:schema_{str(self.exec_id)}",
+            handlers_module_path="importer.handlers.gpkg.handler.GPKGFileHandler",
+            action=ExecutionRequestAction.COPY.value,
+            kwargs={
+                "original_dataset_alternate": f"geonode:schema_{str(self.exec_id)}",
+                "new_dataset_alternate": f"schema_copy_{str(self.exec_id)}",
+            },
+        )
         mock_cursor.execute.assert_called_once()
-        mock_cursor.execute.assert_called()
+        self.assertTrue(
+            mock_cursor.execute.call_args[0][0].startswith(
+                f"CREATE VIEW schema_copy_{str(self.exec_id)}"
+            )
+        )
         async_call.assert_called_once()
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+from osgeo import ogr
+
+from importer import project_dir
+from importer.thumbnails import (
+    draw_geometries,
+    generate_local_thumbnails,
+    render_raster,
+    set_thumbnails,
+)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class TestLocalThumbnails(SimpleTestCase):
+    def test_draw_geometries_should_return_a_png(self):
+        wkbs = [
+            bytes(ogr.CreateGeometryFromWkt(wkt).ExportToWkb())
+            for wkt in (
+                "POLYGON ((0 0, 10 0, 10 10, 0 10, 0 0), (2 2, 4 2, 4 4, 2 2))",
+                "MULTILINESTRING ((0 0, 5 5), (5 5, 10 0))",
+                "POINT (5 5)",
+            )
+        ]
+        content = draw_geometries(wkbs, (0, 0, 10, 10), (240, 200))
+        self.assertTrue(content.startswith(PNG_SIGNATURE))
+
+    def test_render_raster_should_return_a_png(self):
+        content = render_raster(f"{project_dir}/tests/fixture/test_grid.tif", (240, 200))
+        self.assertTrue(content.startswith(PNG_SIGNATURE))
+
+    @patch("importer.thumbnails.get_thumbnail_job")
+    def test_generate_local_thumbnails_should_time_each_thumbnail(
+        self, get_thumbnail_job
+    ):
+        wkb = bytes(ogr.CreateGeometryFromWkt("POINT (5 5)").ExportToWkb())
+        get_thumbnail_job.side_effect = [
+            (draw_geometries, ([wkb], (0, 0, 10, 10), (240, 200))),
+            None,
+        ]
+        rendered, remote = MagicMock(subtype="vector"), MagicMock(subtype="remote")
+        timings = []
+
+        not_rendered = generate_local_thumbnails([rendered, remote], timings=timings)
+
+        self.assertEqual([remote], not_rendered)
+        self.assertEqual(1, len(timings))
+        self.assertGreater(timings[0], 0)
+        rendered.save_thumbnail.assert_called_once()
+
+    @patch("importer.thumbnails.resource_manager")
+    @patch("importer.thumbnails.generate_local_thumbnails")
+    def test_set_thumbnails_should_fallback_to_geoserver(
+        self, generate_local_thumbnails, resource_manager
+    ):
+        remote = MagicMock(subtype="remote")
+        generate_local_thumbnails.return_value = [remote]
+
+        set_thumbnails([MagicMock(subtype="vector"), remote], backend="local")
+
+        resource_manager.set_thumbnail.assert_called_once_with(
+            remote.uuid, instance=remote, overwrite=True
+        )
@@ -0,0 +1,261 @@
+import io
+import logging
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connections
+from geonode.assets.utils import get_default_asset
+from geonode.resource.manager import resource_manager
+from osgeo import gdal, ogr
+from PIL import Image, ImageDraw
+
+from importer.settings import (
+    IMPORTER_THUMBNAIL_BACKEND,
+    IMPORTER_THUMBNAIL_MAX_FEATURES,
+    IMPORTER_THUMBNAIL_WORKERS,
+)
+from importer.utils import get_pool_executor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THUMBNAIL_SIZE = {"width": 240, "height": 200}
+FILL_COLOR = (66, 133, 244, 110)
+STROKE_COLOR = (25, 80, 170, 255)
+RASTER_EXTENSIONS = (".tif", ".tiff", ".vrt")
+
+
+def get_thumbnail_size() -> tuple:
+    size = getattr(settings, "THUMBNAIL_SIZE", DEFAULT_THUMBNAIL_SIZE)
+    return size["width"], size["height"]
+
+
+def _draw_geometry(draw, geometry, to_pixel):
+    geometry_type = ogr.GT_Flatten(geometry.GetGeometryType())
+    if geometry_type == ogr.wkbPoint:
+        x, y = to_pixel(geometry.GetX(), geometry.GetY())
+        draw.ellipse((x - 2, y - 2, x + 2, y + 2), fill=STROKE_COLOR)
+    elif geometry_type == ogr.wkbLineString:
+        points = [to_pixel(x[0], x[1]) for x in geometry.GetPoints() or []]
+        if len(points) > 1:
+            draw.line(points, fill=STROKE_COLOR, width=1)
+    elif geometry_type == ogr.wkbPolygon:
+        for index in range(geometry.GetGeometryCount()):
+            ring = geometry.GetGeometryRef(index)
+            points = [to_pixel(x[0], x[1]) for x in ring.GetPoints() or []]
+            if len(points) > 2:
+                # the holes are drawn with the outline only
+                draw.polygon(
+                    points, fill=FILL_COLOR if index == 0 else None, outline=STROKE_COLOR
+                )
+    else:
+        for index in range(geometry.GetGeometryCount()):
+            _draw_geometry(draw, geometry.GetGeometryRef(index), to_pixel)
+
+
+def draw_geometries(wkbs: list, extent: tuple, size: tuple) -> bytes:
+    """
+    Draw the WKB geometries in a PNG of the provided size, the extent is centered
+    keeping its aspect ratio.
+    Is executed inside the pool, so must be a module function
+    """
+    width, height = size
+    minx, miny, maxx, maxy = extent
+    scale = min(width / ((maxx - minx) or 1), height / ((maxy - miny) or 1))
+    offset_x = (width - (maxx - minx) * scale) / 2
+    offset_y = (height - (maxy - miny) * scale) / 2
+
+    def to_pixel(x, y):
+        return offset_x + (x - minx) * scale, height - offset_y - (y - miny) * scale
+
+    image = Image.new("RGBA", size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(image)
+    for wkb in wkbs:
+        geometry = ogr.CreateGeometryFromWkb(wkb)
+        if geometry is not None and not geometry.IsEmpty():
+            _draw_geometry(draw, geometry, to_pixel)
+
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def render_raster(raster_path: str, size: tuple) -> bytes:
+    """
+    Render the raster in a PNG of the provided size.
+    GDAL reads the overviews closest to the output size, so only a small
+    part of a COG is read. The first three bands are used as RGB
+    Is executed inside the pool, so must be a module function
+    """
+    dataset = gdal.Open(raster_path)
+    width, height = size
+    ratio = min(width / dataset.RasterXSize, height / dataset.RasterYSize)
+    bands = [1, 2, 3] if dataset.RasterCount >= 3 else [1]
+    is_byte = dataset.GetRasterBand(1).DataType == gdal.GDT_Byte
+
+    output = f"/vsimem/{uuid.uuid4().hex}.png"
+    gdal.Translate(
+        output,
+        dataset,
+        format="PNG",
+        width=max(1, int(dataset.RasterXSize * ratio)),
+        height=max(1, int(dataset.RasterYSize * ratio)),
+        bandList=bands,
+        outputType=gdal.GDT_Byte,
+        scaleParams=None if is_byte else [[] for _ in bands],
+        resampleAlg="average",
+    )
+    dataset = None
+    try:
+        _file = gdal.VSIFOpenL(output, "rb")
+        gdal.VSIFSeekL(_file, 0, 2)
+        length = gdal.VSIFTellL(_file)
+        gdal.VSIFSeekL(_file, 0, 0)
+        content = gdal.VSIFReadL(1, length, _file)
+        gdal.VSIFCloseL(_file)
+    finally:
+        gdal.Unlink(output)
+    return content
+
+
+def get_vector_job(resource, size, db_name="datastore"):
+    """
+    Read from PostGIS the geometries of the dataset, simplified
+    with a tolerance of one pixel of the thumbnail
+    """
+    table_name = resource.alternate.split(":")[-1]
+    connection = connections[db_name]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT f_geometry_column FROM geometry_columns WHERE f_table_name = %s LIMIT 1",
+            [table_name],
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        table = connection.ops.quote_name(table_name)
+        column = connection.ops.quote_name(row[0])
+
+        cursor.execute(
+            f"SELECT ST_XMin(e), ST_YMin(e), ST_XMax(e), ST_YMax(e) FROM (SELECT ST_Extent({column}) AS e FROM {table}) AS x"
+        )
+        extent = cursor.fetchone()
+        if not extent or extent[0] is None:
+            return None
+        width, height = size
+        tolerance = max((extent[2] - extent[0]) / width, (extent[3] - extent[1]) / height)
+
+        cursor.execute(
+            f"SELECT ST_AsBinary(ST_Simplify({column}, %s)) FROM {table} WHERE {column} IS NOT NULL LIMIT %s",
+            [tolerance, IMPORTER_THUMBNAIL_MAX_FEATURES],
+        )
+        wkbs = [bytes(x[0]) for x in cursor.fetchall() if x[0] is not None]
+    return draw_geometries, (wkbs, tuple(extent), size)
+
+
+def get_raster_job(resource, size):
+    asset = get_default_asset(resource)
+    paths = [
+        x
+        for x in (asset.location if asset else [])
+        if x.lower().endswith(RASTER_EXTENSIONS) and os.path.exists(x)
+    ]
+    if not paths:
+        return None
+    return render_raster, (paths[0], size)
+
+
+def get_thumbnail_job(resource, size):
+    """
+    Return the function and the arguments rendering the thumbnail of the resource,
+    None if the resource cannot be rendered locally (for example the remote resources)
+    """
+    subtype = getattr(resource, "subtype", None)
+    if subtype == "vector":
+        return get_vector_job(resource, size)
+    if subtype == "raster":
+        return get_raster_job(resource, size)
+    return None
+
+
+def _timed(func, *args):
+    """
+    Return the result of the function and the seconds spent to compute it.
+    Is executed inside the pool, so must be a module function
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def generate_local_thumbnails(
+    resources, workers=IMPORTER_THUMBNAIL_WORKERS, timings=None
+) -> list:
+    """
+    Render the thumbnails of the resources without GeoServer.
+    The data is read in the current process and drawn by a pool of workers.
+    If a list is provided as timings, the seconds spent to read, render and save
+    each thumbnail generated are appended to it.
+    Returns the resources that cannot be rendered locally
+    """
+    size = get_thumbnail_size()
+    jobs = {}
+    read_seconds = {}
+    not_rendered = []
+    for resource in resources:
+        start = time.perf_counter()
+        try:
+            job = get_thumbnail_job(resource, size)
+        except Exception as e:
+            logger.error(f"Error reading the data of the thumbnail of {resource.pk}: {e}")
+            job = None
+        read_seconds[resource] = time.perf_counter() - start
+        if job:
+            jobs[resource] = job
+        else:
+            not_rendered.append(resource)
+
+    executor = get_pool_executor(max_workers=workers)
+    try:
+        futures = {
+            resource: executor.submit(_timed, func, *args)
+            for resource, (func, args) in jobs.items()
+        }
+        for resource, future in futures.items():
+            try:
+                content, render_seconds = future.result()
+                start = time.perf_counter()
+                resource.save_thumbnail(
+                    f"{resource.resource_type}-{resource.uuid}-thumb.png",
+                    content,
+                )
+                if timings is not None:
+                    timings.append(
+                        read_seconds[resource]
+                        + render_seconds
+                        + time.perf_counter()
+                        - start
+                    )
+            except Exception as e:
+                logger.error(f"Error rendering the thumbnail of {resource.pk}: {e}")
+                not_rendered.append(resource)
+    finally:
+        executor.shutdown(wait=True)
+    return not_rendered
+
+
+def set_thumbnails(resources, backend=IMPORTER_THUMBNAIL_BACKEND):
+    """
+    Generate the thumbnails of the resources with the configured backend.
+    The resources not supported by the local backend are rendered by GeoServer
+    """
+    if backend == "local":
+        resources = generate_local_thumbnails(resources)
+    for resource in resources:
+        try:
+            resource_manager.set_thumbnail(
+                resource.uuid, instance=resource, overwrite=True
+            )
+        except Exception as e:
+            logger.error(f"Error during the thumbnail generation of {resource.pk}: {e}")
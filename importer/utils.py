@@ -1,8 +1,15 @@
 import enum
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from django.conf import settings
 from geonode.resource.manager import ResourceManager
 from geonode.geoserver.manager import GeoServerResourceManager
 from geonode.base.models import ResourceBase
+from geonode.upload.models import UploadSizeLimit
 from django.utils.translation import gettext_lazy as _
+from importer.api.exception import InvalidInputFileException
+from importer.settings import IMPORTER_UPLOAD_MAX_SIZE
 
 
 class ImporterRequestAction(enum.Enum):
@@ -67,3 +74,60 @@ def find_key_recursively(obj, key):
     for _unsed, v in obj.items():
         if isinstance(v, dict):
             return find_key_recursively(v, key)
+
+
+def get_pool_executor(max_workers=None):
+    """
+    Return a process pool to run CPU bound jobs in parallel.
+    The celery prefork workers are daemonic processes which are
+    not allowed to have children, in that case a thread pool is returned
+    """
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def terminate_pool_executor(executor):
+    """
+    Shutdown the pool without waiting for the running jobs.
+    The processes of a process pool are terminated, the threads of a thread
+    pool cannot be stopped so their jobs are completed in background
+    """
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False)
+    for process in processes:
+        process.terminate()
+
+
+def get_upload_max_size() -> int:
+    """
+    Return the maximum size in bytes of the files imported with a single request.
+    The GeoNode limit of the dataset uploads (UploadSizeLimit) is lowered
+    by IMPORTER_UPLOAD_MAX_SIZE if configured. 0 means no limit
+    """
+    limit = UploadSizeLimit.objects.filter(slug="dataset_upload_size").first()
+    max_size = (
+        limit.max_size if limit else getattr(settings, "DEFAULT_MAX_UPLOAD_SIZE", 0)
+    )
+    if IMPORTER_UPLOAD_MAX_SIZE and (
+        not max_size or IMPORTER_UPLOAD_MAX_SIZE < max_size
+    ):
+        return IMPORTER_UPLOAD_MAX_SIZE
+    return max_size
+
+
+def validate_files_size(files: dict, max_size=None):
+    """
+    Raise InvalidInputFileException if the total size of the files
+    exceeds the maximum size of the uploads
+    """
+    max_size = get_upload_max_size() if max_size is None else max_size
+    size = sum(
+        os.path.getsize(_path)
+        for _path in set(files.values())
+        if _path and os.path.isfile(_path)
+    )
+    if max_size and size > max_size:
+        raise InvalidInputFileException(
+            detail=f"The files exceed the maximum size of {max_size} bytes"
+        )